@@ -1,15 +1,21 @@
 from src.initialization.initializer import Initializer
+from src.initialization.model_bundle import ModelBundle
 from src.simulation.simulator import Simulator
+from src.simulation.sharded_simulator import ShardedSimulator
+from src.simulation.replicate_runner import ReplicateRunner
+from src.simulation.sweep_runner import SweepRunner
+from src.config.simulation_config import ExperimentConfig
 from src.common.logger import logger
 import time
 
 class SimulationRunner:
     def __init__(self, 
-                 base_path: str, 
-                 excel_file_name: str,
-                 excel_transition_file_name: str, 
-                 excel_initial_prevalence_file_name: str, 
-                 seed=None):
+                 base_path: str = None, 
+                 excel_file_name: str = None,
+                 excel_transition_file_name: str = None, 
+                 excel_initial_prevalence_file_name: str = None, 
+                 seed=None,
+                 bundle_dir: str = None):
         """
         Initialize the SimulationRunner class.
 
@@ -20,7 +26,18 @@ class SimulationRunner:
         :param race_distribution_dict: Dictionary with (age group, gender) and race proportions.
         :param lookup_table_params: Dictionary containing parameters for generating lookup tables.
         :param seed: Optional random seed for reproducibility.
+        :param bundle_dir: Directory of a model bundle (see ModelBundle). The lookup tables are then loaded from
+                           the bundle, the workbooks are not read and the sheet arguments of the run methods are
+                           ignored.
+        :raises ValueError: If neither a bundle nor the input workbooks are given.
         """
+        self.bundle_dir = bundle_dir
+        if bundle_dir is not None:
+            self.simulation_initializer = None
+            return
+        if not (base_path and excel_file_name and excel_transition_file_name and excel_initial_prevalence_file_name):
+            logger.error("SimulationRunner needs either a model bundle or the input workbooks.")
+            raise ValueError("SimulationRunner needs either a model bundle or the input workbooks.")
         self.simulation_initializer = Initializer(
             base_path, 
             excel_file_name,
@@ -29,30 +46,48 @@ class SimulationRunner:
             seed
         )
 
+    def _initialize_simulation(self, *sheet_arguments, generate_population=True):
+        """
+        Lookup tables and initial population of a run, from the model bundle if there is one, otherwise from
+        the workbooks (see Initializer.initialize_simulation).
+        """
+        if self.bundle_dir is None:
+            return self.simulation_initializer.initialize_simulation(*sheet_arguments,
+                                                                     generate_population=generate_population)
+        lookup_tables = ModelBundle.load(self.bundle_dir)
+        initial_population = Initializer.generate_initial_population(lookup_tables) if generate_population else None
+        return lookup_tables, initial_population
+
     def run_simulation(self,
-                       birth_rate_sheet, 
-                       birth_male_ratio_sheet, 
-                       birth_race_sheet_name, 
-                       death_sheet_name, 
-                       death_rate_column_name, 
-                       immigration_age_sheet, 
-                       immigration_sex_sheet, 
-                       immigration_race_sheet, 
-                       immigration_rate_sheet,
-                       drinking_transition_sheet_name, 
-                       initial_population_age_sheet, 
-                       initial_population_sex_sheet, 
-                       initial_population_race_sheet,
-                       initial_population_drinking_sheet,
-                       output_file_name=None):
+                       birth_rate_sheet=None, 
+                       birth_male_ratio_sheet=None, 
+                       birth_race_sheet_name=None, 
+                       death_sheet_name=None, 
+                       death_rate_column_name=None, 
+                       immigration_age_sheet=None, 
+                       immigration_sex_sheet=None, 
+                       immigration_race_sheet=None, 
+                       immigration_rate_sheet=None,
+                       drinking_transition_sheet_name=None, 
+                       initial_population_age_sheet=None, 
+                       initial_population_sex_sheet=None, 
+                       initial_population_race_sheet=None,
+                       initial_population_drinking_sheet=None,
+                       output_file_name=None,
+                       checkpoint_years=None,
+                       resume_from=None):
         """
         Run the complete simulation process.
+
+        :param checkpoint_years: Years at the end of which the simulation state is checkpointed.
+                                 Defaults to ExperimentConfig.CHECKPOINT_YEARS.
+        :param resume_from: Path of a checkpoint to continue from; the initial population is then not generated.
         """
 
         logger.info("Starting simulation process...")
         start_time = time.time()
 
-        lookup_tables, initial_population = self.simulation_initializer.initialize_simulation(
+        lookup_tables, initial_population = self._initialize_simulation(
                                                                                 birth_rate_sheet, 
                                                                                 birth_male_ratio_sheet, 
                                                                                 birth_race_sheet_name, 
@@ -66,9 +101,15 @@ class SimulationRunner:
                                                                                 initial_population_age_sheet, 
                                                                                 initial_population_sex_sheet, 
                                                                                 initial_population_race_sheet,
-                                                                                initial_population_drinking_sheet)
+                                                                                initial_population_drinking_sheet,
+                                                                                generate_population=resume_from is None)
 
-        simulator = Simulator(lookup_tables, initial_population, output_file_name)
+        if ExperimentConfig.POPULATION_SHARDS > 1 and ExperimentConfig.SIMULATION_ENGINE == "agent":
+            simulator_class = ShardedSimulator
+        else:
+            simulator_class = Simulator
+        simulator = simulator_class(lookup_tables, initial_population, output_file_name,
+                                    checkpoint_years=checkpoint_years, resume_from=resume_from)
         simulated_results = simulator.simulate()
 
         end_time = time.time()
@@ -78,6 +119,60 @@ class SimulationRunner:
 
         return simulated_results
 
+    def run_replicates(self,
+                       birth_rate_sheet=None, 
+                       birth_male_ratio_sheet=None, 
+                       birth_race_sheet_name=None, 
+                       death_sheet_name=None, 
+                       death_rate_column_name=None, 
+                       immigration_age_sheet=None, 
+                       immigration_sex_sheet=None, 
+                       immigration_race_sheet=None, 
+                       immigration_rate_sheet=None,
+                       drinking_transition_sheet_name=None, 
+                       initial_population_age_sheet=None, 
+                       initial_population_sex_sheet=None, 
+                       initial_population_race_sheet=None,
+                       initial_population_drinking_sheet=None,
+                       num_replicates=None,
+                       seeds=None,
+                       max_workers=None):
+        """
+        Run Monte Carlo replicates of the simulation in a process pool, building the lookup tables once.
+
+        :param num_replicates: Number of replicates, seeded from ExperimentConfig.seed upwards.
+        :param seeds: Explicit list of seeds, one per replicate.
+        :param max_workers: Number of worker processes. Defaults to ExperimentConfig.REPLICATE_WORKERS.
+        :return: DataFrame of the yearly summary rows of every replicate with its 'Replicate' and 'Seed'.
+        """
+
+        logger.info("Starting replicate simulation process...")
+        start_time = time.time()
+
+        lookup_tables, _ = self._initialize_simulation(
+                                                                                birth_rate_sheet, 
+                                                                                birth_male_ratio_sheet, 
+                                                                                birth_race_sheet_name, 
+                                                                                death_sheet_name, 
+                                                                                death_rate_column_name, 
+                                                                                immigration_age_sheet, 
+                                                                                immigration_sex_sheet, 
+                                                                                immigration_race_sheet, 
+                                                                                immigration_rate_sheet,
+                                                                                drinking_transition_sheet_name, 
+                                                                                initial_population_age_sheet, 
+                                                                                initial_population_sex_sheet, 
+                                                                                initial_population_race_sheet,
+                                                                                initial_population_drinking_sheet,
+                                                                                generate_population=False)
+
+        replicate_results = ReplicateRunner(lookup_tables, max_workers=max_workers).run(num_replicates, seeds)
+
+        elapsed_time_minutes = (time.time() - start_time) / 60
+        logger.info(f"Replicate simulation process completed in {elapsed_time_minutes:.2f} MINUTES.")
+
+        return replicate_results
+
 if __name__ == "__main__":
     # Example usage
 
@@ -119,75 +214,11 @@ if __name__ == "__main__":
                                                 "simulation_output.csv")
     print("Simulated Results:", simulated_results)
 
-    """
-    lst_initial_population_drinking_sheet = ["Drinking_Prevalence_AgeGroup", "Drinking_Prevalence_Sex", "Drinking_Prevalence_Race"]
-    for initial_population_drinking_sheet in lst_initial_population_drinking_sheet:
-        base_path = "test/data/input_data"
-        excel_file_name = "Data_AUD_Grant_Input_472025.xlsx"
-        
-        birth_rate_sheet = "Birth"
-        birth_male_ratio_sheet = "Sex_Ratio_At_Birth"
-        birth_race_sheet_name = "Race_Sex_Age"
-        death_sheet_name = "Death_Rate_Data"
-        death_rate_column_name = "Rate"
-        immigration_age_sheet = "Age_Ratio_All_Years"
-        immigration_sex_sheet = "Sex_Ratio_All_Years"
-        immigration_race_sheet = "Race_Sex_Age"
-        immigration_rate_sheet = "Immigration"
-        initial_population_age_sheet = "Initial_Population"
-        initial_population_sex_sheet = "Sex_Average"
-        initial_population_race_sheet = "Race_Sex_Age"
-        drinking_transition_sheet_name = "Drinking_TransProb_ByAgeRaceSex"
-        simulator = SimulationRunner(base_path, excel_file_name)
-        simulated_results = simulator.run_simulation(birth_rate_sheet, 
-                                                birth_male_ratio_sheet, 
-                                                birth_race_sheet_name, 
-                                                death_sheet_name, 
-                                                death_rate_column_name, 
-                                                immigration_age_sheet, 
-                                                immigration_sex_sheet, 
-                                                immigration_race_sheet, 
-                                                immigration_rate_sheet,
-                                                drinking_transition_sheet_name,
-                                                initial_population_age_sheet, 
-                                                initial_population_sex_sheet, 
-                                                initial_population_race_sheet,
-                                                initial_population_drinking_sheet,
-                                                "similation__output_" + initial_population_drinking_sheet + ".csv")
-
-    lst_transition_probability_sheet = ["TransitionProbabili0tyByAgeSex03", "TransitionProbabilityByAgeSex8", "TransitionProbabilityOverall03","TransitionProbabilityOverall8"]
-    for drinking_transition_sheet_name in lst_transition_probability_sheet:
-        base_path = "test/data/input_data"
-        excel_file_name = "Data_AUD_Grant_Input_472025.xlsx"
-        
-        birth_rate_sheet = "Birth"
-        birth_male_ratio_sheet = "Sex_Ratio_At_Birth"
-        birth_race_sheet_name = "Race_Sex_Age"
-        death_sheet_name = "Death_Rate_Data"
-        death_rate_column_name = "Rate"
-        immigration_age_sheet = "Age_Ratio_All_Years"
-        immigration_sex_sheet = "Sex_Ratio_All_Years"
-        immigration_race_sheet = "Race_Sex_Age"
-        immigration_rate_sheet = "Immigration"
-        initial_population_age_sheet = "Initial_Population" 
-        initial_population_sex_sheet = "Sex_Average"
-        initial_population_race_sheet = "Race_Sex_Age"
-        initial_population_drinking_sheet = "Drinking_Prevalence"
-        simulator = SimulationRunner(base_path, excel_file_name)
-        simulated_results = simulator.run_simulation(birth_rate_sheet, 
-                                                birth_male_ratio_sheet, 
-                                                birth_race_sheet_name, 
-                                                death_sheet_name, 
-                                                death_rate_column_name, 
-                                                immigration_age_sheet, 
-                                                immigration_sex_sheet, 
-                                                immigration_race_sheet, 
-                                                immigration_rate_sheet,
-                                                drinking_transition_sheet_name,
-                                                initial_population_age_sheet, 
-                                                initial_population_sex_sheet, 
-                                                initial_population_race_sheet,
-                                                initial_population_drinking_sheet,
-                                                "similation_output_" + drinking_transition_sheet_name + ".csv")
+    # Sweeps over input sheets (e.g. the drinking transition sheets) go through SweepRunner, which parses every
+    # distinct sheet once and runs the scenarios concurrently, writing one output file per scenario:
+    # sweep_results = SweepRunner(base_path, excel_file_name, excel_transition_file_name,
+    #                             excel_initial_prevalence_file_name).run("test/data/input_data/transition_sweep_manifest.json")
 
-        """
\ No newline at end of file
+    # A model bundle written once by the ingest command (python -m src.ingest_bundle <bundle_dir>) holds the compiled
+    # lookup tables; runs from it read no workbook and load the tables in milliseconds:
+    # bundle_results = SimulationRunner(bundle_dir="model_bundle").run_simulation(output_file_name="simulation_output.csv")
@@ -1,6 +1,9 @@
+import hashlib
 import numpy as np
+import pandas as pd
 import random
 from src.config.simulation_config import ExperimentConfig
+from src.common.constants import InitializationConstants, PopulationCodes, RandomStreams
 from src.common.logger import logger
 
 
@@ -16,10 +19,282 @@ class Common_RNG:
 
     def get_rng_for_person(self, person_id):
         """
-        Get a reproducible RNG for a given person based on the base seed and the person ID.
+        Get a reproducible RNG for a given person based on the base seed and the person ID. The generator
+        is a counter-based stream keyed by the person ID, so it does not depend on hash randomization.
         
         :param person_id: Unique identifier for the person.
         :return: np.random.Generator object.
         """
-        seed = hash((self.seed, person_id)) % (2**32)
-        return np.random.default_rng(seed)
\ No newline at end of file
+        return Common_CounterRNG(self.seed).generator(ExperimentConfig.INITIAL_YEAR, RandomStreams.INITIAL_POPULATION,
+                                                      block=int(person_id))
+
+
+class Common_CounterRNG:
+    """
+    Counter-based random streams. Every draw is a pure function of (seed, year, stream, key, draw index),
+    computed with the Philox4x32-10 bijection, so results are bit-identical however the population is
+    ordered or partitioned across threads and processes, and no generator object is created per agent.
+
+    - uniforms() returns vectorized per-agent uniforms keyed by agent ID.
+    - generator() returns a np.random.Generator (NumPy's Philox) keyed by (seed, year, stream, block) for
+      block-level draws such as binomial or multinomial counts.
+
+    Streams are separated by the RandomStreams tags.
+    """
+
+    PHILOX_M0 = np.uint64(0xD2511F53)
+    PHILOX_M1 = np.uint64(0xCD9E8D57)
+    PHILOX_W0 = 0x9E3779B9
+    PHILOX_W1 = 0xBB67AE85
+    PHILOX_ROUNDS = 10
+    MASK_32 = np.uint64(0xFFFFFFFF)
+    SHIFT_32 = np.uint64(32)
+    CHUNK_SIZE = 8192
+
+    def __init__(self, seed=None):
+        """
+        :param seed: Base seed. Defaults to ExperimentConfig.seed.
+        """
+        self.seed = ExperimentConfig.seed if seed is None else int(seed)
+
+    @classmethod
+    def philox4x32(cls, counter, key):
+        """
+        Philox4x32-10 bijection (Salmon et al., Random123) applied element-wise.
+
+        :param counter: Sequence of four arrays (or scalars) of 32-bit counter words; they are broadcast together.
+        :param key: Pair of 32-bit key words (Python integers).
+        :return: Tuple of four uint64 arrays holding the 32-bit output words.
+        """
+        c0, c1, c2, c3 = np.broadcast_arrays(*(np.asarray(word, dtype=np.uint64) for word in counter))
+        k0, k1 = int(key[0]), int(key[1])
+        for round_index in range(cls.PHILOX_ROUNDS):
+            if round_index:
+                k0 = (k0 + cls.PHILOX_W0) & 0xFFFFFFFF
+                k1 = (k1 + cls.PHILOX_W1) & 0xFFFFFFFF
+            product0 = c0 * cls.PHILOX_M0
+            product1 = c2 * cls.PHILOX_M1
+            high0 = product0 >> cls.SHIFT_32
+            high0 ^= c3
+            high0 ^= np.uint64(k1)
+            high1 = product1 >> cls.SHIFT_32
+            high1 ^= c1
+            high1 ^= np.uint64(k0)
+            product0 &= cls.MASK_32
+            product1 &= cls.MASK_32
+            c0, c1, c2, c3 = high1, product1, high0, product0
+        return c0, c1, c2, c3
+
+    def _key(self):
+        return self.seed & 0xFFFFFFFF, (self.seed >> 32) & 0xFFFFFFFF
+
+    def uniforms(self, year, stream, ids, draws=None):
+        """
+        Uniforms in [0, 1) keyed by agent ID. The counter of a Philox block is (ID low word, ID high word,
+        block index, year << 8 | stream) and each block yields two 53-bit uniforms.
+
+        :param year: Simulated year.
+        :param stream: RandomStreams tag of the simulation stage.
+        :param ids: Array of non-negative agent IDs (or block indices).
+        :param draws: Number of uniforms per ID. When None, one uniform per ID is returned as a 1-D array.
+        :return: Array of shape (len(ids),) or (len(ids), draws).
+        """
+        ids = np.asarray(ids, dtype=np.uint64)
+        num_draws = 1 if draws is None else draws
+        blocks = np.arange((num_draws + 1) // 2, dtype=np.uint64)[None, :]
+        values = np.empty((len(ids), num_draws))
+
+        # Work on cache-sized chunks: the rounds are memory bound on large arrays
+        for start in range(0, len(ids), self.CHUNK_SIZE):
+            chunk = ids[start:start + self.CHUNK_SIZE, None]
+            words = self.philox4x32((chunk & self.MASK_32, chunk >> self.SHIFT_32, blocks,
+                                     (int(year) << 8) | int(stream)), self._key())
+            high = np.stack([words[0], words[2]], axis=-1).reshape(len(chunk), -1)[:, :num_draws] >> np.uint64(5)
+            low = np.stack([words[1], words[3]], axis=-1).reshape(len(chunk), -1)[:, :num_draws] >> np.uint64(6)
+            values[start:start + len(chunk)] = (high * np.uint64(67108864) + low) * (1.0 / 9007199254740992.0)
+
+        return values[:, 0] if draws is None else values
+
+    def generator(self, year, stream, block=0):
+        """
+        Generator for block-level draws of a simulation stage.
+
+        :param year: Simulated year.
+        :param stream: RandomStreams tag of the simulation stage.
+        :param block: Index of the block (e.g. a shard or a replicate) the draws belong to.
+        :return: np.random.Generator backed by NumPy's Philox with key seed and counter (0, block, year, stream).
+        """
+        return np.random.Generator(np.random.Philox(key=self.seed, counter=[0, int(block), int(year), int(stream)]))
+
+class Common_Fingerprint:
+    """
+    Content hash of nested lookup structures (dictionaries, lists, DataFrames, arrays and scalars). Two
+    structures holding the same values get the same fingerprint whatever the insertion order of their
+    dictionaries, which identifies the lookup tables a checkpoint or cache entry was produced from.
+    """
+
+    @classmethod
+    def fingerprint(cls, value):
+        """
+        :param value: Structure to hash.
+        :return: Hexadecimal SHA-256 digest.
+        """
+        digest = hashlib.sha256()
+        cls._update(digest, value)
+        return digest.hexdigest()
+
+    @classmethod
+    def _update(cls, digest, value):
+        if isinstance(value, dict):
+            digest.update(b"dict")
+            for key in sorted(value, key=repr):
+                digest.update(repr(key).encode())
+                cls._update(digest, value[key])
+        elif isinstance(value, (list, tuple)):
+            digest.update(type(value).__name__.encode())
+            for item in value:
+                cls._update(digest, item)
+        elif isinstance(value, (pd.DataFrame, pd.Series)):
+            digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+            try:
+                digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            except TypeError:
+                # Cells holding unhashable objects (e.g. dictionaries of rates) are hashed structurally
+                cls._update(digest, value.to_dict(orient="split") if isinstance(value, pd.DataFrame)
+                            else {"index": value.index.tolist(), "data": value.tolist()})
+        elif isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype.str}{value.shape}".encode())
+            digest.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else repr(value.tolist()).encode())
+        else:
+            digest.update(repr(value).encode())
+
+class Common_Sampling:
+    """
+    Vectorized helpers shared by the array-based population generators and updaters.
+    """
+
+    @staticmethod
+    def get_age_group_codes(ages, age_groups):
+        """
+        Map an array of ages to the index of their age group.
+
+        :param ages: Array of integer ages.
+        :param age_groups: List of (lower, upper, label) tuples sorted by lower bound,
+                           e.g. InitializationConstants.AGE_GROUPS.
+        :return: Array of age group indices aligned with ages.
+        """
+        lower_bounds = np.array([lower for lower, _, _ in age_groups])
+        ages = np.asarray(ages)
+        if ages.size and ages.min() < lower_bounds[0]:
+            logger.error(f"Invalid age: {ages.min()}")
+            raise ValueError(f"Invalid age: {ages.min()}")
+        return np.searchsorted(lower_bounds, ages, side='right') - 1
+
+    @staticmethod
+    def build_cdf(probabilities):
+        """
+        Normalize probability vectors along the last axis and turn them into cumulative
+        distributions whose last entry is exactly 1.
+
+        :param probabilities: Array of shape (..., K) with non-negative weights.
+        :return: Array of the same shape holding the cumulative distributions.
+        """
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        totals = probabilities.sum(axis=-1, keepdims=True)
+        if np.any(totals <= 0):
+            logger.error("Probability vectors must have a positive total.")
+            raise ValueError("Probability vectors must have a positive total.")
+        cdf = np.cumsum(probabilities / totals, axis=-1)
+        cdf[..., -1] = 1.0
+        return cdf
+
+    @staticmethod
+    def sample_from_cdf(cdf_rows, uniforms):
+        """
+        Draw one category per row by inverse-CDF sampling.
+
+        :param cdf_rows: Array of shape (N, K) holding one cumulative distribution per draw.
+        :param uniforms: Array of N uniforms in [0, 1).
+        :return: Array of N category indices in [0, K).
+        """
+        codes = (uniforms[:, None] >= cdf_rows).sum(axis=1)
+        return np.minimum(codes, cdf_rows.shape[1] - 1)
+
+    @staticmethod
+    def build_drinking_status_cdf(drinking_distribution_df):
+        """
+        Compile the drinking status distribution (initial_pop_drinking_status_lookup) into cumulative
+        distributions indexed by [drinking age group, composite code].
+
+        :param drinking_distribution_df: DataFrame with Age_Group, Composite and Drinking_Status columns.
+        :return: Tuple (drinking_age_groups, cdf) where drinking_age_groups is the matching 4- or 5-group
+                 definition and cdf has shape (len(drinking_age_groups), len(COMPOSITES), len(DRINKING_STAGES)).
+                 Combinations missing from the distribution are NaN.
+        """
+        unique_age_groups = set(drinking_distribution_df[InitializationConstants.AGE_GROUP_KEY].unique())
+        if unique_age_groups.issubset({group for _, _, group in InitializationConstants.DRINKING_AGE_GROUPS_4}):
+            logger.info("Using 4-group age cutoff for age group determination.")
+            drinking_age_groups = InitializationConstants.DRINKING_AGE_GROUPS_4
+        elif unique_age_groups.issubset({group for _, _, group in InitializationConstants.DRINKING_AGE_GROUPS_5}):
+            logger.info("Using 5-group age cutoff for age group determination.")
+            drinking_age_groups = InitializationConstants.DRINKING_AGE_GROUPS_5
+        else:
+            logger.error(f"Unexpected age groups in drinking distribution: {sorted(unique_age_groups)}")
+            raise ValueError(f"Unexpected age groups in drinking distribution: {sorted(unique_age_groups)}")
+
+        cdf = np.full((len(drinking_age_groups), len(PopulationCodes.COMPOSITES), len(PopulationCodes.DRINKING_STAGES)), np.nan)
+        group_codes = {group: index for index, (_, _, group) in enumerate(drinking_age_groups)}
+        composite_codes = {composite: index for index, composite in enumerate(PopulationCodes.COMPOSITES)}
+
+        for age_group, composite, drinking_status in zip(drinking_distribution_df[InitializationConstants.AGE_GROUP_KEY],
+                                                          drinking_distribution_df['Composite'],
+                                                          drinking_distribution_df[InitializationConstants.DRINKING_STATUS_KEY]):
+            cdf[group_codes[age_group], composite_codes[composite]] = Common_Sampling.build_cdf(
+                [drinking_status.get(stage, 0) for stage in PopulationCodes.DRINKING_STAGES])
+        return drinking_age_groups, cdf
+
+    @staticmethod
+    def sample_drinking_stages(drinking_age_groups, drinking_cdf, ages, composite_codes, uniforms):
+        """
+        Draw a drinking stage code for every individual from the compiled drinking status distribution.
+
+        :param drinking_age_groups: Age group definition returned by build_drinking_status_cdf.
+        :param drinking_cdf: Cumulative distributions returned by build_drinking_status_cdf.
+        :param ages: Array of ages.
+        :param composite_codes: Array of composite codes aligned with ages.
+        :param uniforms: Array of uniforms aligned with ages.
+        :return: Array of drinking stage codes.
+        :raises KeyError: If an individual falls into a combination missing from the distribution.
+        """
+        group_codes = Common_Sampling.get_age_group_codes(ages, drinking_age_groups)
+        agent_cdf = drinking_cdf[group_codes, composite_codes]
+        if np.isnan(agent_cdf).any():
+            logger.error("Missing drinking distribution for some age group and composite combinations.")
+            raise KeyError("Missing drinking distribution for some age group and composite combinations.")
+        return Common_Sampling.sample_from_cdf(agent_cdf, uniforms)
+
+    @staticmethod
+    def cdf_to_probabilities(cdf):
+        """
+        Turn cumulative distributions back into probability vectors along the last axis. NaN rows stay NaN;
+        rounding noise that would make an entry negative is clipped to 0.
+
+        :param cdf: Array of shape (..., K) holding cumulative distributions.
+        :return: Array of the same shape holding the probabilities.
+        """
+        return np.maximum(np.diff(cdf, axis=-1, prepend=0.0), 0.0)
+
+    @staticmethod
+    def get_drinking_status_probabilities_by_age(drinking_age_groups, drinking_cdf):
+        """
+        Expand the compiled drinking status distribution to single-year ages.
+
+        :param drinking_age_groups: Age group definition returned by build_drinking_status_cdf.
+        :param drinking_cdf: Cumulative distributions returned by build_drinking_status_cdf.
+        :return: Array of shape (MAX_AGE + 1, len(SEXES), len(RACES), len(DRINKING_STAGES)); NaN where the
+                 combination is missing from the distribution.
+        """
+        group_codes = Common_Sampling.get_age_group_codes(np.arange(PopulationCodes.MAX_AGE + 1), drinking_age_groups)
+        probabilities = Common_Sampling.cdf_to_probabilities(drinking_cdf[group_codes])
+        return probabilities.reshape(PopulationCodes.MAX_AGE + 1, len(PopulationCodes.SEXES), len(PopulationCodes.RACES),
+                                     len(PopulationCodes.DRINKING_STAGES))
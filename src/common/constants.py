@@ -67,6 +67,21 @@ class InitializationConstants:
         (85, float('inf'), '85 years and over'),
     ]
 
+    DRINKING_AGE_GROUPS_4 = [
+        (0, 17, '0-17'),
+        (18, 34, '18-34'),
+        (35, 54, '35-54'),
+        (55, float('inf'), '55 and over'),
+    ]
+
+    DRINKING_AGE_GROUPS_5 = [
+        (0, 17, '0-17'),
+        (18, 24, '18-24'),
+        (25, 34, '25-34'),
+        (35, 54, '35-54'),
+        (55, float('inf'), '55 and over'),
+    ]
+
 class UpdaterColumnNames:
     AGE_KEY = Common.AGE
     GENDER_KEY = Common.SEX
@@ -79,4 +94,32 @@ class UpdaterColumnNames:
     MALE = Common.MALE
     FEMALE = Common.FEMALE
     DRINKING_STATUS_KEY = "Drinking_Status"
-    DRINKING_STAGE_KEY = "Drinking_Stage"
\ No newline at end of file
+    DRINKING_STAGE_KEY = "Drinking_Stage"
+
+class PopulationCodes:
+    """
+    Integer codes used by the array-based population paths. The position of a label in
+    each list is its code; the composite code of an individual is SEX * len(RACES) + RACE.
+    """
+    SEXES = [Common.MALE, Common.FEMALE]
+    RACES = ["White", "Black", "Hispanic", "Other"]
+    DRINKING_STAGES = ["Abs", "Low", "Med", "High", "Very High"]
+    COMPOSITES = [
+        "Male_White", "Male_Black", "Male_Hispanic", "Male_Other",
+        "Female_White", "Female_Black", "Female_Hispanic", "Female_Other",
+    ]
+    MAX_AGE = 100
+    # Shape of the count tensor used by the cohort engine: [age, sex, race, drinking stage, immigrant flag]
+    COUNT_TENSOR_SHAPE = (MAX_AGE + 1, len(SEXES), len(RACES), len(DRINKING_STAGES), 2)
+
+
+class RandomStreams:
+    """
+    Tags that keep the random streams of the simulation stages independent when they are
+    seeded from the same (seed, year).
+    """
+    INITIAL_POPULATION = 1
+    BIRTH = 2
+    IMMIGRATION = 3
+    DRINKING = 4
+    DEATH = 5
@@ -3,6 +3,13 @@ import os
 from src.common.logger import logger
 
 class ExcelDataReader:
+    """
+    Reads sheets of the input workbooks. Each workbook is opened once and kept as a pandas ExcelFile
+    handle, and every parsed sheet is cached, so generators sharing a reader never parse the same sheet
+    twice (e.g. 'Race_Sex_Age', read by the birth, immigration and initial population generators).
+    Callers get a copy of the cached frame and may modify it. A workbook modified on disk is read again.
+    A CSV file is read as a workbook with a single sheet: its sheet name is ignored.
+    """
 
     def __init__(self, base_path):
         """
@@ -11,33 +18,91 @@ class ExcelDataReader:
         :param excel_file_name: The name of the Excel file to read.
         """
         self.base_path = base_path
+        # Open workbook handles and parsed sheets, keyed by file path and the file's (mtime, size)
+        self._workbooks = {}
+        self._frames = {}
         logger.info(f"ExcelDataReader initialized with base_path: {base_path}")
 
-    def read_sheet(self, excel_file_name, sheet_name):
+    def _file_version(self, excel_file_name):
         """
-        Reads the specified sheet from the Excel file.
-        :param sheet_name: The name of the sheet to read.
-        :return: A pandas DataFrame containing the data from the specified sheet.
+        :return: Tuple (file path, (modification time, size)).
         :raises FileNotFoundError: If the file does not exist.
-        :raises ValueError: If there is an error reading the sheet.
         """
         file_path = os.path.join(self.base_path, excel_file_name)
-        logger.info(f"Attempting to read sheet '{sheet_name}' from file '{file_path}'")
-
         if not os.path.isfile(file_path):
             logger.error(f"File '{excel_file_name}' does not exist in '{self.base_path}'")
             raise FileNotFoundError(f"The file '{excel_file_name}' does not exist in '{self.base_path}'.")
+        stat = os.stat(file_path)
+        return file_path, (stat.st_mtime_ns, stat.st_size)
+
+    def _open_workbook(self, file_path, version):
+        """
+        :return: The cached ExcelFile handle of the file, opened again if the file changed.
+        """
+        cached = self._workbooks.get(file_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if cached is not None:
+            cached[1].close()
+        workbook = pd.ExcelFile(file_path)
+        self._workbooks[file_path] = (version, workbook)
+        return workbook
+
+    def _parse_sheet(self, excel_file_name, sheet_name):
+        """
+        :return: The cached frame of the sheet, parsed if needed. The frame must not be modified.
+        """
+        file_path, version = self._file_version(excel_file_name)
+        key = (file_path, version, sheet_name)
+        if key in self._frames:
+            logger.info(f"Reusing sheet '{sheet_name}' of file '{excel_file_name}'")
+            return self._frames[key]
 
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-            logger.info(f"Successfully read sheet '{sheet_name}' from file '{excel_file_name}'")
-            return df
+            if file_path.lower().endswith(".csv"):
+                df = pd.read_csv(file_path)
+            else:
+                df = self._open_workbook(file_path, version).parse(sheet_name)
         except ValueError as ve:
             logger.error(f"Sheet '{sheet_name}' does not exist in the file '{excel_file_name}'")
             raise ValueError(f"Sheet '{sheet_name}' does not exist in the file '{excel_file_name}'.") from ve
         except Exception as e:
             logger.error(f"An unexpected error occurred while reading the sheet '{sheet_name}': {e}")
             raise ValueError(f"An unexpected error occurred while reading the sheet '{sheet_name}': {e}") from e
+        self._frames[key] = df
+        logger.info(f"Successfully read sheet '{sheet_name}' from file '{excel_file_name}'")
+        return df
+
+    def read_sheet(self, excel_file_name, sheet_name):
+        """
+        Reads the specified sheet from the Excel file.
+        :param sheet_name: The name of the sheet to read.
+        :return: A pandas DataFrame containing the data from the specified sheet.
+        :raises FileNotFoundError: If the file does not exist.
+        :raises ValueError: If there is an error reading the sheet.
+        """
+        logger.info(f"Attempting to read sheet '{sheet_name}' from file '{os.path.join(self.base_path, excel_file_name)}'")
+        return self._parse_sheet(excel_file_name, sheet_name).copy()
+
+    def prefetch(self, excel_file_name, sheet_names):
+        """
+        Parse the given sheets of a workbook in one pass over the open workbook, so that later read_sheet
+        calls are served from the cache. Sheets already cached are skipped.
+        :param excel_file_name: The name of the Excel file.
+        :param sheet_names: Names of the sheets to read.
+        :raises FileNotFoundError: If the file does not exist.
+        :raises ValueError: If a sheet does not exist or cannot be read.
+        """
+        for sheet_name in dict.fromkeys(sheet_names):
+            self._parse_sheet(excel_file_name, sheet_name)
+
+    def close(self):
+        """
+        Close the open workbook handles. Parsed sheets stay cached.
+        """
+        for _, workbook in self._workbooks.values():
+            workbook.close()
+        self._workbooks = {}
 
     def validate_columns(self, df, required_columns):
         """
@@ -0,0 +1,370 @@
+import numpy as np
+import pandas as pd
+from src.common.constants import InitializationConstants, PopulationCodes
+from src.config.simulation_config import ExperimentConfig
+from src.common.logger import logger
+
+
+class Population:
+    """
+    Struct-of-arrays population store. Every individual is one slot across a set of compact
+    typed columns; sex, race and drinking stage are integer codes defined by PopulationCodes.
+    Conversion to and from the pandas representation (string 'Composite' and 'Drinking_Stage')
+    only happens at the edges through from_dataframe and to_dataframe.
+
+    Columns live in preallocated buffers with reserved tail space: appending a block writes into the tail and
+    only reallocates (by ExperimentConfig.POPULATION_GROWTH_FACTOR) when the capacity is exhausted, so appends
+    cost O(new individuals) amortized. The store also owns the running ID counter (next_id).
+
+    Deaths are recorded as tombstones in the alive mask rather than by removing rows. Column views cover every
+    slot, dead or alive, so readers either index them with the alive mask or use living(name); len() counts the
+    living only. The slots of the dead are reclaimed by compact(), which runs once the dead fraction crosses
+    ExperimentConfig.POPULATION_COMPACTION_THRESHOLD (see compact_if_needed) and before any snapshot.
+
+    fork() shares the buffers between two stores copy-on-write: shared buffers are flagged read-only and a store
+    copies a buffer the first time it writes to it. Code that modifies a column in place gets its view from
+    writable(name) rather than column(name).
+    """
+
+    COLUMN_DTYPES = {
+        InitializationConstants.ID_KEY: np.int64,
+        InitializationConstants.AGE_KEY: np.uint8,
+        InitializationConstants.GENDER_KEY: np.uint8,
+        InitializationConstants.RACE_KEY: np.uint8,
+        InitializationConstants.DRINKING_STAGE_KEY: np.uint8,
+        InitializationConstants.IMMIGRATION_KEY: np.bool_,
+    }
+
+    def __init__(self, columns=None, capacity=0, next_id=None):
+        """
+        Initialize the population store. Every individual passed in is alive.
+
+        :param columns: Optional dictionary of column name to array-like. Missing columns are empty.
+        :param capacity: Minimum number of slots to reserve space for.
+        :param next_id: First ID handed out to appended individuals. Defaults to one past the largest ID.
+        :raises ValueError: If the columns do not all have the same length.
+        """
+        columns = columns or {}
+        columns = {name: np.asarray(columns.get(name, []), dtype=dtype) for name, dtype in self.COLUMN_DTYPES.items()}
+        lengths = {len(array) for array in columns.values()}
+        if len(lengths) > 1:
+            logger.error(f"Population columns have different lengths: {lengths}")
+            raise ValueError(f"Population columns have different lengths: {lengths}")
+        self.size = lengths.pop()
+        self.dead_count = 0
+
+        self._buffers = {name: np.empty(max(self.size, capacity), dtype=dtype) for name, dtype in self.COLUMN_DTYPES.items()}
+        for name, array in columns.items():
+            self._buffers[name][:self.size] = array
+        self._alive = np.ones(max(self.size, capacity), dtype=bool)
+
+        if next_id is None:
+            next_id = int(self.id.max()) + 1 if self.size else 0
+        self.next_id = next_id
+
+    def __len__(self):
+        return self.size - self.dead_count
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name):
+        """
+        Return a view of the given column over every slot, including tombstoned ones. The view is read-only
+        while the buffer is shared with a fork (use writable to modify it), and it no longer refers to the store
+        once the store grows or compacts, so it should not be kept across appends or deaths.
+
+        :param name: Column name, one of COLUMN_DTYPES.
+        :return: numpy array of length self.size.
+        """
+        return self._buffers[name][:self.size]
+
+    def writable(self, name):
+        """
+        Return a view of the given column that can be modified in place, copying the buffer first if it is
+        shared with a fork.
+
+        :param name: Column name, one of COLUMN_DTYPES.
+        :return: numpy array of length self.size.
+        """
+        self._make_private(name)
+        return self.column(name)
+
+    def _make_private(self, name=None):
+        """
+        Copy a buffer shared with a fork so that this store owns it.
+
+        :param name: Column name, or None for the alive mask.
+        """
+        buffer = self._alive if name is None else self._buffers[name]
+        if buffer.flags.writeable:
+            return
+        if name is None:
+            self._alive = buffer.copy()
+        else:
+            self._buffers[name] = buffer.copy()
+
+    def living(self, name):
+        """
+        Return the values of the given column for living individuals only. This is the column view itself
+        when there are no tombstones, and a copy otherwise.
+
+        :param name: Column name, one of COLUMN_DTYPES.
+        :return: numpy array of length len(self).
+        """
+        if self.dead_count == 0:
+            return self.column(name)
+        return self.column(name)[self.alive]
+
+    @property
+    def alive(self):
+        """
+        Alive mask over every slot; False marks a tombstone.
+        """
+        return self._alive[:self.size]
+
+    @property
+    def id(self):
+        return self.column(InitializationConstants.ID_KEY)
+
+    @property
+    def age(self):
+        return self.column(InitializationConstants.AGE_KEY)
+
+    @property
+    def sex(self):
+        return self.column(InitializationConstants.GENDER_KEY)
+
+    @property
+    def race(self):
+        return self.column(InitializationConstants.RACE_KEY)
+
+    @property
+    def drinking_stage(self):
+        return self.column(InitializationConstants.DRINKING_STAGE_KEY)
+
+    @property
+    def immigration(self):
+        return self.column(InitializationConstants.IMMIGRATION_KEY)
+
+    @property
+    def composite(self):
+        """
+        Composite code (SEX * len(RACES) + RACE) of every slot.
+        """
+        return self.sex.astype(np.intp) * len(PopulationCodes.RACES) + self.race
+
+    @property
+    def capacity(self):
+        """
+        Number of slots the buffers can hold without reallocating.
+        """
+        return len(self._buffers[InitializationConstants.ID_KEY])
+
+    @property
+    def dead_fraction(self):
+        """
+        Fraction of the occupied slots that are tombstones.
+        """
+        return self.dead_count / self.size if self.size else 0.0
+
+    @property
+    def nbytes(self):
+        """
+        Memory used by the occupied slots, in bytes (reserved tail space excluded).
+        """
+        return sum(self.column(name).nbytes for name in self.COLUMN_DTYPES) + self.alive.nbytes
+
+    def reserve(self, capacity):
+        """
+        Make sure the buffers can hold at least the given number of slots.
+
+        :param capacity: Required capacity.
+        """
+        if capacity <= self.capacity:
+            return
+        for name, buffer in self._buffers.items():
+            new_buffer = np.empty(capacity, dtype=buffer.dtype)
+            new_buffer[:self.size] = buffer[:self.size]
+            self._buffers[name] = new_buffer
+        alive = np.ones(capacity, dtype=bool)
+        alive[:self.size] = self.alive
+        self._alive = alive
+
+    def append(self, columns):
+        """
+        Append a block of living individuals into the reserved tail space, growing the buffers geometrically
+        when they are full. The ID counter is advanced past the appended IDs.
+
+        :param columns: Dictionary of column name to array, one entry per column in COLUMN_DTYPES.
+        :raises ValueError: If the block columns do not all have the same length.
+        """
+        block_size = {len(columns[name]) for name in self.COLUMN_DTYPES}
+        if len(block_size) > 1:
+            logger.error(f"Population columns have different lengths: {block_size}")
+            raise ValueError(f"Population columns have different lengths: {block_size}")
+        block_size = block_size.pop()
+        if block_size == 0:
+            return
+
+        new_size = self.size + block_size
+        if new_size > self.capacity:
+            self.reserve(max(new_size, int(self.capacity * ExperimentConfig.POPULATION_GROWTH_FACTOR)))
+        for name in self.COLUMN_DTYPES:
+            self._make_private(name)
+        self._make_private()
+        for name, buffer in self._buffers.items():
+            buffer[self.size:new_size] = columns[name]
+        self._alive[self.size:new_size] = True
+        self.size = new_size
+        self.next_id = max(self.next_id, int(np.max(columns[InitializationConstants.ID_KEY])) + 1)
+
+    def mark_dead(self, slots):
+        """
+        Tombstone the given slots. Their data stays in place until the next compaction.
+
+        :param slots: Integer slot indices of individuals who died. Slots that are already dead are ignored.
+        """
+        slots = np.unique(slots)
+        slots = slots[self.alive[slots]]
+        self._make_private()
+        self.alive[slots] = False
+        self.dead_count += len(slots)
+
+    def set_alive(self, mask):
+        """
+        Replace the alive mask, e.g. to replay who exists in a given year of a recorded demographic backbone.
+        Unlike mark_dead, slots can be brought back to life.
+
+        :param mask: Boolean array of length self.size.
+        """
+        self._make_private()
+        self.alive[:] = mask
+        self.dead_count = self.size - int(np.count_nonzero(self.alive))
+
+    def keep(self, mask):
+        """
+        Keep only the living individuals selected by a boolean mask, compacting them at the head of the
+        buffers. Tombstones are always dropped.
+
+        :param mask: Boolean array of length self.size.
+        """
+        kept = np.flatnonzero(mask & self.alive)
+        for name in self.COLUMN_DTYPES:
+            self._make_private(name)
+        self._make_private()
+        for buffer in self._buffers.values():
+            buffer[:len(kept)] = buffer[kept]
+        self._alive[:len(kept)] = True
+        self.size = len(kept)
+        self.dead_count = 0
+
+    def compact(self):
+        """
+        Reclaim the slots of tombstoned individuals, preserving the order of the living.
+        """
+        if self.dead_count:
+            logger.info(f"Compacting population store: {self.dead_count} tombstones out of {self.size} slots.")
+            self.keep(self.alive)
+
+    def compact_if_needed(self, threshold=None):
+        """
+        Compact the store when the dead fraction reaches the threshold.
+
+        :param threshold: Dead fraction that triggers compaction. Defaults to
+                          ExperimentConfig.POPULATION_COMPACTION_THRESHOLD.
+        :return: True if the store was compacted.
+        """
+        threshold = ExperimentConfig.POPULATION_COMPACTION_THRESHOLD if threshold is None else threshold
+        if self.dead_count and self.dead_fraction >= threshold:
+            self.compact()
+            return True
+        return False
+
+    def copy(self):
+        """
+        Return an independent, compacted copy of the living population.
+        """
+        return Population({name: self.living(name).copy() for name in self.COLUMN_DTYPES}, next_id=self.next_id)
+
+    def fork(self):
+        """
+        Return a copy of the population that shares the buffers of this store copy-on-write. Forking costs
+        no copy; each store copies a column only when it first modifies it, so branches continuing from a
+        common state only pay for the columns they change.
+
+        :return: Population instance.
+        """
+        for buffer in list(self._buffers.values()) + [self._alive]:
+            buffer.flags.writeable = False
+        forked = Population.__new__(Population)
+        forked._buffers = dict(self._buffers)
+        forked._alive = self._alive
+        forked.size = self.size
+        forked.dead_count = self.dead_count
+        forked.next_id = self.next_id
+        return forked
+
+    def to_counts(self):
+        """
+        Count the living individuals of every (age, sex, race, drinking stage, immigrant) cell in a single
+        bincount pass.
+
+        :return: Integer array of shape PopulationCodes.COUNT_TENSOR_SHAPE.
+        """
+        cell_index = np.ravel_multi_index(
+            tuple(self.living(name) for name in (InitializationConstants.AGE_KEY, InitializationConstants.GENDER_KEY,
+                                                 InitializationConstants.RACE_KEY, InitializationConstants.DRINKING_STAGE_KEY,
+                                                 InitializationConstants.IMMIGRATION_KEY)),
+            PopulationCodes.COUNT_TENSOR_SHAPE)
+        return np.bincount(cell_index, minlength=int(np.prod(PopulationCodes.COUNT_TENSOR_SHAPE))).reshape(
+            PopulationCodes.COUNT_TENSOR_SHAPE)
+
+    @classmethod
+    def from_dataframe(cls, population_df):
+        """
+        Build a population store from the pandas representation used at the edges of the simulation.
+        Rows whose 'Alive' column is False are dropped.
+
+        :param population_df: DataFrame with 'ID', 'Age', 'Composite', 'Drinking_Stage' and 'Immigration' columns.
+        :return: Population instance.
+        :raises ValueError: If a composite or drinking stage value is unknown.
+        """
+        if InitializationConstants.ALIVE_KEY in population_df:
+            population_df = population_df[population_df[InitializationConstants.ALIVE_KEY].to_numpy(dtype=bool)]
+
+        composite_codes = pd.Index(PopulationCodes.COMPOSITES).get_indexer(population_df['Composite'].astype(str))
+        stage_codes = pd.Index(PopulationCodes.DRINKING_STAGES).get_indexer(
+            population_df[InitializationConstants.DRINKING_STAGE_KEY].astype(str))
+        if (composite_codes < 0).any() or (stage_codes < 0).any():
+            logger.error("Population contains unknown composite or drinking stage values.")
+            raise ValueError("Population contains unknown composite or drinking stage values.")
+
+        return cls({
+            InitializationConstants.ID_KEY: population_df[InitializationConstants.ID_KEY].to_numpy(),
+            InitializationConstants.AGE_KEY: np.minimum(population_df[InitializationConstants.AGE_KEY].to_numpy(),
+                                                        PopulationCodes.MAX_AGE),
+            InitializationConstants.GENDER_KEY: composite_codes // len(PopulationCodes.RACES),
+            InitializationConstants.RACE_KEY: composite_codes % len(PopulationCodes.RACES),
+            InitializationConstants.DRINKING_STAGE_KEY: stage_codes,
+            InitializationConstants.IMMIGRATION_KEY: population_df[InitializationConstants.IMMIGRATION_KEY].to_numpy(dtype=bool),
+        })
+
+    def to_dataframe(self):
+        """
+        Convert the living population to the pandas representation used at the edges of the simulation.
+
+        :return: DataFrame with 'Age', 'ID', 'Alive', 'Immigration', 'Composite' and 'Drinking_Stage' columns;
+                 'Composite' and 'Drinking_Stage' are categorical.
+        """
+        sex = self.living(InitializationConstants.GENDER_KEY).astype(np.intp)
+        composite = sex * len(PopulationCodes.RACES) + self.living(InitializationConstants.RACE_KEY)
+        return pd.DataFrame({
+            InitializationConstants.AGE_KEY: self.living(InitializationConstants.AGE_KEY).astype(np.int64),
+            InitializationConstants.ID_KEY: self.living(InitializationConstants.ID_KEY).copy(),
+            InitializationConstants.ALIVE_KEY: np.ones(len(self), dtype=bool),
+            InitializationConstants.IMMIGRATION_KEY: self.living(InitializationConstants.IMMIGRATION_KEY).copy(),
+            'Composite': pd.Categorical.from_codes(composite, categories=PopulationCodes.COMPOSITES),
+            InitializationConstants.DRINKING_STAGE_KEY: pd.Categorical.from_codes(
+                self.living(InitializationConstants.DRINKING_STAGE_KEY), categories=PopulationCodes.DRINKING_STAGES),
+        })
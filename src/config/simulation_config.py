@@ -8,8 +8,22 @@ class ExperimentConfig:
     BASED_PATH = "test/data/input_data/"
     EXCEL_FILE_NAME = "Data_AUD_Grant_Input_472025.xlsx"
     CSV_OUTPUT_FILE = "simulation_output_general_transition_probability.csv"
+    OUTPUT_DIR = "test/data/out_data"
+    RESULT_SINK = "csv"  # "csv", "parquet" (requires pyarrow) or "memory" (rows returned by Simulator.simulate)
+    CUBE_OUTPUT_FILE = None  # e.g. "simulation_output_cube.npz" to also save the full count cube of every output year
+    CHECKPOINT_YEARS = []  # e.g. [2010, 2023] to save the simulation state at the end of these years
+    CHECKPOINT_FILE_NAME = "checkpoint_{year}.npz"
+    LOOKUP_GENERATION_WORKERS = 1  # > 1 runs the lookup generators concurrently (LookupTablesGenerator)
+    LOOKUP_GENERATION_EXECUTOR = "process"  # "process" or "thread" pool for concurrent lookup generation
+    LOOKUP_CACHE_DIR = None  # e.g. "test/data/cache_data" to reuse compiled lookup tables keyed by input content (LookupTablesCache)
     START_YEAR_OUTPUT = 2001
     END_YEAR_OUTPUT = 2023
+    VECTORIZED_INITIAL_POPULATION = True
+    POPULATION_GROWTH_FACTOR = 1.5
+    POPULATION_COMPACTION_THRESHOLD = 0.25
+    REPLICATE_WORKERS = None  # worker processes of ReplicateRunner; None uses every CPU
+    POPULATION_SHARDS = 1  # worker processes splitting the agent population (ShardedSimulator); 1 runs unsharded
+    SIMULATION_ENGINE = "agent"  # "agent" (one row per individual) or "cohort" (count tensor)
 
 
 class ExperimentValid:
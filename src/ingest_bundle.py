@@ -0,0 +1,78 @@
+import argparse
+import os
+import time
+from src.initialization.model_bundle import ModelBundle
+from src.config.simulation_config import ExperimentConfig
+from src.common.logger import logger
+
+# Sheet and column name arguments of LookupTablesGenerator.create_lookup_tables for the bundled input workbooks
+DEFAULT_SHEET_ARGUMENTS = {
+    "birth_rate_sheet": "Birth",
+    "birth_male_ratio_sheet": "Sex_Ratio_At_Birth",
+    "birth_race_sheet_name": "Race_Sex_Age",
+    "death_sheet_name": "Death_Rate_Data",
+    "death_rate_column_name": "Rate",
+    "immigration_age_sheet": "Age_Ratio_All_Years",
+    "immigration_sex_sheet": "Sex_Ratio_All_Years",
+    "immigration_race_sheet": "Race_Sex_Age",
+    "immigration_rate_sheet": "Immigration",
+    "drinking_transition_sheet_name": "Drinking_TransitionProbability",
+    "initial_population_age_sheet": "Initial_Population",
+    "initial_population_sex_sheet": "Sex_Average",
+    "initial_population_race_sheet": "Race_Sex_Age",
+    "drinking_prevalence_sheet_name": "Drinking_Prevalence",
+}
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate the model input workbooks and CSV files and write them as one model bundle, "
+                    "loadable with SimulationRunner(bundle_dir=...).")
+    parser.add_argument("bundle_dir", help="Directory of the bundle to write; an existing bundle is replaced.")
+    parser.add_argument("--base-path", default="test/data/input_data", help="Directory of the input files.")
+    parser.add_argument("--excel-file", default="Data_AUD_Grant_Input_472025.xlsx", help="Main input workbook.")
+    parser.add_argument("--transition-file", default="Drinking_Stage_Transition_Probabilities.xlsx",
+                        help="Drinking transition workbook.")
+    parser.add_argument("--prevalence-file", default="Drinking_Stage_Prevalences_2000.xlsx",
+                        help="Initial drinking prevalence workbook.")
+    parser.add_argument("--death-file", default=None,
+                        help="Workbook or CSV file of the death rates, with a rate for every year, Sex_Race composite "
+                             "and age. Defaults to the main workbook.")
+    parser.add_argument("--allow-missing-death-rates", action="store_true",
+                        help="Write the bundle even if death rows cannot be compiled or rates are missing; "
+                             "individuals without a rate die.")
+    parser.add_argument("--initial-year", type=int, default=ExperimentConfig.INITIAL_YEAR,
+                        help="First simulated year; the bundle can only be loaded with this INITIAL_YEAR.")
+    parser.add_argument("--end-year", type=int, default=ExperimentConfig.END_YEAR,
+                        help="Last year covered by the bundle.")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="Do not load the written bundle back to check it.")
+    for name, default in DEFAULT_SHEET_ARGUMENTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default=default, help=f"Default: {default}.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Ingest command: build and validate the lookup tables once and write them as a model bundle.
+
+    :param argv: Command line arguments. Defaults to sys.argv.
+    :return: The manifest of the written bundle.
+    """
+    arguments = parse_arguments(argv)
+    ExperimentConfig.INITIAL_YEAR = arguments.initial_year
+    ExperimentConfig.END_YEAR = arguments.end_year
+
+    start_time = time.time()
+    manifest = ModelBundle.ingest(arguments.bundle_dir, arguments.base_path, arguments.excel_file,
+                                  arguments.transition_file, arguments.prevalence_file,
+                                  death_file_name=os.path.abspath(arguments.death_file) if arguments.death_file else None,
+                                  verify=not arguments.no_verify,
+                                  allow_missing_death_rates=arguments.allow_missing_death_rates,
+                                  **{name: getattr(arguments, name) for name in DEFAULT_SHEET_ARGUMENTS})
+    logger.info(f"Ingested model bundle {arguments.bundle_dir} in {time.time() - start_time:.2f} seconds.")
+    return manifest
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,9 @@ import pandas as pd
 
 from src.common.logger import logger
 from src.config.simulation_config import ExperimentConfig
-from src.common.common import Common_RNG
-from src.common.constants import InitializationConstants
+from src.common.common import Common_RNG, Common_CounterRNG, Common_Sampling
+from src.common.constants import InitializationConstants, PopulationCodes, RandomStreams
+from src.common.population import Population
 
 
 class PopulationInitializer:
@@ -159,6 +160,167 @@ class PopulationInitializer:
         adjusted_population = [{InitializationConstants.AGE_KEY: age} for age, count in population_counter.items() for _ in range(count)]
         return adjusted_population
 
+    def _adjust_population_vectorized(self, age_counts, adjustment, rng):
+        """
+        Vectorized counterpart of _adjust_population working on per-age counts.
+
+        :param age_counts: Array with the number of individuals per age, aligned with age_distribution_dict.
+        :param adjustment: The number of individuals to add (positive) or remove (negative).
+        :param rng: np.random.Generator used to draw the ages to add or remove.
+        :return: Adjusted array of per-age counts.
+        """
+        age_weights = np.array(list(self.age_distribution_dict.values()), dtype=np.float64)
+        age_weights = age_weights / age_weights.sum()
+        drawn = np.bincount(rng.choice(len(age_weights), size=abs(adjustment), p=age_weights),
+                            minlength=len(age_weights))
+
+        if adjustment > 0:
+            logger.debug(f"Adding {adjustment} individuals to the population.")
+            return age_counts + drawn
+
+        logger.debug(f"Removing {abs(adjustment)} individuals from the population.")
+        return age_counts - np.minimum(age_counts, drawn)
+
+    def _build_race_cdf(self):
+        """
+        Build the race cumulative distributions indexed by [age group, sex code].
+
+        :return: Array of shape (len(AGE_GROUPS), len(SEXES), len(RACES)).
+        """
+        race_cdf = np.zeros((len(InitializationConstants.AGE_GROUPS), len(PopulationCodes.SEXES), len(PopulationCodes.RACES)))
+        for group_index, (_, _, age_group) in enumerate(InitializationConstants.AGE_GROUPS):
+            for sex_code, sex in enumerate(PopulationCodes.SEXES):
+                race_ratios = self.race_distribution_dict.get((age_group, sex))
+                if race_ratios is None:
+                    logger.error(f"Missing race distribution for age group: {age_group}, gender: {sex}")
+                    raise KeyError(f"Missing race distribution for age group: {age_group}, gender: {sex}")
+                race_cdf[group_index, sex_code] = Common_Sampling.build_cdf(
+                    [race_ratios.get(race, 0) for race in PopulationCodes.RACES])
+        return race_cdf
+
+    def _compute_age_counts(self, rng):
+        """
+        Number of individuals of each age of age_distribution_dict, adjusted so that they add up to the
+        configured total population.
+
+        :param rng: np.random.Generator used for the adjustment.
+        :return: Tuple (ages_available, age_counts) of integer arrays aligned with age_distribution_dict.
+        """
+        ages_available = np.array([int(age) for age in self.age_distribution_dict.keys()], dtype=np.int64)
+        age_ratios = np.array(list(self.age_distribution_dict.values()), dtype=np.float64)
+        age_counts = (self.total_population * age_ratios).astype(np.int64)
+
+        adjustment = self.total_population - int(age_counts.sum())
+        if adjustment != 0:
+            logger.debug(f"Adjusting population size by {adjustment} individuals.")
+            age_counts = self._adjust_population_vectorized(age_counts, adjustment, rng)
+
+        assert age_counts.sum() == self.total_population, (
+            f"Final population size ({age_counts.sum()}) does not match the configured total ({self.total_population})."
+            )
+        return ages_available, age_counts
+
+    def generate_initial_population_columns(self):
+        """
+        Array-based counterpart of generate_initial_population. Ages, sex, race, composite and drinking
+        stage are drawn as whole NumPy columns from the initial population stream of Common_CounterRNG,
+        so the result follows the same marginal distributions and is reproducible for a given seed.
+
+        :return: Population store holding the initial population.
+        """
+        logger.info("Generating initial population (vectorized)...")
+        logger.info(f"Population generation started with total population: {self.total_population}")
+        start_time = time.time()
+        rng = Common_CounterRNG(self.seed).generator(ExperimentConfig.INITIAL_YEAR, RandomStreams.INITIAL_POPULATION)
+        ages_available, age_counts = self._compute_age_counts(rng)
+
+        age_index = np.repeat(np.arange(len(ages_available)), age_counts)
+        ages = ages_available[age_index]
+        population_size = len(ages)
+
+        missing_sex_ages = [age for age in ages_available[age_counts > 0] if age not in self.sex_distribution_dict]
+        if missing_sex_ages:
+            logger.error(f"Missing gender ratio for ages: {missing_sex_ages}")
+            raise KeyError(f"Missing gender ratio for ages: {missing_sex_ages}")
+        male_ratios = np.array([self.sex_distribution_dict.get(age, 0) for age in ages_available], dtype=np.float64)
+        sex_codes = np.where(rng.random(population_size) < male_ratios[age_index],
+                             PopulationCodes.SEXES.index(InitializationConstants.MALE),
+                             PopulationCodes.SEXES.index(InitializationConstants.FEMALE))
+
+        age_group_codes = Common_Sampling.get_age_group_codes(ages, InitializationConstants.AGE_GROUPS)
+        race_cdf = self._build_race_cdf()
+        race_codes = Common_Sampling.sample_from_cdf(race_cdf[age_group_codes, sex_codes], rng.random(population_size))
+        composite_codes = sex_codes * len(PopulationCodes.RACES) + race_codes
+
+        drinking_age_groups, drinking_cdf = Common_Sampling.build_drinking_status_cdf(self.drinking_distribution_df)
+        drinking_stage_codes = Common_Sampling.sample_drinking_stages(
+            drinking_age_groups, drinking_cdf, ages, composite_codes, rng.random(population_size))
+
+        population = Population({
+            InitializationConstants.ID_KEY: np.arange(population_size, dtype=np.int64),
+            InitializationConstants.AGE_KEY: ages,
+            InitializationConstants.GENDER_KEY: sex_codes,
+            InitializationConstants.RACE_KEY: race_codes,
+            InitializationConstants.DRINKING_STAGE_KEY: drinking_stage_codes,
+            InitializationConstants.IMMIGRATION_KEY: np.zeros(population_size, dtype=bool),
+        })
+
+        elapsed_time = time.time() - start_time
+        logger.info(
+            f"Population generation complete. Total Population Generated: {population_size}, "
+            f"Configured Initial Population: {self.total_population}, Time Taken: {elapsed_time:.2f} seconds"
+        )
+        return population
+
+    def generate_initial_population_counts(self):
+        """
+        Count-tensor counterpart of generate_initial_population_columns for the cohort engine. The same age
+        counts are split by sex with one binomial draw per age, by race and by drinking stage with one
+        multinomial draw per cell, so no individual is materialized and the full-scale population
+        (INITIAL_POP_COEFFICIENT = 1) costs the same as a scaled-down one.
+
+        :return: Integer array of shape PopulationCodes.COUNT_TENSOR_SHAPE.
+        :raises KeyError: If a sex ratio or drinking distribution is missing for a populated cell.
+        """
+        logger.info("Generating initial population counts...")
+        rng = Common_CounterRNG(self.seed).generator(ExperimentConfig.INITIAL_YEAR, RandomStreams.INITIAL_POPULATION)
+        ages_available, age_counts = self._compute_age_counts(rng)
+
+        missing_sex_ages = [age for age in ages_available[age_counts > 0] if age not in self.sex_distribution_dict]
+        if missing_sex_ages:
+            logger.error(f"Missing gender ratio for ages: {missing_sex_ages}")
+            raise KeyError(f"Missing gender ratio for ages: {missing_sex_ages}")
+        male_ratios = np.array([self.sex_distribution_dict.get(age, 0) for age in ages_available], dtype=np.float64)
+        male_counts = rng.binomial(age_counts, male_ratios)
+        sex_counts = np.zeros((len(ages_available), len(PopulationCodes.SEXES)), dtype=np.int64)
+        sex_counts[:, PopulationCodes.SEXES.index(InitializationConstants.MALE)] = male_counts
+        sex_counts[:, PopulationCodes.SEXES.index(InitializationConstants.FEMALE)] = age_counts - male_counts
+
+        age_group_codes = Common_Sampling.get_age_group_codes(ages_available, InitializationConstants.AGE_GROUPS)
+        race_probabilities = Common_Sampling.cdf_to_probabilities(self._build_race_cdf()[age_group_codes])
+        race_counts = rng.multinomial(sex_counts, race_probabilities)
+
+        ages = np.minimum(ages_available, PopulationCodes.MAX_AGE)
+        drinking_probabilities = Common_Sampling.get_drinking_status_probabilities_by_age(
+            *Common_Sampling.build_drinking_status_cdf(self.drinking_distribution_df))[ages]
+        if (np.isnan(drinking_probabilities).any(axis=-1) & (race_counts > 0)).any():
+            logger.error("Missing drinking distribution for some age group and composite combinations.")
+            raise KeyError("Missing drinking distribution for some age group and composite combinations.")
+        stage_counts = rng.multinomial(race_counts, np.nan_to_num(drinking_probabilities))
+
+        counts = np.zeros(PopulationCodes.COUNT_TENSOR_SHAPE, dtype=np.int64)
+        np.add.at(counts[..., 0], ages, stage_counts)
+        logger.info(f"Population count generation complete. Total Population Generated: {counts.sum()}")
+        return counts
+
+    def generate_initial_population_vectorized(self):
+        """
+        Vectorized counterpart of generate_initial_population returning the same DataFrame layout.
+
+        :return: DataFrame built from generate_initial_population_columns.
+        """
+        return self.generate_initial_population_columns().to_dataframe()
+
     def generate_initial_population(self):
         """
         Generate a simulated population with individuals based on age, gender, and race proportions.
@@ -1,6 +1,7 @@
 from src.common.logger import logger
 from src.initialization.initial_population_generator import PopulationInitializer
 from src.initialization.lookup_tables_generator import LookupTablesGenerator
+from src.config.simulation_config import ExperimentConfig
 import time
 
 class Initializer:
@@ -44,6 +45,23 @@ class Initializer:
         logger.info("Population initialization complete.")
         return initial_population
     
+    @staticmethod
+    def generate_initial_population(lookup_tables):
+        """
+        Generate the initial population from the initial population lookup tables.
+
+        :param lookup_tables: Dictionary of lookup tables, from the workbooks or a model bundle.
+        :return: The initial population, as columns if ExperimentConfig.VECTORIZED_INITIAL_POPULATION is set.
+        """
+        population_initializer = PopulationInitializer(lookup_tables['initial_pop_age_lookup'],
+                                   lookup_tables['initial_pop_sex_lookup'], 
+                                   lookup_tables['initial_pop_race_lookup'],
+                                   lookup_tables['initial_pop_drinking_status_lookup'],)
+
+        if ExperimentConfig.VECTORIZED_INITIAL_POPULATION:
+            return population_initializer.generate_initial_population_columns()
+        return population_initializer.generate_initial_population()
+
     def initialize_simulation(self, 
                               birth_rate_sheet: str, 
                               birth_male_ratio_sheet: str, 
@@ -58,7 +76,8 @@ class Initializer:
                               initial_population_age_sheet: str, 
                               initial_population_sex_sheet: str, 
                               initial_population_race_sheet: str,
-                              drinking_prevalence_sheet_name: str):
+                              drinking_prevalence_sheet_name: str,
+                              generate_population: bool = True):
         """
         Initialize the simulation by generating lookup tables and the initial population.
 
@@ -74,7 +93,9 @@ class Initializer:
         :param initial_population_age_sheet: Name of the sheet containing initial population age data.
         :param initial_population_sex_sheet: Name of the sheet containing initial population sex data.
         :param initial_population_race_sheet: Name of the sheet containing initial population race data.
-        :return: A tuple containing the lookup tables and the initial population.
+        :param generate_population: Whether to generate the initial population. A run resumed from a checkpoint
+                                    only needs the lookup tables.
+        :return: A tuple containing the lookup tables and the initial population (None if not generated).
         """
         logger.info("Initializing simulation...")
 
@@ -98,13 +119,12 @@ class Initializer:
         end_time = time.time()
         logger.info(f"Lookup tables generation took {end_time - start_time:.2f} seconds.")
 
-        start_time = time.time()
-        population_initializer = PopulationInitializer(lookup_tables['initial_pop_age_lookup'],
-                                   lookup_tables['initial_pop_sex_lookup'], 
-                                   lookup_tables['initial_pop_race_lookup'],
-                                   lookup_tables['initial_pop_drinking_status_lookup'],)
+        if not generate_population:
+            logger.info("Simulation initialization complete.")
+            return lookup_tables, None
 
-        initial_population = population_initializer.generate_initial_population()
+        start_time = time.time()
+        initial_population = self.generate_initial_population(lookup_tables)
         end_time = time.time()
         logger.info(f"Population initialization took {end_time - start_time:.2f} seconds.")
 
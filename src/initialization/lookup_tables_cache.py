@@ -0,0 +1,106 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from src.config.simulation_config import ExperimentConfig
+from src.common.logger import logger
+
+
+class LookupTablesCache:
+    """
+    Persistent cache of compiled lookup tables. Each entry is the pickled dictionary returned by
+    LookupTablesGenerator.create_lookup_tables, stored under the SHA-256 of everything the tables are built
+    from:
+
+    - the bytes of the input workbooks,
+    - the sheet and column names passed to create_lookup_tables,
+    - the simulated year window (ExperimentConfig.INITIAL_YEAR and END_YEAR),
+    - the source of the lookup generators and FORMAT_VERSION, so that a code change invalidates old entries.
+
+    Changing any input gives a new key, so stale entries are never read; they can be removed with clear().
+    """
+
+    FORMAT_VERSION = 1
+    GENERATOR_SOURCES = [
+        os.path.join(os.path.dirname(__file__), "lookup_tables_generator.py"),
+        os.path.join(os.path.dirname(__file__), "setting_generators", "*.py"),
+    ]
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: Directory of the cache entries; created on the first save.
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def _update_with_file(digest, file_path):
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+
+    def key(self, workbook_paths, sheet_arguments):
+        """
+        :param workbook_paths: Paths of the input workbooks.
+        :param sheet_arguments: Dictionary of the sheet and column name arguments of create_lookup_tables.
+        :return: Hexadecimal cache key.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "format_version": self.FORMAT_VERSION,
+            "sheets": sheet_arguments,
+            "years": [ExperimentConfig.INITIAL_YEAR, ExperimentConfig.END_YEAR],
+        }, sort_keys=True).encode())
+        for file_path in workbook_paths:
+            self._update_with_file(digest, file_path)
+        for pattern in self.GENERATOR_SOURCES:
+            for file_path in sorted(glob.glob(pattern)):
+                self._update_with_file(digest, file_path)
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"lookup_tables_{key}.pkl")
+
+    def load(self, key):
+        """
+        :param key: Cache key.
+        :return: The cached lookup tables, or None if there is no readable entry for the key.
+        """
+        entry_path = self._entry_path(key)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, "rb") as file:
+                lookup_tables = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            logger.warning(f"Ignoring unreadable lookup table cache entry {entry_path}: {e}")
+            return None
+        logger.info(f"Loaded lookup tables from cache {entry_path}")
+        return lookup_tables
+
+    def save(self, key, lookup_tables):
+        """
+        Store lookup tables under a key. The entry is written to a temporary file and renamed, so concurrent
+        runs never read a partial entry.
+
+        :param key: Cache key.
+        :param lookup_tables: Dictionary of lookup tables.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(lookup_tables, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._entry_path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+        logger.info(f"Saved lookup tables to cache {self._entry_path(key)}")
+
+    def clear(self):
+        """
+        Remove every cache entry.
+        """
+        for entry_path in glob.glob(os.path.join(self.cache_dir, "lookup_tables_*.pkl")):
+            os.remove(entry_path)
@@ -3,7 +3,28 @@ from src.initialization.setting_generators.death_lookup_generator import DeathLo
 from src.initialization.setting_generators.immigration_lookup_generator import ImmigrationLookupGenerator
 from src.initialization.setting_generators.initial_population_lookup_generator import InitialPopulationLookupGenerator
 from src.initialization.setting_generators.drinking_transition_lookup_generator import DrinkingStatusLookupGenerator
+from src.initialization.lookup_tables_cache import LookupTablesCache
+from src.common.data_reader import ExcelDataReader
+from src.config.simulation_config import ExperimentConfig
 from src.common.logger import logger
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+
+
+def _initialize_generator_worker(config):
+    """
+    Process pool initializer: apply the parent's configuration (the generators read the year window).
+    """
+    for name, value in config.items():
+        setattr(ExperimentConfig, name, value)
+
+
+def _run_generator(generator_class, arguments, method_name, kwargs):
+    """
+    Build a lookup generator with its own data reader and run one of its methods.
+    """
+    return getattr(generator_class(*arguments), method_name)(**kwargs)
+
 
 class LookupTablesGenerator:
 
@@ -11,22 +32,48 @@ class LookupTablesGenerator:
                  base_path: str, 
                  excel_file_name: str, 
                  excel_transition_probability_drinking_file_name: str, 
-                 excel_drinking_file_name: str):
+                 excel_drinking_file_name: str,
+                 cache_dir: str = None,
+                 death_file_name: str = None):
         """
         Initialize the LookupTablesGenerator instance with the required parameters.
 
         :param base_path: The directory path where lookup tables will be generated.
         :param excel_file_name: The name of the Excel file containing input data.
+        :param cache_dir: Directory of the persistent lookup table cache (LookupTablesCache). Defaults to
+                          ExperimentConfig.LOOKUP_CACHE_DIR; the cache is disabled when both are unset.
+        :param death_file_name: Workbook or CSV file of the death rates. Defaults to excel_file_name.
         """
         self.base_path = base_path
         self.excel_file_name = excel_file_name
         self.excel_transition_probability_drinking_file_name = excel_transition_probability_drinking_file_name
         self.excel_drinking_file_name = excel_drinking_file_name
+        self.death_file_name = death_file_name if death_file_name else excel_file_name
+        # Lookup tables already generated, keyed by generator and sheet arguments (see _generate_once)
+        self._generated = {}
+        # One reader for every generator, so that each workbook is opened and each sheet parsed once
+        self.data_reader = ExcelDataReader(base_path)
+        cache_dir = cache_dir if cache_dir else ExperimentConfig.LOOKUP_CACHE_DIR
+        self.cache = LookupTablesCache(cache_dir) if cache_dir else None
         logger.info(
             "Initialized LookupTablesGenerator with base_path: %s, excel_file_name: %s",
             base_path, excel_file_name
         )
 
+    def _generator_specs(self):
+        """
+        :return: Dictionary of generator name to (generator class, constructor arguments without the data reader).
+        """
+        return {
+            "birth": (BirthLookupGenerator, (self.base_path, self.excel_file_name)),
+            "death": (DeathLookupGenerator, (self.base_path, self.death_file_name)),
+            "immigration": (ImmigrationLookupGenerator, (self.base_path, self.excel_file_name)),
+            "drinking_transition": (DrinkingStatusLookupGenerator,
+                                    (self.base_path, self.excel_transition_probability_drinking_file_name)),
+            "initial_population": (InitialPopulationLookupGenerator,
+                                   (self.base_path, self.excel_file_name, self.excel_drinking_file_name)),
+        }
+
     def _initialize_generators(self):
         """
         Initialize all lookup table generators.
@@ -34,13 +81,40 @@ class LookupTablesGenerator:
         :return: A dictionary of initialized generators.
         """
         logger.info("Initializing all lookup generators.")
-        return {
-            "birth": BirthLookupGenerator(self.base_path, self.excel_file_name),
-            "death": DeathLookupGenerator(self.base_path, self.excel_file_name),
-            "immigration": ImmigrationLookupGenerator(self.base_path, self.excel_file_name),
-            "drinking_transition": DrinkingStatusLookupGenerator(self.base_path, self.excel_transition_probability_drinking_file_name),
-            "initial_population": InitialPopulationLookupGenerator(self.base_path, self.excel_file_name, self.excel_drinking_file_name)
-        }
+        return {name: generator_class(*arguments, self.data_reader)
+                for name, (generator_class, arguments) in self._generator_specs().items()}
+
+    def _generate_concurrently(self, tasks, pending, workers):
+        """
+        Run the pending generators in a pool of ExperimentConfig.LOOKUP_GENERATION_EXECUTOR ("process" or
+        "thread") workers. Every worker builds its generator with its own reader, so the generators do not
+        share state; each result goes through _generate_once, which keeps the error wrapping of
+        _log_and_generate.
+
+        :param tasks: Every (cache key, generator name, method name, arguments) task, in result order.
+        :param pending: The tasks whose result is not generated yet.
+        :param workers: Maximum number of workers.
+        :return: List of the results of the tasks.
+        :raises ValueError: If the configured executor is unknown.
+        """
+        executor_type = ExperimentConfig.LOOKUP_GENERATION_EXECUTOR
+        if executor_type == "process":
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_initialize_generator_worker,
+                                           initargs=({name: value for name, value in vars(ExperimentConfig).items()
+                                                      if not name.startswith("_")},))
+        elif executor_type == "thread":
+            executor = ThreadPoolExecutor(max_workers=min(workers, len(pending)))
+        else:
+            logger.error(f"Unknown lookup generation executor: {executor_type}")
+            raise ValueError(f"Unknown lookup generation executor: {executor_type}")
+
+        logger.info(f"Generating {len(pending)} lookup table groups with {min(workers, len(pending))} {executor_type} workers.")
+        specs = self._generator_specs()
+        with executor:
+            futures = {cache_key: executor.submit(_run_generator, *specs[generator_name], method_name, kwargs)
+                       for cache_key, generator_name, method_name, kwargs in pending}
+            return [self._generate_once(cache_key, generator_name, futures[cache_key].result if cache_key in futures else None)
+                    for cache_key, generator_name, _, _ in tasks]
 
     def _log_and_generate(self, generator_name: str, generator_method, **kwargs):
         """
@@ -60,6 +134,43 @@ class LookupTablesGenerator:
             logger.error(f"Failed to generate {generator_name} lookup tables: {e}")
             raise RuntimeError(f"Error generating {generator_name} lookup tables.") from e
 
+    def _prefetch_sheets(self, sheets):
+        """
+        Parse the sheets of every generator with the shared reader. Sheets shared by several generators are
+        parsed once. Like _log_and_generate, a read failure is reported with the generator it belongs to.
+
+        :param sheets: List of (generator name, workbook name, sheet names).
+        :raises RuntimeError: If a workbook or sheet cannot be read, naming the generator, workbook and sheet.
+        """
+        for generator_name, file_name, sheet_names in sheets:
+            for sheet_name in sheet_names:
+                try:
+                    self.data_reader.prefetch(file_name, [sheet_name])
+                except (FileNotFoundError, ValueError) as e:
+                    logger.error(f"Failed to read sheet '{sheet_name}' of '{file_name}' for the {generator_name} "
+                                 f"lookup tables: {e}")
+                    raise RuntimeError(f"Error generating {generator_name} lookup tables: cannot read sheet "
+                                       f"'{sheet_name}' of '{file_name}'.") from e
+
+    def _generate_once(self, cache_key, generator_name: str, generator_method, **kwargs):
+        """
+        Same as _log_and_generate, but a lookup table already generated for the same cache key by this
+        instance is returned without reading the workbook again. Successive calls that only change some
+        sheets (e.g. a sweep over drinking transition sheets) therefore only parse the new sheets.
+
+        :param cache_key: Hashable key identifying the generated table (generator name, simulated year window
+                          and sheet arguments).
+        :param generator_name: The name of the generator.
+        :param generator_method: The method to call for generating the lookup table.
+        :param kwargs: Additional arguments to pass to the generator method.
+        :return: The generated lookup table.
+        """
+        if cache_key not in self._generated:
+            self._generated[cache_key] = self._log_and_generate(generator_name, generator_method, **kwargs)
+        else:
+            logger.info(f"Reusing {generator_name} lookup tables.")
+        return self._generated[cache_key]
+
     def create_lookup_tables(self, 
                              birth_rate_sheet: str, 
                              birth_male_ratio_sheet: str, 
@@ -91,56 +202,109 @@ class LookupTablesGenerator:
         :param initial_population_age_sheet: Sheet name for initial population age data.
         :param initial_population_sex_sheet: Sheet name for initial population sex data.
         :param initial_population_race_sheet: Sheet name for initial population race data.
-        :return: A dictionary containing the generated lookup tables.
+        :return: A dictionary containing the generated lookup tables. Tables generated by a previous call with
+                 the same sheets and year window are reused and shared between the returned dictionaries. When the cache is
+                 enabled, tables compiled by an earlier run from the same workbooks, sheets and year window are
+                 loaded from it instead.
         """
         logger.info("Starting to create lookup tables.")
 
-        # Initialize generators
-        generators = self._initialize_generators()
+        if self.cache is not None:
+            sheet_arguments = {name: value for name, value in locals().items() if name != "self"}
+            cache_key = self.cache.key(
+                [os.path.join(self.base_path, file_name) for file_name in dict.fromkeys(
+                    (self.excel_file_name, self.excel_transition_probability_drinking_file_name, self.excel_drinking_file_name,
+                     self.death_file_name))],
+                sheet_arguments)
+            lookup_tables = self.cache.load(cache_key)
+            if lookup_tables is None:
+                lookup_tables = self._generate_lookup_tables(**sheet_arguments)
+                self.cache.save(cache_key, lookup_tables)
+            return lookup_tables
 
-        # Generate lookup tables
-        birth_lookup_tables = self._log_and_generate(
-            "birth",
-            generators["birth"].generate_all_lookup_tables,
-            birth_rate_sheet=birth_rate_sheet,
-            male_ratio_sheet=birth_male_ratio_sheet,
-            race_sheet_name=birth_race_sheet_name
-        )
+        return self._generate_lookup_tables(birth_rate_sheet, birth_male_ratio_sheet, birth_race_sheet_name,
+                                            death_sheet_name, death_rate_column_name, immigration_age_sheet,
+                                            immigration_sex_sheet, immigration_race_sheet, immigration_rate_sheet,
+                                            drinking_transition_sheet_name, initial_population_age_sheet,
+                                            initial_population_sex_sheet, initial_population_race_sheet,
+                                            drinking_prevalence_sheet_name)
 
-        death_lookup_table = self._log_and_generate(
-            "death",
-            generators["death"].load_lookup_table,
-            sheet_name=death_sheet_name,
-            column_name=death_rate_column_name
-        )
+    def _generate_lookup_tables(self, birth_rate_sheet, birth_male_ratio_sheet, birth_race_sheet_name,
+                                death_sheet_name, death_rate_column_name, immigration_age_sheet, immigration_sex_sheet,
+                                immigration_race_sheet, immigration_rate_sheet, drinking_transition_sheet_name,
+                                initial_population_age_sheet, initial_population_sex_sheet,
+                                initial_population_race_sheet, drinking_prevalence_sheet_name):
+        """
+        Generate the lookup tables of create_lookup_tables from the workbooks. The generators read independent
+        sheets; with ExperimentConfig.LOOKUP_GENERATION_WORKERS > 1 they run concurrently (see
+        _generate_concurrently), otherwise one after another from the shared reader.
+        """
+        # The generators filter the tables to the simulated years, so the year window is part of every cache key
+        years = (ExperimentConfig.INITIAL_YEAR, ExperimentConfig.END_YEAR)
+        # (cache key, generator name, method name, arguments) of every independent generator
+        tasks = [
+            (("birth", years, birth_rate_sheet, birth_male_ratio_sheet, birth_race_sheet_name), "birth",
+             "generate_all_lookup_tables",
+             dict(birth_rate_sheet=birth_rate_sheet, male_ratio_sheet=birth_male_ratio_sheet,
+                  race_sheet_name=birth_race_sheet_name)),
+            (("death", years, death_sheet_name, death_rate_column_name), "death", "load_lookup_table",
+             dict(sheet_name=death_sheet_name, column_name=death_rate_column_name)),
+            (("immigration", years, immigration_age_sheet, immigration_sex_sheet, immigration_race_sheet,
+              immigration_rate_sheet), "immigration", "generate_all_lookups",
+             dict(age_sheet=immigration_age_sheet, sex_sheet=immigration_sex_sheet, race_sheet=immigration_race_sheet,
+                  immigration_rate_sheet=immigration_rate_sheet)),
+            (("drinking_transition", years, drinking_transition_sheet_name), "drinking_transition",
+             "generate_compiled_lookup", dict(sheet_name=drinking_transition_sheet_name)),
+            (("initial_population", years, initial_population_age_sheet, initial_population_sex_sheet,
+              initial_population_race_sheet, drinking_prevalence_sheet_name), "initial_population",
+             "generate_initial_population_lookups",
+             dict(age_sheet_name=initial_population_age_sheet, sex_sheet_name=initial_population_sex_sheet,
+                  race_sheet_name=initial_population_race_sheet,
+                  drinking_prevalence_sheet_name=drinking_prevalence_sheet_name)),
+        ]
 
-        immigration_lookup_tables = self._log_and_generate(
-            "immigration",
-            generators["immigration"].generate_all_lookups,
-            age_sheet=immigration_age_sheet,
-            sex_sheet=immigration_sex_sheet,
-            race_sheet=immigration_race_sheet,
-            immigration_rate_sheet = immigration_rate_sheet
-        )
+        # Initialize generators
+        generators = self._initialize_generators()
 
-        drinking_transition_lookup_tables = self._log_and_generate(
-            "drinking_transition",
-            generators["drinking_transition"].generate_lookup,
-            sheet_name=drinking_transition_sheet_name
-        )
+        pending = [task for task in tasks if task[0] not in self._generated]
+        workers = ExperimentConfig.LOOKUP_GENERATION_WORKERS
+        if workers and workers > 1 and len(pending) > 1:
+            results = self._generate_concurrently(tasks, pending, workers)
+        else:
+            # Parse every sheet of each workbook in one pass; the generators then read them from the shared reader
+            try:
+                self._prefetch_sheets([
+                    ("birth", self.excel_file_name, [birth_rate_sheet, birth_male_ratio_sheet, birth_race_sheet_name]),
+                    ("immigration", self.excel_file_name,
+                     [immigration_age_sheet, immigration_sex_sheet, immigration_race_sheet, immigration_rate_sheet]),
+                    ("initial_population", self.excel_file_name,
+                     [initial_population_age_sheet, initial_population_sex_sheet, initial_population_race_sheet]),
+                    ("death", self.death_file_name, [death_sheet_name]),
+                    ("drinking_transition", self.excel_transition_probability_drinking_file_name,
+                     [drinking_transition_sheet_name]),
+                    ("initial_population", self.excel_drinking_file_name, [drinking_prevalence_sheet_name]),
+                ])
+            finally:
+                self.data_reader.close()
+            results = [self._generate_once(cache_key, generator_name, getattr(generators[generator_name], method_name),
+                                           **kwargs)
+                       for cache_key, generator_name, method_name, kwargs in tasks]
 
-        initial_population_lookups = self._log_and_generate(
-            "initial_population",
-            generators["initial_population"].generate_initial_population_lookups,
-            age_sheet_name=initial_population_age_sheet,
-            sex_sheet_name=initial_population_sex_sheet,
-            race_sheet_name=initial_population_race_sheet,
-            drinking_prevalence_sheet_name=drinking_prevalence_sheet_name
+        birth_lookup_tables, death_lookup_table, immigration_lookup_tables, drinking_transition_lookup_tables, \
+            initial_population_lookups = results
+
+        death_rate_array = self._generate_once(
+            ("death rate array", years, death_sheet_name, death_rate_column_name),
+            "death rate array",
+            generators["death"].compile_lookup_table,
+            lookup_table=death_lookup_table,
+            column_name=death_rate_column_name
         )
 
         lookup_tables = {
             **birth_lookup_tables,
             "death_lookup_table": death_lookup_table,
+            "death_rate_array": death_rate_array,
             **immigration_lookup_tables,
             **initial_population_lookups,
             **drinking_transition_lookup_tables,
@@ -0,0 +1,231 @@
+import datetime
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import numpy as np
+from src.initialization.lookup_tables_generator import LookupTablesGenerator
+from src.initialization.setting_generators.death_lookup_generator import DeathLookupGenerator
+from src.config.simulation_config import ExperimentConfig
+from src.common.common import Common_Fingerprint
+from src.common.logger import logger
+
+
+class _BundleArray:
+    """
+    Placeholder of a lookup array stored as a .npy file of the bundle.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+
+class ModelBundle:
+    """
+    Compiled model inputs in one portable directory, built once from the input workbooks (and CSV files) by
+    ingest and loaded by SimulationRunner without reading any workbook. A bundle holds:
+
+    - manifest.json: format version, creation time, simulated year window, the input files with their SHA-256,
+      the sheet arguments of LookupTablesGenerator.create_lookup_tables, the arrays with their dtype and shape,
+      and the fingerprint (Common_Fingerprint) of the lookup tables;
+    - arrays/: every numeric array of the lookup tables (e.g. the death rate array and the drinking transition
+      tensor) as a .npy file, memory-mapped read-only by load;
+    - lookup_tables.pkl: the rest of the lookup tables (dictionaries and DataFrames), with placeholders for
+      the arrays.
+
+    Like the lookup table cache, a bundle contains a pickle and must come from a trusted source.
+    """
+
+    FORMAT_VERSION = 1
+    MANIFEST_FILE = "manifest.json"
+    STRUCTURE_FILE = "lookup_tables.pkl"
+    ARRAY_DIR = "arrays"
+
+    @staticmethod
+    def _file_digest(file_path):
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def _extract_arrays(cls, value, path, arrays):
+        """
+        Replace every numeric array of a lookup structure by a _BundleArray named after its path.
+        """
+        if isinstance(value, dict):
+            return {key: cls._extract_arrays(item, path + [str(key)], arrays) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(cls._extract_arrays(item, path + [str(index)], arrays) for index, item in enumerate(value))
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            name = f"{len(arrays):03d}_{re.sub(r'[^A-Za-z0-9.+-]+', '_', '.'.join(path))}"
+            arrays[name] = value
+            return _BundleArray(name)
+        return value
+
+    @classmethod
+    def _attach_arrays(cls, value, arrays):
+        """
+        Replace every _BundleArray of a lookup structure by its array.
+        """
+        if isinstance(value, dict):
+            return {key: cls._attach_arrays(item, arrays) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(cls._attach_arrays(item, arrays) for item in value)
+        if isinstance(value, _BundleArray):
+            return arrays[value.name]
+        return value
+
+    @classmethod
+    def write(cls, bundle_dir, lookup_tables, input_files, sheet_arguments):
+        """
+        Write lookup tables as a bundle. The bundle is written to a temporary directory next to bundle_dir and
+        renamed, so readers never see a partial bundle; an existing bundle at bundle_dir is replaced.
+
+        :param bundle_dir: Directory of the bundle.
+        :param lookup_tables: Dictionary of lookup tables, as returned by create_lookup_tables.
+        :param input_files: Dictionary of role (e.g. 'excel_file_name') to the path of the input file it was built from.
+        :param sheet_arguments: Dictionary of the sheet and column name arguments of create_lookup_tables.
+        :return: The manifest dictionary.
+        """
+        arrays = {}
+        structure = cls._extract_arrays(lookup_tables, [], arrays)
+        manifest = {
+            "format_version": cls.FORMAT_VERSION,
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "years": {"initial_year": ExperimentConfig.INITIAL_YEAR, "end_year": ExperimentConfig.END_YEAR},
+            "inputs": {role: {"file": os.path.basename(file_path), "sha256": cls._file_digest(file_path)}
+                       for role, file_path in input_files.items()},
+            "sheets": sheet_arguments,
+            "arrays": {name: {"file": f"{cls.ARRAY_DIR}/{name}.npy", "dtype": array.dtype.str, "shape": list(array.shape)}
+                       for name, array in arrays.items()},
+            "fingerprint": Common_Fingerprint.fingerprint(lookup_tables),
+        }
+
+        bundle_dir = os.path.abspath(bundle_dir)
+        os.makedirs(os.path.dirname(bundle_dir), exist_ok=True)
+        temporary_dir = tempfile.mkdtemp(dir=os.path.dirname(bundle_dir), prefix=f".{os.path.basename(bundle_dir)}.")
+        try:
+            os.makedirs(os.path.join(temporary_dir, cls.ARRAY_DIR))
+            for name, array in arrays.items():
+                np.save(os.path.join(temporary_dir, manifest["arrays"][name]["file"]), np.ascontiguousarray(array))
+            with open(os.path.join(temporary_dir, cls.STRUCTURE_FILE), "wb") as file:
+                pickle.dump(structure, file, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(os.path.join(temporary_dir, cls.MANIFEST_FILE), "w") as file:
+                json.dump(manifest, file, indent=2)
+            if os.path.exists(bundle_dir):
+                shutil.rmtree(bundle_dir)
+            os.replace(temporary_dir, bundle_dir)
+        except BaseException:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+            raise
+        logger.info(f"Wrote model bundle {bundle_dir} with {len(arrays)} arrays.")
+        return manifest
+
+    @classmethod
+    def read_manifest(cls, bundle_dir):
+        """
+        :param bundle_dir: Directory of the bundle.
+        :return: The manifest dictionary.
+        :raises FileNotFoundError: If the directory has no manifest.
+        :raises ValueError: If the bundle format is not supported.
+        """
+        manifest_path = os.path.join(bundle_dir, cls.MANIFEST_FILE)
+        if not os.path.isfile(manifest_path):
+            logger.error(f"'{bundle_dir}' is not a model bundle: {cls.MANIFEST_FILE} is missing.")
+            raise FileNotFoundError(f"'{bundle_dir}' is not a model bundle: {cls.MANIFEST_FILE} is missing.")
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        if manifest.get("format_version") != cls.FORMAT_VERSION:
+            logger.error(f"Model bundle format {manifest.get('format_version')} is not supported, expected {cls.FORMAT_VERSION}.")
+            raise ValueError(f"Model bundle format {manifest.get('format_version')} is not supported, expected {cls.FORMAT_VERSION}.")
+        return manifest
+
+    @classmethod
+    def load(cls, bundle_dir, mmap=True, verify=False):
+        """
+        Load the lookup tables of a bundle. No workbook is read: the arrays are memory-mapped (or read) from
+        their .npy files and the rest is unpickled.
+
+        :param bundle_dir: Directory of the bundle.
+        :param mmap: Whether to memory-map the arrays read-only instead of reading them into memory.
+        :param verify: Whether to check the fingerprint of the loaded lookup tables against the manifest.
+        :return: Dictionary of lookup tables.
+        :raises FileNotFoundError: If the directory is not a bundle.
+        :raises ValueError: If the bundle format is not supported, the bundle was built for another year window,
+                            an array does not match the manifest or the fingerprint check fails.
+        """
+        manifest = cls.read_manifest(bundle_dir)
+        years = manifest["years"]
+        if years["initial_year"] != ExperimentConfig.INITIAL_YEAR or ExperimentConfig.END_YEAR > years["end_year"]:
+            logger.error(f"Model bundle covers {years['initial_year']}-{years['end_year']}, which does not match "
+                         f"INITIAL_YEAR={ExperimentConfig.INITIAL_YEAR} and END_YEAR={ExperimentConfig.END_YEAR}.")
+            raise ValueError(f"Model bundle covers {years['initial_year']}-{years['end_year']}, which does not match "
+                             f"INITIAL_YEAR={ExperimentConfig.INITIAL_YEAR} and END_YEAR={ExperimentConfig.END_YEAR}.")
+
+        arrays = {}
+        for name, entry in manifest["arrays"].items():
+            array = np.load(os.path.join(bundle_dir, entry["file"]), mmap_mode="r" if mmap else None)
+            if array.dtype.str != entry["dtype"] or list(array.shape) != entry["shape"]:
+                logger.error(f"Model bundle array {name} has dtype {array.dtype.str} and shape {array.shape}, "
+                             f"expected {entry['dtype']} and {tuple(entry['shape'])}.")
+                raise ValueError(f"Model bundle array {name} has dtype {array.dtype.str} and shape {array.shape}, "
+                                 f"expected {entry['dtype']} and {tuple(entry['shape'])}.")
+            arrays[name] = array
+        with open(os.path.join(bundle_dir, cls.STRUCTURE_FILE), "rb") as file:
+            lookup_tables = cls._attach_arrays(pickle.load(file), arrays)
+
+        if verify and Common_Fingerprint.fingerprint(lookup_tables) != manifest["fingerprint"]:
+            logger.error(f"Lookup tables of model bundle {bundle_dir} do not match the manifest fingerprint.")
+            raise ValueError(f"Lookup tables of model bundle {bundle_dir} do not match the manifest fingerprint.")
+        logger.info(f"Loaded model bundle {bundle_dir} created {manifest['created']}.")
+        return lookup_tables
+
+    @classmethod
+    def ingest(cls, bundle_dir, base_path, excel_file_name, excel_transition_file_name,
+               excel_initial_prevalence_file_name, death_file_name=None, verify=True, allow_missing_death_rates=False,
+               **sheet_arguments):
+        """
+        Build the lookup tables from the input files, validating them with the lookup generators, and write
+        them as a bundle.
+
+        :param bundle_dir: Directory of the bundle.
+        :param base_path: The directory path of the input files.
+        :param excel_file_name: Name of the main input workbook.
+        :param excel_transition_file_name: Name of the drinking transition workbook.
+        :param excel_initial_prevalence_file_name: Name of the initial drinking prevalence workbook.
+        :param death_file_name: Workbook or CSV file of the death rates. Defaults to the main input workbook.
+        :param verify: Whether to load the written bundle back and check its fingerprint.
+        :param allow_missing_death_rates: Whether to write the bundle even if death rows could not be compiled or
+                                          the death rate array has missing cells, which are certain death.
+        :param sheet_arguments: The sheet and column name arguments of create_lookup_tables.
+        :return: The manifest dictionary.
+        :raises ValueError: If the death rates do not cover every year, composite and age (see
+                            DeathLookupGenerator.check_coverage), or the written bundle does not load back to the
+                            same lookup tables.
+        """
+        lookup_tables_generator = LookupTablesGenerator(base_path, excel_file_name, excel_transition_file_name,
+                                                        excel_initial_prevalence_file_name, death_file_name=death_file_name)
+        lookup_tables = lookup_tables_generator.create_lookup_tables(**sheet_arguments)
+        if allow_missing_death_rates:
+            logger.warning("Writing the model bundle without checking the coverage of the death rates.")
+        else:
+            DeathLookupGenerator.check_coverage(lookup_tables["death_lookup_table"], lookup_tables["death_rate_array"])
+
+        input_files = {
+            "excel_file_name": excel_file_name,
+            "excel_transition_file_name": excel_transition_file_name,
+            "excel_initial_prevalence_file_name": excel_initial_prevalence_file_name,
+        }
+        if death_file_name:
+            input_files["death_file_name"] = death_file_name
+        manifest = cls.write(bundle_dir, lookup_tables,
+                             {role: os.path.join(base_path, file_name) for role, file_name in input_files.items()},
+                             sheet_arguments)
+        if verify:
+            cls.load(bundle_dir, verify=True)
+        return manifest
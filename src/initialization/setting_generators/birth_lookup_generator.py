@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from typing import Dict
 
@@ -9,16 +10,17 @@ from src.common.constants import ProbabilityRatesColumnNames
 
 class BirthLookupGenerator:
 
-    def __init__(self, base_path: str, excel_file_name: str):
+    def __init__(self, base_path: str, excel_file_name: str, data_reader: ExcelDataReader = None):
         """
         Initialize the BirthLookupGenerator with the provided data.
 
         :param base_path: Base path to the Excel file.
         :param excel_file_name: Name of the Excel file.
+        :param data_reader: Optional ExcelDataReader shared with other generators.
         """
         self.base_path = base_path
         self.excel_file_name = excel_file_name
-        self.data_reader = ExcelDataReader(self.base_path)
+        self.data_reader = data_reader if data_reader is not None else ExcelDataReader(self.base_path)
 
         logger.info(f"BirthLookupGenerator initialized with base_path: {self.base_path}, "
                     f"excel_file_name: {self.excel_file_name}")
@@ -71,7 +73,6 @@ class BirthLookupGenerator:
         """
         logger.info(f"Reading data from sheet: {sheet_name}")
         data = self.data_reader.read_sheet(self.excel_file_name, sheet_name=sheet_name)
-        lookup_table = {}
 
         if "Year" not in data.columns or column_name not in data.columns:
             logger.error(f"The dataframe must contain 'Year' and '{column_name}' columns.")
@@ -81,19 +82,21 @@ class BirthLookupGenerator:
 
         data = data[(data["Year"] >= ExperimentConfig.INITIAL_YEAR + 1) & (data["Year"] <= ExperimentConfig.END_YEAR)]
 
-        for _, row in data.iterrows():
-            year = row["Year"]
-            value = row[column_name]
-            
-            self._validate_ratio(value, column_name)
+        # Row values keep the scalar types of the sheet rows, so the keys are those of a row-by-row build
+        rows = data.to_numpy()
+        years = rows[:, data.columns.get_loc("Year")]
+        values = rows[:, data.columns.get_loc(column_name)]
+
+        invalid = ~((data[column_name] >= 0) & (data[column_name] <= 1)).to_numpy()
+        if invalid.any():
+            self._validate_ratio(values[np.argmax(invalid)], column_name)
+        logger.debug(f"Validated {len(values)} {column_name} values.")
 
-            if pd.isna(year) or pd.isna(value):
-                logger.error(f"Each row must contain non-null 'Year' and '{column_name}' values.")
-                raise ValueError(f"Each row must contain non-null 'Year' and '{column_name}' values.")
+        if data["Year"].isna().any():
+            logger.error(f"Each row must contain non-null 'Year' and '{column_name}' values.")
+            raise ValueError(f"Each row must contain non-null 'Year' and '{column_name}' values.")
 
-            if ExperimentConfig.INITIAL_YEAR <= year <= ExperimentConfig.END_YEAR:
-                lookup_table[year] = value
-                logger.debug(f"Added to lookup_table: Year={year}, {column_name}={value}")
+        lookup_table = dict(zip(years, values))
 
         if not lookup_table:
             logger.error(f"Generated lookup table for {column_name} is empty.")
@@ -136,29 +139,22 @@ class BirthLookupGenerator:
             logger.error("Filtered dataframe for 'Under 5 years' is empty.")
             raise ValueError("Filtered dataframe for 'Under 5 years' is empty.")
             
-        grouped = filtered_df.groupby(
-            [ProbabilityRatesColumnNames.YEAR_COLUMN, ProbabilityRatesColumnNames.SEX_COLUMN]
-        )
+        year_column = ProbabilityRatesColumnNames.YEAR_COLUMN
+        sex_column = ProbabilityRatesColumnNames.SEX_COLUMN
+        count_column = ProbabilityRatesColumnNames.POPULATION_COUNT_COLUMN
+        population_counts = filtered_df.groupby([year_column, sex_column])[count_column]
+        total_population = population_counts.sum()
+        if (total_population == 0).any():
+            year, gender = total_population.index[np.argmax((total_population == 0).to_numpy())]
+            logger.error(f"Total population for year {year}, gender {gender} is zero.")
+            raise ValueError(f"Total population for year {year}, gender {gender} must not be zero.")
+
+        ratios = filtered_df[count_column] / population_counts.transform("sum")
+        races = filtered_df[ProbabilityRatesColumnNames.RACE_COLUMN]
 
         race_ratio_lookup = {}
-
-        for (year, gender), group in grouped:
-            # Calculate total population for normalization
-            total_population = group[ProbabilityRatesColumnNames.POPULATION_COUNT_COLUMN].sum()
-            if total_population == 0:
-                logger.error(f"Total population for year {year}, gender {gender} is zero.")
-                raise ValueError(f"Total population for year {year}, gender {gender} must not be zero.")
-
-            # Initialize nested dictionary for the year and gender
-            if year not in race_ratio_lookup:
-                race_ratio_lookup[year] = {}
-            race_ratio_lookup[year][gender] = {}
-
-            # Populate race proportions
-            for _, row in group.iterrows():
-                race = row[ProbabilityRatesColumnNames.RACE_COLUMN]
-                population_count = row[ProbabilityRatesColumnNames.POPULATION_COUNT_COLUMN]
-                race_ratio_lookup[year][gender][race] = population_count / total_population
+        for (year, gender), group_ratios in ratios.groupby([filtered_df[year_column], filtered_df[sex_column]]):
+            race_ratio_lookup.setdefault(year, {})[gender] = dict(zip(races[group_ratios.index], group_ratios.to_numpy()))
 
         logger.info(f"Processed race data for 'Under 5 years': {len(race_ratio_lookup)} years found.")
         return race_ratio_lookup
@@ -1,12 +1,14 @@
+import numpy as np
 import pandas as pd
 
 from src.common.data_reader import ExcelDataReader
 from src.common.logger import logger
 from src.config.simulation_config import ExperimentConfig
+from src.common.constants import PopulationCodes
 
 class DeathLookupGenerator:
 
-    def __init__(self, base_path: str, excel_file_name: str):
+    def __init__(self, base_path: str, excel_file_name: str, data_reader: ExcelDataReader = None):
         """
         Initialize the BirthLookupTable by loading data from an Excel file.
 
@@ -14,51 +16,110 @@ class DeathLookupGenerator:
         :param excel_file_name: Name of the Excel file.
         :param sheet_name: Name of the sheet to read from the Excel file.
         :param column_name: Name of the column to use as the birth rate.
+        :param data_reader: Optional ExcelDataReader shared with other generators.
         """
         self.base_path = base_path
         self.excel_file_name = excel_file_name
+        self.data_reader = data_reader if data_reader is not None else ExcelDataReader(self.base_path)
         self.lookup_table = {}
 
     def load_lookup_table(self, sheet_name: str, column_name: str) -> pd.DataFrame:
         """
         Load the lookup table from the Excel file and convert it to a DataFrame with the desired format.
         """
-        data_reader = ExcelDataReader(self.base_path)
-        data = data_reader.read_sheet(self.excel_file_name, sheet_name=sheet_name)
+        data = self.data_reader.read_sheet(self.excel_file_name, sheet_name=sheet_name)
 
         required_columns = {"Year", "Sex", "Race", "Age", column_name}
         if not required_columns.issubset(data.columns):
             logger.error(f"The dataframe must contain the following columns: {required_columns}.")
             raise ValueError(f"The dataframe must contain the following columns: {required_columns}.")
 
-        formatted_data = []
-
         # Filter rows where 'Year' is between INITIAL_YEAR + 1 and END_YEAR
         data = data[(data["Year"] >= ExperimentConfig.INITIAL_YEAR + 1) & (data["Year"] <= ExperimentConfig.END_YEAR)]
 
-        for _, row in data.iterrows():
-            year = row["Year"]
-            sex = row["Sex"]
-            race = row["Race"]
-            age = row["Age"]
-            rate = row[column_name]
-
-            # TODO: add the default value here
-            if pd.isna(year) or pd.isna(sex) or pd.isna(race) or pd.isna(age) or pd.isna(rate):
+        # Validate whole columns at once; the first offending row, in sheet order, is reported
+        # TODO: add the default value here
+        null_rows = data[["Year", "Sex", "Race", "Age", column_name]].isna().any(axis=1).to_numpy()
+        rates = data[column_name].to_numpy()
+        invalid_rows = null_rows | ~((rates >= 0) & (rates <= 1))
+        if invalid_rows.any():
+            first_invalid = int(np.argmax(invalid_rows))
+            if null_rows[first_invalid]:
                 logger.error(f"Each row must contain non-null values for 'Year', 'Sex', 'Race', 'Age', and '{column_name}'.")
                 raise ValueError(f"Each row must contain non-null values for 'Year', 'Sex', 'Race', 'Age', and '{column_name}'.")
-            
-            if not (0 <= rate <= 1):
-                logger.error(f"Invalid {column_name}: {rate}. It must be between 0 and 1.")
-                raise ValueError(f"Invalid {column_name}: {rate}. It must be between 0 and 1.")
+            rate = rates[first_invalid]
+            logger.error(f"Invalid {column_name}: {rate}. It must be between 0 and 1.")
+            raise ValueError(f"Invalid {column_name}: {rate}. It must be between 0 and 1.")
 
-            composite = f"{sex}_{race}"
-            formatted_data.append({"Year": year, "Composite": composite, "Age": age, column_name: rate})
-            logger.debug(f"Added to formatted_data: Year={year}, Composite={composite}, Age={age}, {column_name}={rate}")
+        lookup_table = pd.DataFrame({
+            "Year": data["Year"].to_numpy(),
+            "Composite": data["Sex"].astype(str) + "_" + data["Race"].astype(str),
+            "Age": data["Age"].to_numpy(),
+            column_name: rates,
+        }).reset_index(drop=True)
 
         logger.info(f"Lookup table for {column_name} loaded successfully as DataFrame.")
-        
-        return pd.DataFrame(formatted_data)
+
+        return lookup_table
+
+    def compile_lookup_table(self, lookup_table: pd.DataFrame, column_name: str) -> dict:
+        """
+        Compile the DataFrame returned by load_lookup_table into a dense rate array.
+
+        :param lookup_table: DataFrame with 'Year', 'Composite', 'Age' and the rate column.
+        :param column_name: Name of the rate column.
+        :return: A dictionary with "first_year" and "rates", a float array indexed by
+                 [year - first_year, composite code, age 0-MAX_AGE]. Cells missing from the sheet are NaN.
+        """
+        years = lookup_table["Year"].astype(np.int64).to_numpy()
+        first_year = int(years.min())
+        composite_codes = pd.Categorical(lookup_table["Composite"], categories=PopulationCodes.COMPOSITES).codes
+        ages = lookup_table["Age"].astype(np.int64).to_numpy()
+
+        valid = (composite_codes >= 0) & (ages >= 0) & (ages <= PopulationCodes.MAX_AGE)
+        if not valid.all():
+            logger.warning(f"Ignoring {int((~valid).sum())} death rows with unknown composite or age out of range.")
+
+        rates = np.full((int(years.max()) - first_year + 1, len(PopulationCodes.COMPOSITES), PopulationCodes.MAX_AGE + 1), np.nan)
+        rates[years[valid] - first_year, composite_codes[valid], ages[valid]] = lookup_table[column_name].to_numpy(dtype=np.float64)[valid]
+
+        missing_cells = int(np.isnan(rates).sum())
+        if missing_cells:
+            logger.warning(f"Death rate array has {missing_cells} missing cells; individuals in them will not survive.")
+
+        logger.info(f"Compiled death rate array with shape {rates.shape} starting in {first_year}.")
+        return {"first_year": first_year, "rates": rates}
+
+    @staticmethod
+    def check_coverage(lookup_table: pd.DataFrame, death_rate_array: dict):
+        """
+        Check that every row of the lookup table was compiled into the death rate array and that the array
+        has a rate for every year, composite and age. compile_lookup_table only warns about both, and a missing
+        rate is certain death in the simulation.
+
+        :param lookup_table: DataFrame returned by load_lookup_table.
+        :param death_rate_array: Dictionary returned by compile_lookup_table for that DataFrame.
+        :raises ValueError: If rows have an unknown composite (e.g. Sex and Race swapped) or an age out of range,
+                            or if the array has missing cells (e.g. ages above the last age of the sheet).
+        """
+        unknown_composites = sorted(set(lookup_table["Composite"]) - set(PopulationCodes.COMPOSITES))
+        if unknown_composites:
+            logger.error(f"Death rows have unknown composites {unknown_composites}; expected Sex_Race values.")
+            raise ValueError(f"Death rows have unknown composites {unknown_composites}; expected Sex_Race values.")
+        ages = lookup_table["Age"].to_numpy()
+        out_of_range = int(((ages < 0) | (ages > PopulationCodes.MAX_AGE)).sum())
+        if out_of_range:
+            logger.error(f"{out_of_range} death rows have an age outside 0-{PopulationCodes.MAX_AGE}.")
+            raise ValueError(f"{out_of_range} death rows have an age outside 0-{PopulationCodes.MAX_AGE}.")
+
+        rates = death_rate_array["rates"]
+        missing = np.argwhere(np.isnan(rates))
+        if len(missing):
+            year, composite, age = missing[0]
+            logger.error(f"Death rate array has {len(missing)} missing cells, the first for year "
+                         f"{death_rate_array['first_year'] + year}, {PopulationCodes.COMPOSITES[composite]}, age {age}.")
+            raise ValueError(f"Death rate array has {len(missing)} missing cells, the first for year "
+                             f"{death_rate_array['first_year'] + year}, {PopulationCodes.COMPOSITES[composite]}, age {age}.")
 
     
 if __name__ == "__main__":
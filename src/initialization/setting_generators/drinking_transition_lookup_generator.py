@@ -1,21 +1,26 @@
+import numpy as np
 import pandas as pd
 from typing import Dict
+from src.common.common import Common_Sampling
+from src.common.constants import PopulationCodes
 from src.common.data_reader import ExcelDataReader
 from src.common.logger import logger
 
 
 class DrinkingStatusLookupGenerator:
 
-    def __init__(self, base_path: str, excel_transition_probability_drinking_file_name: str):
+    def __init__(self, base_path: str, excel_transition_probability_drinking_file_name: str,
+                 data_reader: ExcelDataReader = None):
         """
         Initialize the DrinkingStatusLookupGenerator with the provided data.
 
         :param base_path: Base path to the Excel file.
         :param excel_file_name: Name of the Excel file.
+        :param data_reader: Optional ExcelDataReader shared with other generators.
         """
         self.base_path = base_path
         self.excel_transition_probability_drinking_file_name = excel_transition_probability_drinking_file_name
-        self.data_reader = ExcelDataReader(self.base_path)
+        self.data_reader = data_reader if data_reader is not None else ExcelDataReader(self.base_path)
 
         logger.info(f"DrinkingStatusLookupGenerator initialized with base_path: {self.base_path}, "
                     f"excel_transition_probability_drinking_file_name: {self.excel_transition_probability_drinking_file_name}")
@@ -58,3 +63,79 @@ class DrinkingStatusLookupGenerator:
             lookup[key] = lookup[key].drop(columns=['Year'])
 
         return lookup
+
+    def _parse_age_group(self, age_group: str):
+        """
+        Parse an age group label such as "18-34", "55 and over" or "51+" into its bounds.
+
+        :param age_group: The age group label.
+        :return: Tuple (lower, upper, label).
+        :raises ValueError: If the label cannot be parsed.
+        """
+        label = str(age_group).strip()
+        try:
+            if label.endswith("and over"):
+                return int(label.split()[0]), float('inf'), age_group
+            if label.endswith("+"):
+                return int(label[:-1]), float('inf'), age_group
+            lower, upper = label.split("-")
+            return int(lower), int(upper), age_group
+        except ValueError as e:
+            logger.error(f"Unexpected age group in drinking transition data: {age_group}")
+            raise ValueError(f"Unexpected age group in drinking transition data: {age_group}") from e
+
+    def compile_lookup(self, lookup: Dict[str, pd.DataFrame]) -> Dict:
+        """
+        Compile the output of generate_lookup into a dense cumulative-probability tensor.
+
+        :param lookup: Dictionary with keys "0-3", "3-8", "8+" as returned by generate_lookup.
+        :return: A dictionary with:
+                 - "periods": list of period keys, the first axis of "cdf".
+                 - "age_groups": list of (lower, upper, label) tuples, the second axis of "cdf".
+                 - "age_group_by_age": array mapping every age 0-MAX_AGE to its age group index, -1 if none.
+                 - "cdf": array indexed by [period, age group, composite code, from-stage code, to-stage code].
+                   Combinations missing from the sheet are NaN and keep their current stage.
+        """
+        periods = list(lookup.keys())
+        labels = sorted({label for table in lookup.values() for label in table['Age_Group'].unique()},
+                        key=lambda label: self._parse_age_group(label)[0])
+        age_groups = [self._parse_age_group(label) for label in labels]
+
+        age_group_by_age = np.full(PopulationCodes.MAX_AGE + 1, -1, dtype=np.int64)
+        for index, (lower, upper, _) in enumerate(age_groups):
+            age_group_by_age[lower:int(min(upper, PopulationCodes.MAX_AGE)) + 1] = index
+
+        group_codes = {label: index for index, (_, _, label) in enumerate(age_groups)}
+        composite_codes = {composite: index for index, composite in enumerate(PopulationCodes.COMPOSITES)}
+        stage_codes = {stage: index for index, stage in enumerate(PopulationCodes.DRINKING_STAGES)}
+
+        num_stages = len(PopulationCodes.DRINKING_STAGES)
+        cdf = np.full((len(periods), len(age_groups), len(PopulationCodes.COMPOSITES), num_stages, num_stages), np.nan)
+        for period_index, period in enumerate(periods):
+            table = lookup[period]
+            for age_group, composite, stage, probabilities in zip(table['Age_Group'], table['Composite'],
+                                                                  table['Drinking_Stage'],
+                                                                  table['Drinking_Transition_Probability']):
+                weights = [probabilities.get(to_stage, 0) for to_stage in PopulationCodes.DRINKING_STAGES]
+                if not np.isfinite(weights).all() or np.sum(weights) <= 0:
+                    continue
+                cdf[period_index, group_codes[age_group], composite_codes[composite], stage_codes[stage]] = \
+                    Common_Sampling.build_cdf(weights)
+
+        logger.info(f"Compiled drinking transition tensor with shape {cdf.shape}.")
+        return {
+            "periods": periods,
+            "age_groups": age_groups,
+            "age_group_by_age": age_group_by_age,
+            "cdf": cdf,
+        }
+
+    def generate_compiled_lookup(self, sheet_name: str) -> Dict:
+        """
+        Generate the drinking status lookup tables together with their compiled tensor.
+
+        :param sheet_name: Name of the sheet to read data from.
+        :return: The dictionary returned by generate_lookup with an extra "drinking_transition_tensor" entry.
+        """
+        lookup = self.generate_lookup(sheet_name)
+        return {**lookup, "drinking_transition_tensor": self.compile_lookup(lookup)}
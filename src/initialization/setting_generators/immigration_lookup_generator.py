@@ -1,3 +1,4 @@
+import numpy as np
 from typing import Dict
 from src.config.simulation_config import ExperimentConfig
 from src.common.constants import ProbabilityRatesColumnNames
@@ -6,17 +7,18 @@ from src.common.logger import logger
 
 class ImmigrationLookupGenerator:
 
-    def __init__(self, base_path: str, excel_file_name: str):
+    def __init__(self, base_path: str, excel_file_name: str, data_reader: ExcelDataReader = None):
 
         """
         Initialize the ImmigrationLookupGenerator with the base path and Excel file name.
 
         :param base_path: The base path to the directory containing the Excel file.
         :param excel_file_name: The name of the Excel file containing the data.
+        :param data_reader: Optional ExcelDataReader shared with other generators.
         """
         self.base_path = base_path
         self.excel_file_name = excel_file_name
-        self.data_reader = ExcelDataReader(self.base_path)
+        self.data_reader = data_reader if data_reader is not None else ExcelDataReader(self.base_path)
         logger.info(f"ImmigrationLookupGenerator initialized with base_path: {self.base_path}, "
                     f"excel_file_name: {self.excel_file_name}")
 
@@ -36,16 +38,15 @@ class ImmigrationLookupGenerator:
         dataframe = dataframe[(dataframe[ProbabilityRatesColumnNames.YEAR_COLUMN] > ExperimentConfig.INITIAL_YEAR) & 
                               (dataframe[ProbabilityRatesColumnNames.YEAR_COLUMN] <= ExperimentConfig.END_YEAR)]
 
+        # Row values keep the scalar types of the sheet rows, so the keys are those of a row-by-row build
+        rows = dataframe.to_numpy()
+        keys = rows[:, dataframe.columns.get_loc(key_column)]
+        ratios = rows[:, dataframe.columns.get_loc(ratio_column)]
+        years = rows[:, dataframe.columns.get_loc(ProbabilityRatesColumnNames.YEAR_COLUMN)]
+
         lookup = {}
-        for _, row in dataframe.iterrows():
-            year = row[ProbabilityRatesColumnNames.YEAR_COLUMN]
-            key = row[key_column]
-            ratio = row[ratio_column]
-            if year not in lookup:
-                lookup[year] = {}
-            if key_column not in lookup[year]:
-                lookup[year][key_column] = {}
-            lookup[year][key_column][key] = ratio
+        for year_rows in dataframe.groupby(ProbabilityRatesColumnNames.YEAR_COLUMN, sort=False).indices.values():
+            lookup[years[year_rows[0]]] = {key_column: dict(zip(keys[year_rows], ratios[year_rows]))}
         logger.info(f"Lookup generated for sheet: {sheet_name}")
         return lookup
 
@@ -87,36 +88,31 @@ class ImmigrationLookupGenerator:
         """
         logger.info(f"Generating race lookup from sheet: {sheet_name}")
         dataframe = self.data_reader.read_sheet(self.excel_file_name, sheet_name=sheet_name)
-        normalized_data = {}
 
         dataframe = dataframe[(dataframe[ProbabilityRatesColumnNames.YEAR_COLUMN] > ExperimentConfig.INITIAL_YEAR) & 
                               (dataframe[ProbabilityRatesColumnNames.YEAR_COLUMN] <= ExperimentConfig.END_YEAR)]
 
-        for _, row in dataframe.iterrows():
-            year = row[ProbabilityRatesColumnNames.YEAR_COLUMN]
-            sex = row[ProbabilityRatesColumnNames.SEX_COLUMN]
-            age_group = row[ProbabilityRatesColumnNames.AGE_GROUP_COLUMN]
-            race = row[ProbabilityRatesColumnNames.RACE_COLUMN]
-            ratio = row[ProbabilityRatesColumnNames.RACE_PROPORTION_COLUMN]
-
-            if year not in normalized_data:
-                normalized_data[year] = {}
-            if sex not in normalized_data[year]:
-                normalized_data[year][sex] = {}
-            if age_group not in normalized_data[year][sex]:
-                normalized_data[year][sex][age_group] = {}
-            if race not in normalized_data[year][sex][age_group]:
-                normalized_data[year][sex][age_group][race] = 0
-
-            normalized_data[year][sex][age_group][race] += ratio
-
-        for year, sexes in normalized_data.items():
-            for sex, age_groups in sexes.items():
-                for age_group, races in age_groups.items():
-                    total_ratio = sum(races.values())
-                    if total_ratio > 0:
-                        for race in races:
-                            races[race] /= total_ratio
+        stratum_columns = [ProbabilityRatesColumnNames.YEAR_COLUMN, ProbabilityRatesColumnNames.SEX_COLUMN,
+                           ProbabilityRatesColumnNames.AGE_GROUP_COLUMN]
+        # Cells are (year, sex, age group, race), numbered in order of first appearance
+        cells = dataframe.groupby(stratum_columns + [ProbabilityRatesColumnNames.RACE_COLUMN], sort=False).ngroup().to_numpy()
+        _, first_rows = np.unique(cells, return_index=True)
+        strata = dataframe.iloc[first_rows].groupby(stratum_columns, sort=False).ngroup().to_numpy()
+
+        # np.add.at accumulates in row order, so the sums are those of a row-by-row accumulation
+        cell_ratios = np.zeros(len(first_rows))
+        np.add.at(cell_ratios, cells, dataframe[ProbabilityRatesColumnNames.RACE_PROPORTION_COLUMN].to_numpy(dtype=np.float64))
+        total_ratios = np.zeros(strata.max() + 1 if len(strata) else 0)
+        np.add.at(total_ratios, strata, cell_ratios)
+        positive = total_ratios[strata] > 0
+        cell_ratios[positive] /= total_ratios[strata][positive]
+
+        rows = dataframe.to_numpy()[first_rows]
+        normalized_data = {}
+        for (year, sex, age_group, race), ratio in zip(
+                rows[:, [dataframe.columns.get_loc(column) for column in stratum_columns + [ProbabilityRatesColumnNames.RACE_COLUMN]]],
+                cell_ratios.tolist()):
+            normalized_data.setdefault(year, {}).setdefault(sex, {}).setdefault(age_group, {})[race] = ratio
 
         self.race_lookup = normalized_data
         logger.info("Race lookup generation completed.")
@@ -131,15 +127,17 @@ class ImmigrationLookupGenerator:
         """
         logger.info(f"Generating immigration rate lookup from sheet: {sheet_name}")
         dataframe = self.data_reader.read_sheet(self.excel_file_name, sheet_name=sheet_name)
-        immigration_rate_lookup = {}
-
-        for _, row in dataframe.iterrows():
-            year = row[ProbabilityRatesColumnNames.YEAR_COLUMN]
-            immigration_rate = row[ProbabilityRatesColumnNames.IMMIGRATION_RATE_COLUMN]
-            if not (0 <= immigration_rate <= 1):
-                logger.error(f"Immigration rate {immigration_rate} for year {year} is out of bounds (0-1).")
-                raise ValueError(f"Immigration rate {immigration_rate} for year {year} is out of bounds (0-1).")
-            immigration_rate_lookup[year] = immigration_rate
+        rows = dataframe.to_numpy()
+        years = rows[:, dataframe.columns.get_loc(ProbabilityRatesColumnNames.YEAR_COLUMN)]
+        immigration_rates = rows[:, dataframe.columns.get_loc(ProbabilityRatesColumnNames.IMMIGRATION_RATE_COLUMN)]
+
+        rate_column = dataframe[ProbabilityRatesColumnNames.IMMIGRATION_RATE_COLUMN]
+        out_of_bounds = ~((rate_column >= 0) & (rate_column <= 1)).to_numpy()
+        if out_of_bounds.any():
+            year, immigration_rate = years[np.argmax(out_of_bounds)], immigration_rates[np.argmax(out_of_bounds)]
+            logger.error(f"Immigration rate {immigration_rate} for year {year} is out of bounds (0-1).")
+            raise ValueError(f"Immigration rate {immigration_rate} for year {year} is out of bounds (0-1).")
+        immigration_rate_lookup = dict(zip(years, immigration_rates))
 
         logger.info("Immigration rate lookup generation completed.")
         return immigration_rate_lookup
@@ -9,13 +9,13 @@ import numpy as np
 
 class InitialPopulationLookupGenerator:
 
-    def __init__(self, base_path, excel_file_name, excel_drinking_file_name):
+    def __init__(self, base_path, excel_file_name, excel_drinking_file_name, data_reader=None):
 
         logger.info("Initializing InitialPopulationLookupGenerator")
         self.base_path = base_path
         self.excel_file_name = excel_file_name
         self.excel_drinking_file_name = excel_drinking_file_name
-        self.data_reader = ExcelDataReader(self.base_path)
+        self.data_reader = data_reader if data_reader is not None else ExcelDataReader(self.base_path)
 
     def process_initial_population_race_data(self, sheet_name):
 
@@ -50,12 +50,17 @@ class InitialPopulationLookupGenerator:
             initial_population_race_df[ProbabilityRatesColumnNames.POPULATION_COUNT_COLUMN] /
             initial_population_race_df[ProbabilityRatesColumnNames.TOTAL_POPULATION_COLUMN]
         )
+        # Row values keep the scalar types of the sheet rows, as in a row-by-row build
+        rows = initial_population_race_df.to_numpy()
+        key_columns = [initial_population_race_df.columns.get_loc(ProbabilityRatesColumnNames.AGE_GROUP_COLUMN),
+                       initial_population_race_df.columns.get_loc(ProbabilityRatesColumnNames.SEX_COLUMN)]
+        races = rows[:, initial_population_race_df.columns.get_loc(ProbabilityRatesColumnNames.RACE_COLUMN)]
+        proportions = rows[:, initial_population_race_df.columns.get_loc(ProbabilityRatesColumnNames.RACE_PROPORTION_COLUMN)]
         race_ratio_lookup = {}
-        for _, row in initial_population_race_df.iterrows():
-            key = (row[ProbabilityRatesColumnNames.AGE_GROUP_COLUMN], row[ProbabilityRatesColumnNames.SEX_COLUMN])
-            race = row[ProbabilityRatesColumnNames.RACE_COLUMN]
-            prob = row[ProbabilityRatesColumnNames.RACE_PROPORTION_COLUMN]
-            race_ratio_lookup.setdefault(key, {})[race] = prob
+        for group_rows in initial_population_race_df.groupby(
+                [ProbabilityRatesColumnNames.AGE_GROUP_COLUMN, ProbabilityRatesColumnNames.SEX_COLUMN],
+                sort=False, dropna=False).indices.values():
+            race_ratio_lookup[tuple(rows[group_rows[0], key_columns])] = dict(zip(races[group_rows], proportions[group_rows]))
 
         logger.info(f"Processed race data: {len(race_ratio_lookup)} unique age-sex groups found.")
         return race_ratio_lookup
@@ -94,20 +99,10 @@ class InitialPopulationLookupGenerator:
 
         drinking_status_df = drinking_status_df.reset_index()
 
-        unique_race_sex_combinations = initial_population_drinking_df[["Race", "Sex"]].drop_duplicates()
-        new_rows = []
-        for _, row in unique_race_sex_combinations.iterrows():
-            new_rows.append({
-            "Race": row["Race"],
-            "Sex": row["Sex"],
-            "Age_Group": "0-17",
-            "Abs": 1,
-            "High": 0,
-            "Low": 0,
-            "Med": 0,
-            "Very High": 0
-            })
-        drinking_status_df = pd.concat([drinking_status_df, pd.DataFrame(new_rows)], ignore_index=True)
+        # Everyone under 18 starts as an abstainer
+        new_rows = initial_population_drinking_df[["Race", "Sex"]].drop_duplicates().assign(
+            Age_Group="0-17", Abs=1, High=0, Low=0, Med=0, **{"Very High": 0})
+        drinking_status_df = pd.concat([drinking_status_df, new_rows], ignore_index=True)
 
         drinking_status_df.loc[
             (drinking_status_df == 0).all(axis=1), "Abs"
@@ -118,15 +113,13 @@ class InitialPopulationLookupGenerator:
             drinking_status_df[risk_columns].sum(axis=1), axis=0
         ).fillna(0)
 
-        drinking_status_df["Drinking_Status"] = drinking_status_df[risk_columns].apply(
-            lambda row: {col: row[col] for col in risk_columns}, axis=1
-        )
+        drinking_status_df["Drinking_Status"] = [
+            dict(zip(risk_columns, proportions)) for proportions in drinking_status_df[risk_columns].to_numpy()
+        ]
 
         drinking_status_df = drinking_status_df[["Race", "Sex", "Age_Group", "Drinking_Status"]]
 
-        drinking_status_df['Composite'] = drinking_status_df.apply(
-            lambda row: f"{row['Sex']}_{row['Race']}", axis=1
-        )
+        drinking_status_df['Composite'] = drinking_status_df["Sex"].astype(str) + "_" + drinking_status_df["Race"].astype(str)
 
         drinking_status_df.drop(columns=["Race", "Sex"], inplace=True)
 
@@ -157,11 +150,10 @@ class InitialPopulationLookupGenerator:
             logger.error(f"No data found for the year {ExperimentConfig.INITIAL_YEAR} in the sheet '{sheet_name}'.")
             raise ValueError(f"No data found for the year {ExperimentConfig.INITIAL_YEAR} in the sheet '{sheet_name}'.")
 
-        age_ratio_lookup = {}
-        for _, row in initial_population_age_df.iterrows():
-            age_group = int(row[ProbabilityRatesColumnNames.AGE_COLUMN])
-            ratio = row[ProbabilityRatesColumnNames.AGE_RATIO_COLUMN]
-            age_ratio_lookup[age_group] = ratio
+        rows = initial_population_age_df.to_numpy()
+        age_groups = rows[:, initial_population_age_df.columns.get_loc(ProbabilityRatesColumnNames.AGE_COLUMN)]
+        ratios = rows[:, initial_population_age_df.columns.get_loc(ProbabilityRatesColumnNames.AGE_RATIO_COLUMN)]
+        age_ratio_lookup = dict(zip(age_groups.astype(np.int64).tolist(), ratios))
 
         logger.info(f"Processed age data: {len(age_ratio_lookup)} unique age groups found.")
         return age_ratio_lookup
@@ -184,11 +176,11 @@ class InitialPopulationLookupGenerator:
             logger.error(f"Error reading sheet '{sheet_name}': {e}")
             raise ValueError(f"Error reading sheet '{sheet_name}': {e}")
 
-        sex_ratio_lookup = {}
-        for _, row in initial_population_sex_df.iterrows():
-            age_group = row[ProbabilityRatesColumnNames.AGE_COLUMN]
-            male_ratio = row[ProbabilityRatesColumnNames.MALE_RATIO_COLUMN]
-            sex_ratio_lookup[age_group] = male_ratio
+        rows = initial_population_sex_df.to_numpy()
+        sex_ratio_lookup = dict(zip(
+            rows[:, initial_population_sex_df.columns.get_loc(ProbabilityRatesColumnNames.AGE_COLUMN)],
+            rows[:, initial_population_sex_df.columns.get_loc(ProbabilityRatesColumnNames.MALE_RATIO_COLUMN)]
+        ))
 
         logger.info(f"Processed sex data: {len(sex_ratio_lookup)} unique age groups found.")
         return sex_ratio_lookup
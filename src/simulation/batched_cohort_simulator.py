@@ -0,0 +1,173 @@
+import numpy as np
+from src.simulation.cohort_simulator import CohortSimulator
+from src.simulation.simulator import Simulator
+from src.config.simulation_config import ExperimentConfig
+from src.common.common import Common_CounterRNG
+from src.common.constants import PopulationCodes, RandomStreams
+from src.common.logger import logger
+
+
+class BatchedCohortSimulator(CohortSimulator):
+    """
+    CohortSimulator over a batch of replicates: the population is a count tensor of shape
+    (replicates,) + PopulationCodes.COUNT_TENSOR_SHAPE and every stage is one binomial or multinomial draw
+    over all the cells of all the replicates. The lookups of the year (birth race split, immigrant cells,
+    drinking transitions and death rates) are built once for the whole batch, so the Python-level cost of a
+    year does not grow with the number of replicates.
+
+    The draws of a year come from one generator per stage keyed by the batch seed, so a batch is reproducible
+    for a given seed and number of replicates; replicates are independent but not bit-identical to separate
+    CohortSimulator runs.
+    """
+
+    def __init__(self, lookup_tables, counts, year, seed=None):
+        """
+        Initialize the BatchedCohortSimulator.
+
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :param counts: Integer count tensor of shape (replicates,) + PopulationCodes.COUNT_TENSOR_SHAPE, updated
+                       in place.
+        :param year: The year to simulate.
+        :param seed: Seed of the batch. Defaults to ExperimentConfig.seed.
+        """
+        super().__init__(lookup_tables, counts, year)
+        if seed is not None:
+            self.seed = int(seed)
+
+    def population_count(self):
+        """
+        Number of individuals of the whole batch.
+        """
+        return int(self.population.sum())
+
+    def replicate_counts(self):
+        """
+        Number of individuals of every replicate.
+        """
+        return self.population.reshape(len(self.population), -1).sum(axis=1)
+
+    def _generator(self, stream):
+        return Common_CounterRNG(self.seed).generator(self.year, stream)
+
+    def update_births(self):
+        """
+        Add the year's births of every replicate, drawn by sex and race, to the age 0, "Abs", non-immigrant cells.
+        :raises RuntimeError: If any of the required lookup tables for the current year are not found.
+        :return: None
+        """
+        birth_updater = self._create_birth_updater()
+        num_births = np.maximum(0, np.round(self.replicate_counts() * birth_updater.birth_rate_lookup)).astype(np.int64)
+        rng = self._generator(RandomStreams.BIRTH)
+        num_males = rng.binomial(num_births, birth_updater.male_ratio_lookup)
+        # sex_counts[replicate, sex]
+        sex_counts = np.zeros((len(num_births), len(PopulationCodes.SEXES)), dtype=np.int64)
+        sex_counts[:, PopulationCodes.SEXES.index("Male")] = num_males
+        sex_counts[:, PopulationCodes.SEXES.index("Female")] = num_births - num_males
+        birth_counts = rng.multinomial(sex_counts, birth_updater.birth_race_probabilities())
+        self.population[:, 0, :, :, PopulationCodes.DRINKING_STAGES.index("Abs"), 0] += birth_counts
+
+    def update_immigration(self):
+        """
+        Add the year's immigrants of every replicate, drawn by age, sex, race and drinking stage, to the
+        immigrant cells.
+        :return: None
+        """
+        immigration_updater = self._create_immigration_updater()
+        num_immigrants = np.maximum(0, np.round(self.replicate_counts() * immigration_updater.immigration_rate_lookup))
+        joint = immigration_updater.immigration_cell_probabilities()
+        rng = self._generator(RandomStreams.IMMIGRATION)
+        immigration_counts = rng.multinomial(num_immigrants.astype(np.int64), joint.ravel())
+        self.population[..., 1] += immigration_counts.reshape((len(num_immigrants),) + joint.shape)
+
+    def update_drinking_status(self):
+        """
+        Move the counts of every cell of every replicate to the next drinking stages with one multinomial draw.
+        :raises ValueError: If the current year is less than the initial year.
+        :raises RuntimeError: If the drinking transition tensor or the year's period is not found.
+        :return: None
+        """
+        probabilities = self._get_drinking_transition_probabilities()
+        rng = self._generator(RandomStreams.DRINKING)
+        # transitions[replicate, age, sex, race, from stage, immigrant, to stage]
+        transitions = rng.multinomial(self.population, probabilities[None, :, :, :, :, None, :])
+        self.population[...] = np.moveaxis(transitions.sum(axis=4), -1, 4)
+
+    def update_deaths(self):
+        """
+        Remove the year's deaths of every replicate with one binomial draw.
+        :raises ValueError: If the death lookup table for the current year is not found.
+        :return: None
+        """
+        death_rates = self._get_cell_death_rates()
+        rng = self._generator(RandomStreams.DEATH)
+        self.population -= rng.binomial(self.population, death_rates[None, :, :, :, None, None])
+
+    def update_age_population(self):
+        """
+        Shift every cohort of every replicate one year of age; the last age (100) absorbs the cohort below it.
+        """
+        self.population[:, -1] += self.population[:, -2]
+        self.population[:, 1:-1] = self.population[:, :-2].copy()
+        self.population[:, 0] = 0
+
+
+class BatchedSimulator(Simulator):
+    """
+    Simulator of a batch of cohort replicates with BatchedCohortSimulator. Every output year writes one summary
+    row per replicate, with a leading 'Replicate' column. Batches are meant for many small replicates run in
+    one process: checkpoints, resuming and the results cube are not supported.
+    """
+
+    ENGINES = {"batched": BatchedCohortSimulator}
+
+    def __init__(self, lookup_tables, initial_counts, output_file_name=None, seed=None, output_dir=None,
+                 result_sink=None):
+        """
+        Initialize the BatchedSimulator.
+
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :param initial_counts: Integer count tensor of shape (replicates,) + PopulationCodes.COUNT_TENSOR_SHAPE,
+                               or a list of count tensors, one per replicate.
+        :param output_file_name: Name of the output CSV file. Defaults to ExperimentConfig.CSV_OUTPUT_FILE.
+        :param seed: Seed of the batch. Defaults to ExperimentConfig.seed.
+        :param output_dir: Directory of the output files. Defaults to ExperimentConfig.OUTPUT_DIR.
+        :param result_sink: ResultSink receiving the summary rows. Defaults to the sink selected by
+                            ExperimentConfig.RESULT_SINK.
+        :raises ValueError: If the initial counts do not have the shape of a batch of count tensors.
+        """
+        initial_counts = np.array(initial_counts, dtype=np.int64)
+        if initial_counts.ndim != len(PopulationCodes.COUNT_TENSOR_SHAPE) + 1 or initial_counts.shape[1:] != PopulationCodes.COUNT_TENSOR_SHAPE:
+            logger.error(f"Batch of count tensors has shape {initial_counts.shape}, expected (replicates,) + "
+                         f"{PopulationCodes.COUNT_TENSOR_SHAPE}")
+            raise ValueError(f"Batch of count tensors has shape {initial_counts.shape}, expected (replicates,) + "
+                             f"{PopulationCodes.COUNT_TENSOR_SHAPE}")
+        super().__init__(lookup_tables, initial_counts, output_file_name, engine="batched", output_dir=output_dir,
+                         result_sink=result_sink, checkpoint_years=[])
+        self.results_cube = None
+        self.cube_output_file_name = None
+        self.seed = ExperimentConfig.seed if seed is None else int(seed)
+
+    def _get_output_columns(self):
+        """
+        Column names of the summary rows: 'Replicate' followed by the columns of Simulator.
+        """
+        return ["Replicate"] + super()._get_output_columns()
+
+    def _simulate_single_year(self, year):
+        """
+        Simulate a single year of every replicate.
+
+        :param year: The year to simulate.
+        """
+        BatchedCohortSimulator(self.lookup_tables, self.population, year, self.seed).simulate_single_year()
+
+    def _summarize_and_save_results(self, year):
+        """
+        Summarize every replicate for a given year and write one row per replicate to the result sink.
+
+        :param year: The year to summarize.
+        """
+        for replicate, counts in enumerate(self.population):
+            summary_row = [replicate] + self._summarize_counts(year, counts)
+            self.summary_rows.append(summary_row)
+            self.result_sink.write_row(summary_row)
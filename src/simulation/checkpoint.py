@@ -0,0 +1,149 @@
+import json
+import numbers
+import numpy as np
+import pandas as pd
+from src.common.common import Common_Fingerprint
+from src.common.constants import PopulationCodes
+from src.common.population import Population
+from src.simulation.results_cube import ResultsCube
+from src.common.logger import logger
+
+
+class SimulationCheckpoint:
+    """
+    State of a simulation at the end of a year, saved as a compressed NPZ file so that a run can be resumed
+    or extended without replaying the years before it. A checkpoint holds:
+
+    - the population: the compacted Population columns (agent engine) or the count tensor (cohort engine),
+    - the ID counter of the Population store,
+    - the seed of the random streams; every draw is keyed by (seed, year, stream, ID), so the seed is the
+      whole RNG state,
+    - the fingerprint of the lookup tables the run used up to the checkpointed year (see lookup_fingerprint_until),
+    - the summary rows already written and, when enabled, the results cube so far.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, year, engine, population, seed, lookup_fingerprint, summary_rows=None, cube=None):
+        """
+        Initialize the checkpoint.
+
+        :param year: Last simulated year.
+        :param engine: "agent" or "cohort".
+        :param population: Population store (agent engine) or count tensor (cohort engine).
+        :param seed: Seed of the random streams.
+        :param lookup_fingerprint: Fingerprint of the lookup tables, or None to allow resuming with any lookup tables.
+        :param summary_rows: Summary rows written up to and including year.
+        :param cube: Optional ResultsCube holding the count tensors written so far.
+        """
+        self.year = int(year)
+        self.engine = engine
+        self.population = population
+        self.seed = int(seed)
+        self.lookup_fingerprint = lookup_fingerprint
+        self.summary_rows = list(summary_rows) if summary_rows is not None else []
+        self.cube = cube
+
+    @staticmethod
+    def lookup_fingerprint_until(lookup_tables, year):
+        """
+        Fingerprint (Common_Fingerprint) of the lookup tables restricted to what decides the state up to the end of
+        year: tables keyed by integral numbers (years, as int or float), DataFrames with a Year column and the death
+        rate array are cut after year, the other tables are taken whole. Tables keyed by age pass the cut unchanged,
+        as ages never exceed year. The lookup tables are filtered to INITIAL_YEAR..END_YEAR, so the fingerprint does
+        not change when a run is resumed or extended with a later END_YEAR.
+
+        :param lookup_tables: Dictionary of lookup tables.
+        :param year: Last simulated year.
+        :return: Hexadecimal SHA-256 digest.
+        """
+        restricted = {}
+        for name, table in lookup_tables.items():
+            if name == "death_rate_array":
+                table = {**table, "rates": table["rates"][:max(year - table["first_year"] + 1, 0)]}
+            elif isinstance(table, pd.DataFrame) and "Year" in table.columns:
+                table = table[table["Year"] <= year]
+            elif isinstance(table, dict) and table and all(
+                    isinstance(key, numbers.Real) and not isinstance(key, bool) and float(key).is_integer()
+                    for key in table):
+                # The generators key some tables by float years (e.g. 2001.0), read from numeric sheet columns
+                table = {key: value for key, value in table.items() if key <= year}
+            restricted[name] = table
+        return Common_Fingerprint.fingerprint(restricted)
+
+    def save(self, file_path):
+        """
+        Save the checkpoint to a compressed NPZ file.
+
+        :param file_path: Path of the .npz file.
+        """
+        arrays = {
+            "format_version": np.array(self.FORMAT_VERSION),
+            "year": np.array(self.year),
+            "engine": np.array(self.engine),
+            "seed": np.array(self.seed),
+            "lookup_fingerprint": np.array(self.lookup_fingerprint or ""),
+            # Rows mix integer counts and float proportions; JSON keeps both exactly
+            "summary_rows": np.array(json.dumps(self.summary_rows, default=lambda value: value.item())),
+        }
+        if self.engine == "cohort":
+            arrays["counts"] = np.asarray(self.population, dtype=np.int64)
+        else:
+            arrays["next_id"] = np.array(self.population.next_id)
+            for name in Population.COLUMN_DTYPES:
+                arrays[f"population_{name}"] = self.population.living(name)
+        if self.cube is not None:
+            arrays["cube_years"] = np.array(self.cube.years, dtype=np.int64)
+            arrays["cube_counts"] = self.cube.to_array()
+
+        np.savez_compressed(file_path, **arrays)
+        logger.info(f"Saved checkpoint of year {self.year} to {file_path}")
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a checkpoint saved by save.
+
+        :param file_path: Path of the .npz file.
+        :return: SimulationCheckpoint instance.
+        :raises ValueError: If the file was written by an incompatible version.
+        """
+        with np.load(file_path) as data:
+            if int(data["format_version"]) != cls.FORMAT_VERSION:
+                logger.error(f"Checkpoint {file_path} has format version {int(data['format_version'])}, "
+                             f"expected {cls.FORMAT_VERSION}")
+                raise ValueError(f"Checkpoint {file_path} has format version {int(data['format_version'])}, "
+                                 f"expected {cls.FORMAT_VERSION}")
+            engine = str(data["engine"])
+            if engine == "cohort":
+                population = data["counts"].reshape(PopulationCodes.COUNT_TENSOR_SHAPE)
+            else:
+                population = Population({name: data[f"population_{name}"] for name in Population.COLUMN_DTYPES},
+                                        next_id=int(data["next_id"]))
+            cube = ResultsCube(data["cube_years"].tolist(), list(data["cube_counts"])) if "cube_years" in data else None
+            checkpoint = cls(int(data["year"]), engine, population, int(data["seed"]), str(data["lookup_fingerprint"]) or None,
+                             json.loads(str(data["summary_rows"])), cube)
+
+        logger.info(f"Loaded checkpoint of year {checkpoint.year} from {file_path}")
+        return checkpoint
+
+    def validate(self, lookup_tables, engine, seed):
+        """
+        Check that the checkpoint can be resumed with the given lookup tables, engine and seed.
+
+        :param lookup_tables: Lookup tables of the resumed run.
+        :param engine: Engine of the resumed run.
+        :param seed: Seed of the resumed run.
+        :raises ValueError: If any of them differs from the checkpointed run. The lookup tables are compared up
+                            to the checkpointed year only, and not at all when the checkpoint has no fingerprint.
+        """
+        if engine != self.engine:
+            logger.error(f"Checkpoint was written by the {self.engine} engine, cannot resume with {engine}.")
+            raise ValueError(f"Checkpoint was written by the {self.engine} engine, cannot resume with {engine}.")
+        if int(seed) != self.seed:
+            logger.error(f"Checkpoint was written with seed {self.seed}, cannot resume with seed {seed}.")
+            raise ValueError(f"Checkpoint was written with seed {self.seed}, cannot resume with seed {seed}.")
+        if (self.lookup_fingerprint is not None
+                and self.lookup_fingerprint_until(lookup_tables, self.year) != self.lookup_fingerprint):
+            logger.error("Checkpoint was written with different lookup tables.")
+            raise ValueError("Checkpoint was written with different lookup tables.")
@@ -0,0 +1,120 @@
+import numpy as np
+from src.simulation.single_year_simulator import SingleYearSimulator
+from src.config.simulation_config import ExperimentConfig
+from src.common.common import Common_Sampling, Common_CounterRNG
+from src.common.constants import PopulationCodes, RandomStreams
+from src.common.logger import logger
+
+
+class CohortSimulator(SingleYearSimulator):
+    """
+    Aggregate counterpart of SingleYearSimulator. Individuals never interact and their fate only depends on
+    (age, sex, race, drinking stage) and the year's lookups, so the population is held as a count tensor of
+    shape PopulationCodes.COUNT_TENSOR_SHAPE ([age, sex, race, drinking stage, immigrant flag]) and every
+    stage is a handful of binomial or multinomial draws over its cells. The cost of a year does not depend
+    on the population size, so the full-scale population can be simulated without INITIAL_POP_COEFFICIENT.
+    """
+
+    def __init__(self, lookup_tables, counts, year):
+        """
+        Initialize the CohortSimulator.
+
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :param counts: Integer count tensor of shape PopulationCodes.COUNT_TENSOR_SHAPE, updated in place.
+        :param year: The year to simulate.
+        """
+        super().__init__(lookup_tables, counts, year)
+        self.seed = ExperimentConfig.seed
+
+    def population_count(self):
+        """
+        Number of individuals in the count tensor.
+        """
+        return int(self.population.sum())
+
+    def update_births(self):
+        """
+        Add the year's births, drawn by sex and race, to the age 0, "Abs", non-immigrant cells.
+        :raises RuntimeError: If any of the required lookup tables for the current year are not found.
+        :return: None
+        """
+        birth_counts = self._create_birth_updater().generate_birth_counts(self.population_count(), self.year)
+        self.population[0, :, :, PopulationCodes.DRINKING_STAGES.index("Abs"), 0] += birth_counts
+
+    def update_immigration(self):
+        """
+        Add the year's immigrants, drawn by age, sex, race and drinking stage, to the immigrant cells.
+        :return: None
+        """
+        immigration_counts = self._create_immigration_updater().generate_immigration_counts(self.population_count(), self.year)
+        self.population[..., 1] += immigration_counts
+
+    def update_drinking_status(self):
+        """
+        Move the counts of every (age, sex, race, stage) cell to the next drinking stages with one multinomial
+        draw per cell over the period's transition row. Children and cells whose row is missing from the
+        transition sheet keep their stage, as in DrinkingStatusUpdater.
+        :raises ValueError: If the current year is less than the initial year.
+        :raises RuntimeError: If the drinking transition tensor or the year's period is not found.
+        :return: None
+        """
+        probabilities = self._get_drinking_transition_probabilities()
+        rng = Common_CounterRNG(self.seed).generator(self.year, RandomStreams.DRINKING)
+        # transitions[age, sex, race, from stage, immigrant, to stage]
+        transitions = rng.multinomial(self.population, probabilities[:, :, :, :, None, :])
+        self.population[...] = np.moveaxis(transitions.sum(axis=3), -1, 3)
+
+    def _get_drinking_transition_probabilities(self):
+        """
+        Transition probabilities of the year's period for every (age, sex, race, stage) cell. Children and
+        cells whose row is missing from the transition sheet keep their stage.
+
+        :raises ValueError: If the current year is less than the initial year.
+        :raises RuntimeError: If the drinking transition tensor or the year's period is not found.
+        :return: Float array of shape (MAX_AGE + 1, len(SEXES), len(RACES), stages, stages).
+        """
+        drinking_year_group = self._get_drinking_year_group()
+        tensor = self._get_drinking_transition_tensor()
+        if drinking_year_group not in tensor["periods"]:
+            logger.error(f"Drinking status lookup for period {drinking_year_group} not found.")
+            raise RuntimeError(f"Drinking status lookup for period {drinking_year_group} not found.")
+        period = tensor["periods"].index(drinking_year_group)
+
+        age_group_codes = tensor["age_group_by_age"]
+        probabilities = Common_Sampling.cdf_to_probabilities(tensor["cdf"][period, np.maximum(age_group_codes, 0)])
+        num_stages = len(PopulationCodes.DRINKING_STAGES)
+        probabilities = probabilities.reshape(PopulationCodes.MAX_AGE + 1, len(PopulationCodes.SEXES),
+                                              len(PopulationCodes.RACES), num_stages, num_stages)
+        no_transition = np.isnan(probabilities[..., 0]) | (age_group_codes < 0)[:, None, None, None]
+        probabilities[no_transition] = np.eye(num_stages)[np.nonzero(no_transition)[-1]]
+        return probabilities
+
+    def update_deaths(self):
+        """
+        Remove the year's deaths with one binomial draw per cell on the death rate of its composite and age.
+        :raises ValueError: If the death lookup table for the current year is not found.
+        :return: None
+        """
+        death_rates = self._get_cell_death_rates()
+        rng = Common_CounterRNG(self.seed).generator(self.year, RandomStreams.DEATH)
+        self.population -= rng.binomial(self.population, death_rates[:, :, :, None, None])
+
+    def _get_cell_death_rates(self):
+        """
+        Death rate of every (age, sex, race) cell for the current year.
+
+        :raises ValueError: If the death lookup table for the current year is not found.
+        :return: Float array of shape (MAX_AGE + 1, len(SEXES), len(RACES)).
+        """
+        death_rates = self._get_death_rates().reshape(len(PopulationCodes.SEXES), len(PopulationCodes.RACES), -1)
+        # A missing rate is certain death, as in the agent-based engine's survival check (DeathUpdater)
+        return np.nan_to_num(np.moveaxis(death_rates, -1, 0), nan=1.0)
+
+    def update_age_population(self):
+        """
+        Shift every cohort one year of age; the last age (100) is an open-ended group that absorbs the cohort
+        below it.
+        """
+        self.population[-1] += self.population[-2]
+        self.population[1:-1] = self.population[:-2].copy()
+        self.population[0] = 0
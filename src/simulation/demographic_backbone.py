@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+from src.simulation.single_year_simulator import SingleYearSimulator
+from src.simulation.simulator import Simulator
+from src.config.simulation_config import ExperimentConfig
+from src.common.common import Common_Fingerprint
+from src.common.constants import InitializationConstants, PopulationCodes
+from src.common.population import Population
+from src.common.logger import logger
+
+
+class _BackboneYearSimulator(SingleYearSimulator):
+    """
+    SingleYearSimulator recording the entrants and deaths of a year for the demographic backbone. The drinking
+    stage update is skipped: births, immigration and deaths never depend on it.
+    """
+
+    def __init__(self, lookup_tables, population, year):
+        super().__init__(lookup_tables, population, year)
+        self.first_new_id = population.next_id
+        self.entrants = None
+        self.dead_ids = None
+
+    def update_drinking_status(self):
+        pass
+
+    def update_deaths(self):
+        """
+        Record the year's entrants (still all alive), then update the deaths and record who died.
+        """
+        entrants = self.population.id >= self.first_new_id
+        self.entrants = {name: self.population.column(name)[entrants].copy() for name in Population.COLUMN_DTYPES}
+        living_before = self.population.living(InitializationConstants.ID_KEY).copy()
+        super().update_deaths()
+        # IDs stay sorted in the store (appended IDs only grow and compaction keeps the order)
+        living_after = self.population.living(InitializationConstants.ID_KEY)
+        positions = np.minimum(np.searchsorted(living_after, living_before), max(len(living_after) - 1, 0))
+        survived = living_after[positions] == living_before if len(living_after) else np.zeros(len(living_before), dtype=bool)
+        self.dead_ids = living_before[~survived]
+
+
+class DemographicBackbone:
+    """
+    Demographic trajectory of an agent-based run: everyone who ever exists between INITIAL_YEAR and END_YEAR,
+    with their state on entry (age, sex, race, immigrant flag and drinking stage) and their entry and exit
+    years. Births, deaths and immigration depend only on age, sex, race, the population size and the
+    (seed, year, ID) keyed draws, never on drinking stages, so the backbone is the same for every drinking
+    transition scenario run with the same seed and demographic lookups. DrinkingReplaySimulator replays only
+    the drinking layer on top of it.
+
+    In year y an individual is present during the drinking update when entry_year <= y <= exit_year and
+    alive at the end of the year when entry_year <= y < exit_year; exit_year is the year of death, or
+    NO_EXIT for survivors.
+    """
+
+    NO_EXIT = np.iinfo(np.int16).max
+    # Lookup tables the demographic trajectory depends on; immigrants draw their entry drinking stage from
+    # initial_pop_drinking_status_lookup
+    DEMOGRAPHIC_LOOKUP_KEYS = [
+        "birth_rate_table", "birth_male_ratio_table", "birth_race_lookup_under_5_table",
+        "immigration_rate_lookup", "immigration_age_lookup", "immigration_sex_lookup", "immigration_race_lookup",
+        "initial_pop_drinking_status_lookup", "death_rate_array",
+    ]
+
+    def __init__(self, individuals, entry_year, exit_year, initial_year, end_year, seed, lookup_fingerprint):
+        """
+        Initialize the backbone.
+
+        :param individuals: Population store of every individual in their entry state, sorted by ID.
+        :param entry_year: Entry year of every individual.
+        :param exit_year: Year of death of every individual, NO_EXIT for survivors.
+        :param initial_year: First year of the recorded run.
+        :param end_year: Last year of the recorded run.
+        :param seed: Seed of the recorded run.
+        :param lookup_fingerprint: Fingerprint of the demographic lookup tables (see demographic_fingerprint).
+        """
+        self.individuals = individuals
+        self.entry_year = np.asarray(entry_year, dtype=np.int16)
+        self.exit_year = np.asarray(exit_year, dtype=np.int16)
+        self.initial_year = int(initial_year)
+        self.end_year = int(end_year)
+        self.seed = int(seed)
+        self.lookup_fingerprint = lookup_fingerprint
+
+    def __len__(self):
+        return len(self.individuals)
+
+    @classmethod
+    def demographic_fingerprint(cls, lookup_tables):
+        """
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :return: Fingerprint of the demographic lookup tables.
+        """
+        return Common_Fingerprint.fingerprint({key: lookup_tables[key] for key in cls.DEMOGRAPHIC_LOOKUP_KEYS
+                                               if key in lookup_tables})
+
+    @classmethod
+    def record(cls, lookup_tables, initial_population):
+        """
+        Simulate the demographic layer from ExperimentConfig.INITIAL_YEAR to ExperimentConfig.END_YEAR with the
+        agent-based engine, skipping the drinking updates, and record every entry and exit.
+
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :param initial_population: Initial population, as a Population store or a DataFrame.
+        :return: DemographicBackbone instance.
+        """
+        if isinstance(initial_population, pd.DataFrame):
+            initial_population = Population.from_dataframe(initial_population)
+        order = np.argsort(initial_population.living(InitializationConstants.ID_KEY), kind="stable")
+        population = Population({name: initial_population.living(name)[order] for name in Population.COLUMN_DTYPES},
+                                next_id=initial_population.next_id)
+        individuals = population.copy()
+        entry_year = [np.full(len(population), ExperimentConfig.INITIAL_YEAR, dtype=np.int16)]
+
+        logger.info("Recording the demographic backbone.")
+        dead = []
+        for year in range(ExperimentConfig.INITIAL_YEAR + 1, ExperimentConfig.END_YEAR + 1):
+            recorder = _BackboneYearSimulator(lookup_tables, population, year)
+            recorder.simulate_single_year()
+            population = recorder.population
+            individuals.append(recorder.entrants)
+            entry_year.append(np.full(len(recorder.entrants[InitializationConstants.ID_KEY]), year, dtype=np.int16))
+            dead.append((recorder.dead_ids, year))
+
+        exit_year = np.full(len(individuals), cls.NO_EXIT, dtype=np.int16)
+        for dead_ids, year in dead:
+            exit_year[np.searchsorted(individuals.id, dead_ids)] = year
+
+        logger.info(f"Demographic backbone recorded: {len(individuals)} individuals.")
+        return cls(individuals, np.concatenate(entry_year), exit_year, ExperimentConfig.INITIAL_YEAR,
+                   ExperimentConfig.END_YEAR, ExperimentConfig.seed, cls.demographic_fingerprint(lookup_tables))
+
+    def save(self, file_path):
+        """
+        Save the backbone to a compressed NPZ file.
+
+        :param file_path: Path of the .npz file.
+        """
+        np.savez_compressed(
+            file_path,
+            entry_year=self.entry_year,
+            exit_year=self.exit_year,
+            initial_year=np.array(self.initial_year),
+            end_year=np.array(self.end_year),
+            seed=np.array(self.seed),
+            lookup_fingerprint=np.array(self.lookup_fingerprint),
+            next_id=np.array(self.individuals.next_id),
+            **{f"individuals_{name}": self.individuals.column(name) for name in Population.COLUMN_DTYPES},
+        )
+        logger.info(f"Saved demographic backbone of {len(self)} individuals to {file_path}")
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a backbone saved by save.
+
+        :param file_path: Path of the .npz file.
+        :return: DemographicBackbone instance.
+        """
+        with np.load(file_path) as data:
+            individuals = Population({name: data[f"individuals_{name}"] for name in Population.COLUMN_DTYPES},
+                                     next_id=int(data["next_id"]))
+            return cls(individuals, data["entry_year"], data["exit_year"], int(data["initial_year"]),
+                       int(data["end_year"]), int(data["seed"]), str(data["lookup_fingerprint"]))
+
+    def validate(self, lookup_tables, seed, end_year):
+        """
+        Check that the backbone can be replayed with the given lookup tables, seed and end year.
+
+        :param lookup_tables: Lookup tables of the replay.
+        :param seed: Seed of the replay.
+        :param end_year: Last year of the replay.
+        :raises ValueError: If the seed or the demographic lookup tables differ from the recorded run, or the
+                            backbone does not cover the years to replay.
+        """
+        if int(seed) != self.seed:
+            logger.error(f"Backbone was recorded with seed {self.seed}, cannot replay with seed {seed}.")
+            raise ValueError(f"Backbone was recorded with seed {self.seed}, cannot replay with seed {seed}.")
+        if self.demographic_fingerprint(lookup_tables) != self.lookup_fingerprint:
+            logger.error("Backbone was recorded with different demographic lookup tables.")
+            raise ValueError("Backbone was recorded with different demographic lookup tables.")
+        if end_year > self.end_year:
+            logger.error(f"Backbone ends in {self.end_year}, cannot replay until {end_year}.")
+            raise ValueError(f"Backbone ends in {self.end_year}, cannot replay until {end_year}.")
+
+    def present(self, year, after_deaths=True):
+        """
+        :param year: The year.
+        :param after_deaths: Whether to exclude the individuals who die during the year.
+        :return: Boolean mask of the individuals present in the year.
+        """
+        exited = self.exit_year <= year if after_deaths else self.exit_year < year
+        return (self.entry_year <= year) & ~exited
+
+    def ages(self, year):
+        """
+        :param year: The year.
+        :return: Age of every individual in the year (entry age before entry), capped at PopulationCodes.MAX_AGE.
+        """
+        ages = self.individuals.age.astype(np.int16) + np.maximum(year - self.entry_year, 0)
+        return np.minimum(ages, PopulationCodes.MAX_AGE)
+
+
+class DrinkingReplaySimulator(Simulator):
+    """
+    Simulator replaying only the drinking layer on top of a recorded DemographicBackbone. Every individual
+    of the backbone is one slot of the population store; each year the ages and the alive mask are set from
+    the backbone and only DrinkingStatusUpdater runs. The draws are keyed by (seed, year, ID), so the results
+    are identical to a full agent-based run with the same lookup tables.
+    """
+
+    def __init__(self, lookup_tables, backbone, output_file_name=None, cube_output_file_name=None, output_dir=None,
+                 result_sink=None):
+        """
+        Initialize the DrinkingReplaySimulator.
+
+        :param lookup_tables: Dictionary containing lookup tables; only the drinking transition tables may differ
+                              from the ones the backbone was recorded with.
+        :param backbone: DemographicBackbone instance, or the path of a saved backbone.
+        :param output_file_name: Name of the output file. Defaults to ExperimentConfig.CSV_OUTPUT_FILE.
+        :param cube_output_file_name: Optional name of the results cube file.
+        :param output_dir: Directory of the output files. Defaults to ExperimentConfig.OUTPUT_DIR.
+        :param result_sink: Optional ResultSink receiving the yearly summary rows.
+        :raises ValueError: If the backbone does not match the lookup tables, seed or simulated years.
+        """
+        self.backbone = backbone if isinstance(backbone, DemographicBackbone) else DemographicBackbone.load(backbone)
+        self.backbone.validate(lookup_tables, ExperimentConfig.seed, ExperimentConfig.END_YEAR)
+        population = self.backbone.individuals.copy()
+        super().__init__(lookup_tables, population, output_file_name, engine="agent",
+                         cube_output_file_name=cube_output_file_name, output_dir=output_dir, result_sink=result_sink,
+                         checkpoint_years=[])
+        self._apply_backbone(ExperimentConfig.INITIAL_YEAR, after_deaths=True)
+
+    def _apply_backbone(self, year, after_deaths):
+        """
+        Set the ages and the alive mask of the population store to the backbone's state in the year.
+        """
+        self.population.writable(InitializationConstants.AGE_KEY)[:] = self.backbone.ages(year)
+        self.population.set_alive(self.backbone.present(year, after_deaths))
+
+    def _simulate_single_year(self, year):
+        """
+        Replay the drinking update of a year on the individuals present at that point of the year (survivors of
+        the previous year and the year's entrants), then remove the year's deaths.
+
+        :param year: The year to simulate.
+        """
+        self._apply_backbone(year, after_deaths=False)
+        SingleYearSimulator(self.lookup_tables, self.population, year).update_drinking_status()
+        self._apply_backbone(year, after_deaths=True)
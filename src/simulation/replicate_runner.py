@@ -0,0 +1,191 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from src.initialization.initial_population_generator import PopulationInitializer
+from src.simulation.simulator import Simulator
+from src.simulation.batched_cohort_simulator import BatchedSimulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from src.common.logger import logger
+
+# Lookup tables of a worker process, attached once by _initialize_worker
+_worker_lookup_tables = None
+
+
+class _SharedArray:
+    """
+    Placeholder of a lookup array published as a memory-mapped .npy file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+
+def _publish(value, directory, counter):
+    """
+    Replace every numeric array of a lookup structure by a _SharedArray saved in the directory.
+    """
+    if isinstance(value, dict):
+        return {key: _publish(item, directory, counter) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_publish(item, directory, counter) for item in value)
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        file_path = os.path.join(directory, f"lookup_{len(counter)}.npy")
+        counter.append(file_path)
+        np.save(file_path, value)
+        return _SharedArray(file_path)
+    return value
+
+
+def _attach(value):
+    """
+    Replace every _SharedArray of a published lookup structure by a read-only memory-mapped array.
+    """
+    if isinstance(value, dict):
+        return {key: _attach(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_attach(item) for item in value)
+    if isinstance(value, _SharedArray):
+        return np.load(value.file_path, mmap_mode="r")
+    return value
+
+
+def _initialize_worker(config, published_lookup_tables):
+    """
+    Process pool initializer: apply the parent's configuration and attach the published lookup tables.
+    """
+    global _worker_lookup_tables
+    for name, value in config.items():
+        setattr(ExperimentConfig, name, value)
+    _worker_lookup_tables = _attach(published_lookup_tables)
+
+
+def _create_population_initializer(lookup_tables):
+    return PopulationInitializer(lookup_tables['initial_pop_age_lookup'],
+                                 lookup_tables['initial_pop_sex_lookup'],
+                                 lookup_tables['initial_pop_race_lookup'],
+                                 lookup_tables['initial_pop_drinking_status_lookup'])
+
+
+def _run_replicate(replicate, seed, engine):
+    """
+    Run one replicate in a worker process: draw the initial population and simulate it with the given seed.
+
+    :return: Tuple (replicate, seed, summary DataFrame).
+    """
+    ExperimentConfig.seed = seed
+    lookup_tables = _worker_lookup_tables
+    population_initializer = _create_population_initializer(lookup_tables)
+    if engine == "cohort":
+        initial_population = population_initializer.generate_initial_population_counts()
+    else:
+        initial_population = population_initializer.generate_initial_population_columns()
+    summary = Simulator(lookup_tables, initial_population, engine=engine, result_sink=MemoryResultSink(),
+                        checkpoint_years=[]).simulate()
+    return replicate, seed, summary
+
+
+class ReplicateRunner:
+    """
+    Runs Monte Carlo replicates of one configuration in a process pool. The lookup tables are built once by the
+    caller; their numeric arrays are published as memory-mapped .npy files (in /dev/shm when available) that
+    every worker maps read-only, and the rest of the lookup structure is sent once per worker through the pool
+    initializer rather than with every task. Each replicate draws its own initial population and runs with its
+    own seed; replicates are independent, so throughput scales with the number of workers.
+
+    The "batched" engine runs every replicate in the calling process instead, as one BatchedSimulator over
+    cohort count tensors with a replicate axis. Each replicate draws its initial population with its own
+    seed; the yearly draws of the batch are keyed by the first seed. This suits many replicates of small
+    populations, where the per-replicate interpreter overhead dominates.
+    """
+
+    def __init__(self, lookup_tables, engine=None, max_workers=None):
+        """
+        Initialize the ReplicateRunner.
+
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :param engine: "agent", "cohort" or "batched". Defaults to ExperimentConfig.SIMULATION_ENGINE.
+        :param max_workers: Number of worker processes. Defaults to ExperimentConfig.REPLICATE_WORKERS, or the
+                            number of CPUs when unset.
+        """
+        self.lookup_tables = lookup_tables
+        self.engine = engine if engine else ExperimentConfig.SIMULATION_ENGINE
+        self.max_workers = max_workers if max_workers else (ExperimentConfig.REPLICATE_WORKERS or os.cpu_count() or 1)
+
+    @staticmethod
+    def default_seeds(num_replicates):
+        """
+        :param num_replicates: Number of replicates.
+        :return: Seeds ExperimentConfig.seed, ExperimentConfig.seed + 1, ... Every seed keys its own
+                 counter-based random streams, so consecutive seeds give independent replicates.
+        """
+        return [ExperimentConfig.seed + replicate for replicate in range(num_replicates)]
+
+    @staticmethod
+    def worker_config():
+        """
+        Public ExperimentConfig attributes to apply in the workers, which may not inherit the parent's
+        modifications. Replicates never write cubes or checkpoints.
+        """
+        config = {name: value for name, value in vars(ExperimentConfig).items() if not name.startswith("_")}
+        config.update(CUBE_OUTPUT_FILE=None, CHECKPOINT_YEARS=[])
+        return config
+
+    def run(self, num_replicates=None, seeds=None):
+        """
+        Run the replicates.
+
+        :param num_replicates: Number of replicates, using default_seeds. Ignored when seeds is given.
+        :param seeds: Explicit list of seeds, one per replicate.
+        :return: DataFrame of the yearly summary rows of every replicate, with 'Replicate' and 'Seed' columns
+                 first, ordered by replicate.
+        :raises ValueError: If neither num_replicates nor seeds is given.
+        """
+        if seeds is None:
+            if not num_replicates:
+                logger.error("Either num_replicates or seeds must be given.")
+                raise ValueError("Either num_replicates or seeds must be given.")
+            seeds = self.default_seeds(num_replicates)
+        seeds = [int(seed) for seed in seeds]
+        if self.engine == "batched":
+            return self._run_batched(seeds)
+        logger.info(f"Running {len(seeds)} replicates with {self.max_workers} workers.")
+
+        shared_directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        with tempfile.TemporaryDirectory(dir=shared_directory) as directory:
+            published_lookup_tables = _publish(self.lookup_tables, directory, [])
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(seeds)), initializer=_initialize_worker,
+                                     initargs=(self.worker_config(), published_lookup_tables)) as executor:
+                futures = [executor.submit(_run_replicate, replicate, seed, self.engine)
+                           for replicate, seed in enumerate(seeds)]
+                replicates = [future.result() for future in futures]
+
+        summaries = []
+        for replicate, seed, summary in replicates:
+            summary.insert(0, "Seed", seed)
+            summary.insert(0, "Replicate", replicate)
+            summaries.append(summary)
+        logger.info(f"Completed {len(seeds)} replicates.")
+        return pd.concat(summaries, ignore_index=True)
+
+    def _run_batched(self, seeds):
+        """
+        Run every replicate in one BatchedSimulator.
+
+        :param seeds: Seeds of the initial populations; the first one also seeds the yearly draws.
+        :return: DataFrame in the layout of run.
+        """
+        logger.info(f"Running {len(seeds)} batched replicates.")
+        population_initializer = _create_population_initializer(self.lookup_tables)
+        initial_counts = []
+        for seed in seeds:
+            population_initializer.seed = seed
+            initial_counts.append(population_initializer.generate_initial_population_counts())
+        summary = BatchedSimulator(self.lookup_tables, initial_counts, seed=seeds[0],
+                                   result_sink=MemoryResultSink()).simulate()
+        summary.insert(1, "Seed", [seeds[replicate] for replicate in summary["Replicate"]])
+        summary = summary.sort_values(["Replicate", "Year"], kind="stable", ignore_index=True)
+        logger.info(f"Completed {len(seeds)} batched replicates.")
+        return summary
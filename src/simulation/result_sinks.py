@@ -0,0 +1,142 @@
+import abc
+import csv
+import os
+import pandas as pd
+from src.common.logger import logger
+
+
+class ResultSink(abc.ABC):
+    """
+    Destination of the yearly summary rows written by Simulator. A sink is opened once with the column
+    names, receives one row per output year and is closed at the end of the simulation.
+    """
+
+    def open(self, columns):
+        """
+        Prepare the sink for a new simulation.
+
+        :param columns: List of column names of the summary rows.
+        """
+        self.columns = list(columns)
+
+    @abc.abstractmethod
+    def write_row(self, row):
+        """
+        Write one summary row.
+
+        :param row: List of values aligned with the columns.
+        """
+
+    def close(self):
+        """
+        Flush and release the resources of the sink.
+        """
+
+    def result(self):
+        """
+        :return: The collected results for sinks that keep them in memory, None otherwise.
+        """
+        return None
+
+
+class CSVResultSink(ResultSink):
+    """
+    CSV sink that keeps a single buffered file handle open for the whole simulation.
+    """
+
+    def __init__(self, file_path, buffer_size=1 << 20):
+        """
+        :param file_path: Path of the CSV file, overwritten when the sink is opened.
+        :param buffer_size: Size in bytes of the write buffer of the file handle.
+        """
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+        self._file = None
+        self._writer = None
+
+    def open(self, columns):
+        super().open(columns)
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        self._file = open(self.file_path, mode='w', newline='', buffering=self.buffer_size)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write_row(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            logger.info(f"Results written to {self.file_path}")
+
+
+class ParquetResultSink(ResultSink):
+    """
+    Parquet sink that batches rows into Arrow record batches. Requires the optional pyarrow dependency.
+    Columns whose name contains 'Proportion' are stored as float64, all the others as int64.
+    """
+
+    def __init__(self, file_path, batch_size=64):
+        """
+        :param file_path: Path of the Parquet file, overwritten when the sink is opened.
+        :param batch_size: Number of rows buffered before a record batch is written.
+        :raises ImportError: If pyarrow is not installed.
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            logger.error("pyarrow is required to write Parquet results.")
+            raise ImportError("pyarrow is required to write Parquet results.") from e
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self._rows = []
+        self._writer = None
+
+    def open(self, columns):
+        super().open(columns)
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        self._schema = self._pa.schema([
+            (column, self._pa.float64() if "Proportion" in column else self._pa.int64()) for column in self.columns
+        ])
+        self._writer = self._pq.ParquetWriter(self.file_path, self._schema)
+        self._rows = []
+
+    def write_row(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._write_batch()
+
+    def _write_batch(self):
+        if not self._rows:
+            return
+        arrays = [self._pa.array([row[index] for row in self._rows], type=field.type)
+                  for index, field in enumerate(self._schema)]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+        self._rows = []
+
+    def close(self):
+        if self._writer is not None:
+            self._write_batch()
+            self._writer.close()
+            self._writer = None
+            logger.info(f"Results written to {self.file_path}")
+
+
+class MemoryResultSink(ResultSink):
+    """
+    Sink that keeps the rows in memory; Simulator.simulate returns them as a DataFrame.
+    """
+
+    def open(self, columns):
+        super().open(columns)
+        self._rows = []
+
+    def write_row(self, row):
+        self._rows.append(list(row))
+
+    def result(self):
+        return pd.DataFrame(self._rows, columns=self.columns)
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+from src.common.constants import InitializationConstants, PopulationCodes
+from src.common.logger import logger
+
+
+class ResultsCube:
+    """
+    Full-resolution simulation results: the count tensor of every output year, indexed by
+    [year, age, sex, race, drinking stage, immigrant flag]. Any breakdown of the CSV summary (and many
+    more) can be derived from it offline. The cube is stored as a compressed NPZ file.
+    """
+
+    def __init__(self, years=None, counts=None):
+        """
+        Initialize the results cube.
+
+        :param years: Optional list of years already in the cube.
+        :param counts: Optional list of count tensors of shape PopulationCodes.COUNT_TENSOR_SHAPE aligned with years.
+        """
+        self.years = list(years) if years is not None else []
+        self.counts = list(counts) if counts is not None else []
+
+    def __len__(self):
+        return len(self.years)
+
+    def append(self, year, counts):
+        """
+        Add the count tensor of a year.
+
+        :param year: The year.
+        :param counts: Count tensor of shape PopulationCodes.COUNT_TENSOR_SHAPE. It is copied.
+        :raises ValueError: If the tensor does not have the expected shape.
+        """
+        if counts.shape != PopulationCodes.COUNT_TENSOR_SHAPE:
+            logger.error(f"Count tensor has shape {counts.shape}, expected {PopulationCodes.COUNT_TENSOR_SHAPE}")
+            raise ValueError(f"Count tensor has shape {counts.shape}, expected {PopulationCodes.COUNT_TENSOR_SHAPE}")
+        self.years.append(int(year))
+        self.counts.append(np.array(counts, dtype=np.int64))
+
+    def to_array(self):
+        """
+        :return: Integer array of shape (len(years),) + PopulationCodes.COUNT_TENSOR_SHAPE.
+        """
+        return np.stack(self.counts) if self.counts else np.zeros((0,) + PopulationCodes.COUNT_TENSOR_SHAPE, dtype=np.int64)
+
+    def save(self, file_path):
+        """
+        Save the cube and its axis labels to a compressed NPZ file.
+
+        :param file_path: Path of the .npz file.
+        """
+        np.savez_compressed(
+            file_path,
+            years=np.array(self.years, dtype=np.int64),
+            counts=self.to_array(),
+            sexes=np.array(PopulationCodes.SEXES),
+            races=np.array(PopulationCodes.RACES),
+            drinking_stages=np.array(PopulationCodes.DRINKING_STAGES),
+        )
+        logger.info(f"Saved results cube with {len(self)} years to {file_path}")
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a cube saved by save.
+
+        :param file_path: Path of the .npz file.
+        :return: ResultsCube instance.
+        :raises ValueError: If the file was written with different population codes.
+        """
+        with np.load(file_path) as data:
+            labels = (list(data["sexes"]), list(data["races"]), list(data["drinking_stages"]))
+            if labels != (PopulationCodes.SEXES, PopulationCodes.RACES, PopulationCodes.DRINKING_STAGES):
+                logger.error(f"Results cube {file_path} uses different population codes: {labels}")
+                raise ValueError(f"Results cube {file_path} uses different population codes: {labels}")
+            return cls(data["years"].tolist(), list(data["counts"]))
+
+    def to_dataframe(self):
+        """
+        Long-format view of the non-empty cells, with one row per (year, age, sex, race, drinking stage,
+        immigrant flag) and a 'Count' column.
+
+        :return: pandas DataFrame.
+        """
+        cube = self.to_array()
+        cells = np.nonzero(cube)
+        return pd.DataFrame({
+            "Year": np.array(self.years, dtype=np.int64)[cells[0]],
+            InitializationConstants.AGE_KEY: cells[1],
+            InitializationConstants.GENDER_KEY: np.array(PopulationCodes.SEXES)[cells[2]],
+            InitializationConstants.RACE_KEY: np.array(PopulationCodes.RACES)[cells[3]],
+            InitializationConstants.DRINKING_STAGE_KEY: np.array(PopulationCodes.DRINKING_STAGES)[cells[4]],
+            InitializationConstants.IMMIGRATION_KEY: cells[5].astype(bool),
+            "Count": cube[cells],
+        })
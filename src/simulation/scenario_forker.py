@@ -0,0 +1,86 @@
+import os
+from src.simulation.simulator import Simulator
+from src.simulation.results_cube import ResultsCube
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from src.common.logger import logger
+
+
+class ScenarioForker:
+    """
+    Runs scenarios that share their history up to a fork year and only diverge afterwards (different drinking
+    transition probabilities, interventions, ...). The common prefix is simulated once with the baseline lookup
+    tables and kept as an in-memory snapshot; every scenario branch resumes from it with its own lookup tables.
+    Branches share the prefix population copy-on-write (Population.fork), so forking N scenarios does not
+    duplicate the population up front. All branches use the same seed, so differences between scenarios are
+    not blurred by sampling noise.
+    """
+
+    def __init__(self, lookup_tables, initial_population, fork_year, engine=None, output_dir=None):
+        """
+        Initialize the ScenarioForker.
+
+        :param lookup_tables: Lookup tables of the common prefix.
+        :param initial_population: Initial population, as accepted by Simulator.
+        :param fork_year: Last year of the common prefix; branches simulate from fork_year + 1.
+        :param engine: "agent" or "cohort". Defaults to ExperimentConfig.SIMULATION_ENGINE.
+        :param output_dir: Directory of the branch output files. Defaults to ExperimentConfig.OUTPUT_DIR.
+        :raises ValueError: If the fork year is outside the simulated years.
+        """
+        if not ExperimentConfig.INITIAL_YEAR <= fork_year < ExperimentConfig.END_YEAR:
+            logger.error(f"Fork year {fork_year} must be in [{ExperimentConfig.INITIAL_YEAR}, {ExperimentConfig.END_YEAR}).")
+            raise ValueError(f"Fork year {fork_year} must be in [{ExperimentConfig.INITIAL_YEAR}, {ExperimentConfig.END_YEAR}).")
+        self.lookup_tables = lookup_tables
+        self.initial_population = initial_population
+        self.fork_year = fork_year
+        self.engine = engine
+        self.output_dir = output_dir
+        self.snapshot = None
+
+    def warm_up(self):
+        """
+        Simulate the common prefix up to the fork year and keep its snapshot. Called by fork if needed.
+
+        :return: The SimulationCheckpoint of the fork year.
+        """
+        logger.info(f"Simulating the common prefix up to year {self.fork_year}.")
+        simulator = Simulator(self.lookup_tables, self.initial_population, engine=self.engine,
+                              output_dir=self.output_dir, result_sink=MemoryResultSink(), checkpoint_years=[])
+        # Keep the prefix cube so that branches saving a cube get every year
+        simulator.results_cube = ResultsCube()
+        simulator.simulate(end_year=self.fork_year)
+        self.snapshot = simulator.snapshot(fingerprint_lookup_tables=False)
+        self.initial_population = None
+        return self.snapshot
+
+    def fork(self, lookup_tables, output_file_name=None, result_sink=None, cube_output_file_name=None):
+        """
+        Create the simulator of a scenario branch continuing from the fork year.
+
+        :param lookup_tables: Lookup tables of the branch.
+        :param output_file_name: Name of the branch output file.
+        :param result_sink: Optional ResultSink of the branch.
+        :param cube_output_file_name: Optional name of the branch results cube file.
+        :return: Simulator resumed from the fork year snapshot.
+        """
+        if self.snapshot is None:
+            self.warm_up()
+        return Simulator(lookup_tables, None, output_file_name, engine=self.snapshot.engine,
+                         cube_output_file_name=cube_output_file_name, output_dir=self.output_dir,
+                         result_sink=result_sink, checkpoint_years=[], resume_from=self.snapshot)
+
+    def run(self, scenarios, output_file_name=None):
+        """
+        Run every scenario branch from the fork year to ExperimentConfig.END_YEAR.
+
+        :param scenarios: Dictionary of scenario name to lookup tables.
+        :param output_file_name: Base name of the output files; each branch writes '<stem>_<scenario><ext>'.
+                                 Defaults to ExperimentConfig.CSV_OUTPUT_FILE.
+        :return: Dictionary of scenario name to the result of Simulator.simulate.
+        """
+        stem, extension = os.path.splitext(output_file_name if output_file_name else ExperimentConfig.CSV_OUTPUT_FILE)
+        results = {}
+        for name, lookup_tables in scenarios.items():
+            logger.info(f"Running scenario {name} from year {self.fork_year + 1}.")
+            results[name] = self.fork(lookup_tables, f"{stem}_{name}{extension}").simulate()
+        return results
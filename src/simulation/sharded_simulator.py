@@ -0,0 +1,240 @@
+import multiprocessing
+import numpy as np
+from src.simulation.single_year_simulator import SingleYearSimulator
+from src.simulation.simulator import Simulator
+from src.simulation.replicate_runner import ReplicateRunner
+from src.config.simulation_config import ExperimentConfig
+from src.common.constants import InitializationConstants
+from src.common.population import Population
+from src.common.logger import logger
+
+
+class _ShardYearSimulator(SingleYearSimulator):
+    """
+    SingleYearSimulator of one shard: births and immigrants are drawn by the coordinator from the global
+    population size, so the shard only appends its share of them.
+    """
+
+    def __init__(self, lookup_tables, population, year, births, immigrants):
+        super().__init__(lookup_tables, population, year)
+        self.births = births
+        self.immigrants = immigrants
+
+    def update_births(self):
+        self.population.append(self.births)
+
+    def update_immigration(self):
+        self.population.append(self.immigrants)
+
+
+def _run_shard(connection, config, lookup_tables, columns, next_id):
+    """
+    Worker process owning one shard of the population. Commands received on the connection:
+
+    - ("year", year, births, immigrants, summarize): simulate the year on the shard and send back
+      (number of living individuals, count tensor if summarize else None);
+    - ("population",): send back the living columns of the shard;
+    - ("stop",): exit.
+
+    An exception raised by a command is sent back instead of its result.
+    """
+    for name, value in config.items():
+        setattr(ExperimentConfig, name, value)
+    population = Population(columns, next_id=next_id)
+    while True:
+        command, *arguments = connection.recv()
+        if command == "stop":
+            break
+        try:
+            if command == "year":
+                year, births, immigrants, summarize = arguments
+                shard_simulator = _ShardYearSimulator(lookup_tables, population, year, births, immigrants)
+                shard_simulator.simulate_single_year()
+                population = shard_simulator.population
+                connection.send((len(population), population.to_counts() if summarize else None))
+            else:
+                connection.send({name: population.living(name) for name in Population.COLUMN_DTYPES})
+        except Exception as e:
+            connection.send(e)
+    connection.close()
+
+
+class ShardedSimulator(Simulator):
+    """
+    Agent-based Simulator splitting the population across worker processes. Each shard owns a contiguous ID
+    range of the population and runs aging, drinking and death updates on it; these draws are keyed by
+    (seed, year, ID), so they do not depend on which shard holds an individual. Births and immigrants depend
+    on the global population size, so the coordinator draws them every year and hands each shard a contiguous
+    ID range of the entrants. Shards send back their count tensors, which the coordinator sums into the summary
+    row and the results cube. The output is identical to the unsharded run with the same seed.
+
+    The population is only gathered from the shards when it is read (checkpoints, snapshots and the final
+    population), ordered by ID like the unsharded store.
+    """
+
+    def __init__(self, lookup_tables, initial_population, output_file_name=None, num_shards=None, **kwargs):
+        """
+        Initialize the ShardedSimulator.
+
+        :param lookup_tables: Dictionary containing lookup tables for simulation.
+        :param initial_population: Initial population, as a Population store or a DataFrame.
+        :param output_file_name: Name of the output CSV file. Defaults to ExperimentConfig.CSV_OUTPUT_FILE.
+        :param num_shards: Number of shards (worker processes). Defaults to ExperimentConfig.POPULATION_SHARDS.
+        :param kwargs: Other arguments of Simulator.
+        :raises ValueError: If the engine is not the agent-based engine or the number of shards is not positive.
+        """
+        self._shards = []
+        self._stale = False
+        super().__init__(lookup_tables, initial_population, output_file_name, **kwargs)
+        if self.engine != "agent":
+            logger.error(f"Sharded simulation needs the agent engine, not {self.engine}.")
+            raise ValueError(f"Sharded simulation needs the agent engine, not {self.engine}.")
+        self.num_shards = int(num_shards if num_shards else ExperimentConfig.POPULATION_SHARDS)
+        if self.num_shards < 1:
+            logger.error(f"Number of shards must be positive, got {self.num_shards}.")
+            raise ValueError(f"Number of shards must be positive, got {self.num_shards}.")
+        self.population_size = None
+        self.year_counts = None
+
+    @property
+    def population(self):
+        """
+        Population store, gathered from the shards if they simulated years since it was last read.
+        """
+        if self._stale:
+            self._population = self._gather()
+            self._stale = False
+        return self._population
+
+    @population.setter
+    def population(self, population):
+        self._population = population
+        self._stale = False
+
+    def simulate(self, end_year=None):
+        """
+        Start the shards, simulate as Simulator.simulate does and stop the shards.
+
+        :param end_year: Last year to simulate. Defaults to ExperimentConfig.END_YEAR.
+        :return: See Simulator.simulate.
+        """
+        self._start_shards()
+        try:
+            return super().simulate(end_year)
+        finally:
+            self._stop_shards()
+
+    def _start_shards(self):
+        """
+        Split the population into contiguous ID ranges and start one worker process per shard.
+        """
+        population = self.population
+        ids = population.living(InitializationConstants.ID_KEY)
+        order = np.argsort(ids, kind="stable")
+        self.next_id = population.next_id
+        self.population_size = len(population)
+        self.year_counts = population.to_counts()
+        config = ReplicateRunner.worker_config()
+        logger.info(f"Starting {self.num_shards} population shards.")
+        for slots in np.array_split(order, self.num_shards):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            columns = {name: population.living(name)[slots] for name in Population.COLUMN_DTYPES}
+            process = multiprocessing.Process(target=_run_shard, daemon=True,
+                                              args=(child_connection, config, self.lookup_tables, columns, self.next_id))
+            process.start()
+            child_connection.close()
+            self._shards.append((process, parent_connection))
+
+    def _stop_shards(self):
+        """
+        Stop the worker processes, gathering the population first so it remains readable.
+        """
+        if not self._shards:
+            return
+        try:
+            if self._stale:
+                self._population = self._gather()
+                self._stale = False
+        finally:
+            for process, connection in self._shards:
+                try:
+                    connection.send(("stop",))
+                except (BrokenPipeError, OSError):
+                    pass
+                connection.close()
+                process.join()
+            self._shards = []
+
+    def _receive(self, connection):
+        """
+        Receive the result of a shard command.
+
+        :raises RuntimeError: If the command failed in the shard.
+        """
+        result = connection.recv()
+        if isinstance(result, Exception):
+            logger.error(f"Population shard failed: {result}")
+            raise RuntimeError(f"Population shard failed: {result}") from result
+        return result
+
+    def _gather(self):
+        """
+        Gather the living population of every shard into one store ordered by ID.
+
+        :return: Population instance.
+        """
+        for _, connection in self._shards:
+            connection.send(("population",))
+        shard_columns = [self._receive(connection) for _, connection in self._shards]
+        columns = {name: np.concatenate([columns[name] for columns in shard_columns]) for name in Population.COLUMN_DTYPES}
+        order = np.argsort(columns[InitializationConstants.ID_KEY], kind="stable")
+        return Population({name: column[order] for name, column in columns.items()}, next_id=self.next_id)
+
+    @staticmethod
+    def _split_columns(columns, num_shards):
+        """
+        Split a block of entrants into num_shards contiguous blocks.
+        """
+        block_size = len(columns[InitializationConstants.ID_KEY])
+        return [{name: columns[name][slots] for name in Population.COLUMN_DTYPES}
+                for slots in np.array_split(np.arange(block_size), num_shards)]
+
+    def _simulate_single_year(self, year):
+        """
+        Draw the year's births and immigrants from the global population size, let every shard simulate the
+        year with its share of them and reduce the shards' count tensors.
+
+        :param year: The year to simulate.
+        """
+        # Aging does not change the population size, so births are drawn from the size at the end of last year
+        year_simulator = SingleYearSimulator(self.lookup_tables, None, year)
+        births = year_simulator._create_birth_updater().generate_birth_columns(
+            population_size=self.population_size, year=year, next_id=self.next_id)
+        self._advance_next_id(births)
+        immigrants = year_simulator._create_immigration_updater().generate_immigration_columns(
+            population_size=self.population_size + len(births[InitializationConstants.ID_KEY]), year=year,
+            next_id=self.next_id)
+        self._advance_next_id(immigrants)
+
+        summarize = ExperimentConfig.START_YEAR_OUTPUT <= year <= ExperimentConfig.END_YEAR_OUTPUT
+        for (_, connection), shard_births, shard_immigrants in zip(
+                self._shards, self._split_columns(births, self.num_shards), self._split_columns(immigrants, self.num_shards)):
+            connection.send(("year", year, shard_births, shard_immigrants, summarize))
+        results = [self._receive(connection) for _, connection in self._shards]
+        self._stale = True
+        self.population_size = sum(size for size, _ in results)
+        self.year_counts = sum(counts for _, counts in results) if summarize else None
+
+    def _advance_next_id(self, columns):
+        """
+        Move the ID counter past a block of entrants, as Population.append does.
+        """
+        ids = columns[InitializationConstants.ID_KEY]
+        if len(ids):
+            self.next_id = max(self.next_id, int(np.max(ids)) + 1)
+
+    def _population_counts(self):
+        """
+        Count tensor of the last simulated year, reduced from the shards.
+        """
+        return self.year_counts
@@ -1,59 +1,163 @@
 import os
-import csv
+import numpy as np
+import pandas as pd
 from src.simulation.single_year_simulator import SingleYearSimulator
+from src.simulation.cohort_simulator import CohortSimulator
+from src.simulation.results_cube import ResultsCube
+from src.simulation.checkpoint import SimulationCheckpoint
+from src.simulation.result_sinks import CSVResultSink, ParquetResultSink, MemoryResultSink
 from src.config.simulation_config import ExperimentConfig, ExperimentValid
+from src.common.constants import PopulationCodes
+from src.common.population import Population
 from src.common.logger import logger
 
 
 class Simulator:
-    def __init__(self, lookup_tables, initial_population, output_file_name=None):
+    ENGINES = {"agent": SingleYearSimulator, "cohort": CohortSimulator}
+
+    def __init__(self, lookup_tables, initial_population, output_file_name=None, engine=None, cube_output_file_name=None,
+                 output_dir=None, result_sink=None, checkpoint_years=None, resume_from=None):
         """
         Initialize the Simulator class.
 
         :param lookup_tables: Dictionary containing lookup tables for simulation.
-        :param initial_population: Initial population DataFrame.
+        :param initial_population: Initial population, as a Population store or a DataFrame. The cohort engine
+                                   also accepts a count tensor of shape PopulationCodes.COUNT_TENSOR_SHAPE.
+                                   Ignored (and may be None) when resuming from a checkpoint. It is not modified by
+                                   the run.
+        :param output_file_name: Name of the output CSV file. Defaults to ExperimentConfig.CSV_OUTPUT_FILE.
+        :param engine: "agent" or "cohort". Defaults to ExperimentConfig.SIMULATION_ENGINE.
+        :param cube_output_file_name: Name of the NPZ file receiving the full count cube of every output year.
+                                      Defaults to ExperimentConfig.CUBE_OUTPUT_FILE; no cube is saved when unset.
+        :param output_dir: Directory of the output files. Defaults to ExperimentConfig.OUTPUT_DIR.
+        :param result_sink: ResultSink receiving the yearly summary rows. Defaults to the sink selected by
+                            ExperimentConfig.RESULT_SINK.
+        :param checkpoint_years: Years at the end of which a SimulationCheckpoint is saved in the output directory.
+                                 Defaults to ExperimentConfig.CHECKPOINT_YEARS.
+        :param resume_from: Path of a checkpoint, or an in-memory SimulationCheckpoint (see snapshot), to continue
+                            from. The run restarts after the checkpointed year and the summary rows written before
+                            it are replayed into the result sink.
+        :raises ValueError: If the engine is unknown, the initial population does not fit the engine, or the
+                            checkpoint was written with another engine, seed or lookup tables.
         """
         self.lookup_tables = lookup_tables
+        if isinstance(resume_from, SimulationCheckpoint):
+            self.checkpoint = resume_from
+        else:
+            self.checkpoint = SimulationCheckpoint.load(resume_from) if resume_from else None
+        self.engine = engine if engine else (self.checkpoint.engine if self.checkpoint else ExperimentConfig.SIMULATION_ENGINE)
+        if self.engine not in self.ENGINES:
+            logger.error(f"Unknown simulation engine: {self.engine}")
+            raise ValueError(f"Unknown simulation engine: {self.engine}")
+
+        if self.checkpoint is not None:
+            self.checkpoint.validate(lookup_tables, self.engine, ExperimentConfig.seed)
+            # Runs resumed from the same in-memory checkpoint share its population copy-on-write
+            initial_population = (self.checkpoint.population.fork() if isinstance(self.checkpoint.population, Population)
+                                  else self.checkpoint.population.copy())
+        elif isinstance(initial_population, (Population, np.ndarray)):
+            # The run modifies its population in place, so it works on a copy-on-write fork (or a copy of the
+            # count tensor) and the caller can reuse its initial population
+            initial_population = (initial_population.fork() if isinstance(initial_population, Population)
+                                  else initial_population.copy())
+        if isinstance(initial_population, pd.DataFrame):
+            initial_population = Population.from_dataframe(initial_population)
+        if self.engine == "cohort" and isinstance(initial_population, Population):
+            initial_population = initial_population.to_counts()
+        if self.engine == "agent" and not isinstance(initial_population, Population):
+            logger.error("The agent engine needs a Population store or a DataFrame as initial population.")
+            raise ValueError("The agent engine needs a Population store or a DataFrame as initial population.")
         self.population = initial_population
         self.output_file_name = output_file_name if output_file_name else ExperimentConfig.CSV_OUTPUT_FILE
-
-    def simulate(self):
+        self.cube_output_file_name = cube_output_file_name if cube_output_file_name else ExperimentConfig.CUBE_OUTPUT_FILE
+        self.results_cube = ResultsCube() if self.cube_output_file_name else None
+        if self.results_cube is not None and self.checkpoint is not None and self.checkpoint.cube is not None:
+            self.results_cube = ResultsCube(self.checkpoint.cube.years, self.checkpoint.cube.counts)
+        self.summary_rows = []
+        self.last_year = None
+        self.checkpoint_years = set(checkpoint_years if checkpoint_years is not None else ExperimentConfig.CHECKPOINT_YEARS)
+        self.output_dir = output_dir if output_dir else ExperimentConfig.OUTPUT_DIR
+        self.result_sink = result_sink if result_sink is not None else self._create_result_sink()
+
+    def simulate(self, end_year=None):
         """
         Simulates the progression of a population over multiple years, summarizing 
-        demographic and behavioral statistics for each year and saving the results 
-        to a CSV file.
+        demographic and behavioral statistics for each year and writing the results 
+        to the result sink.
+
+        :param end_year: Last year to simulate. Defaults to ExperimentConfig.END_YEAR.
 
         Returns:
-            pandas.DataFrame: The final state of the population after the simulation.
+            pandas.DataFrame: The yearly summary rows when the result sink keeps them in memory; otherwise the
+            final state of the population after the simulation, or the final count tensor for the cohort engine.
         """
         logger.info("Starting simulation process.")
-        output_file = self._initialize_output_file()
-
-        # Simulate for the initial year
-        self._summarize_and_save_results(ExperimentConfig.INITIAL_YEAR, output_file)
-
-        # Simulate for subsequent years
-        for year in range(ExperimentConfig.INITIAL_YEAR + 1, ExperimentConfig.END_YEAR + 1):
-            logger.info(f"Starting simulation for year: {year}")
-            self._simulate_single_year(year)
-            if ExperimentConfig.START_YEAR_OUTPUT <= year <= ExperimentConfig.END_YEAR_OUTPUT:
-                self._summarize_and_save_results(year, output_file)
-            logger.info(f"Completed simulation for year: {year}")
+        self.result_sink.open(self._get_output_columns())
+
+        try:
+            if self.checkpoint is None:
+                # Simulate for the initial year
+                self._summarize_and_save_results(ExperimentConfig.INITIAL_YEAR)
+                self.last_year = ExperimentConfig.INITIAL_YEAR
+                self._save_checkpoint_if_needed(ExperimentConfig.INITIAL_YEAR)
+                first_year = ExperimentConfig.INITIAL_YEAR + 1
+            else:
+                logger.info(f"Resuming simulation after year: {self.checkpoint.year}")
+                for summary_row in self.checkpoint.summary_rows:
+                    self.summary_rows.append(summary_row)
+                    self.result_sink.write_row(summary_row)
+                self.last_year = self.checkpoint.year
+                first_year = self.checkpoint.year + 1
+
+            # Simulate for subsequent years
+            for year in range(first_year, (end_year if end_year else ExperimentConfig.END_YEAR) + 1):
+                logger.info(f"Starting simulation for year: {year}")
+                self._simulate_single_year(year)
+                if ExperimentConfig.START_YEAR_OUTPUT <= year <= ExperimentConfig.END_YEAR_OUTPUT:
+                    self._summarize_and_save_results(year)
+                self.last_year = year
+                self._save_checkpoint_if_needed(year)
+                logger.info(f"Completed simulation for year: {year}")
+        finally:
+            self.result_sink.close()
+
+        if self.results_cube is not None and self.cube_output_file_name:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.results_cube.save(os.path.join(self.output_dir, self.cube_output_file_name))
 
         logger.info("Simulation process completed.")
-        return self.population
+        results = self.result_sink.result()
+        if results is not None:
+            return results
+        if self.engine != "agent":
+            return self.population
+        self.population.compact()
+        return self.population.to_dataframe()
+
+    def _create_result_sink(self):
+        """
+        Create the result sink selected by ExperimentConfig.RESULT_SINK in the output directory.
 
-    def _initialize_output_file(self):
+        :return: ResultSink instance.
+        :raises ValueError: If the configured sink is unknown.
         """
-        Initialize the output CSV file and write the header row.
+        sink_type = ExperimentConfig.RESULT_SINK
+        if sink_type == "csv":
+            return CSVResultSink(os.path.join(self.output_dir, self.output_file_name))
+        if sink_type == "parquet":
+            return ParquetResultSink(os.path.join(self.output_dir, os.path.splitext(self.output_file_name)[0] + ".parquet"))
+        if sink_type == "memory":
+            return MemoryResultSink()
+        logger.error(f"Unknown result sink: {sink_type}")
+        raise ValueError(f"Unknown result sink: {sink_type}")
+
+    def _get_output_columns(self):
+        """
+        Column names of the yearly summary rows.
 
         Returns:
-            str: Path to the output file.
+            list: The header row.
         """
-        output_dir = "test/data/out_data"
-        os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(output_dir, self.output_file_name)
-
         # Define column names
         columns_name_row = [
             "Year", "Total Population", "Child Count", "Adult Count", "Male Proportion",
@@ -107,67 +211,98 @@ class Simulator:
             f"{race} Very High Proportion"
             ]
     """
-        # Write the header row
-        with open(output_file, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(columns_name_row)
-
-        return output_file
+        return columns_name_row
 
 
     def _simulate_single_year(self, year):
         """
-        Simulate a single year using the SingleYearSimulator.
+        Simulate a single year using the SingleYearSimulator of the selected engine.
 
         :param year: The year to simulate.
         """
-        single_year_simulator = SingleYearSimulator(self.lookup_tables, self.population, year)
+        single_year_simulator = self.ENGINES[self.engine](self.lookup_tables, self.population, year)
         single_year_simulator.simulate_single_year()
         self.population = single_year_simulator.population
 
-    def _summarize_and_save_results(self, year, output_file):
+    def _summarize_and_save_results(self, year):
         """
-        Summarize the population statistics for a given year and save the results to the CSV file.
+        Summarize the population statistics for a given year and write the results to the result sink.
 
         :param year: The year to summarize.
-        :param output_file: Path to the output CSV file.
         """
-        summary_row = self._summarize_population(year)
+        # One bincount pass per year (agent engine) feeds both the CSV row and the results cube
+        counts = self._population_counts()
+        summary_row = self._summarize_counts(year, counts)
+        if self.results_cube is not None:
+            self.results_cube.append(year, counts)
         self._validate_population(year, summary_row)
-        self._append_to_csv(output_file, summary_row)
+        self.summary_rows.append(summary_row)
+        self.result_sink.write_row(summary_row)
+
+    def _population_counts(self):
+        """
+        :return: Count tensor of the current population, of shape PopulationCodes.COUNT_TENSOR_SHAPE.
+        """
+        return self.population if self.engine == "cohort" else self.population.to_counts()
+
+    def _save_checkpoint_if_needed(self, year):
+        """
+        Save a SimulationCheckpoint of the end of the year in the output directory if the year is a
+        checkpoint year.
 
-    def _summarize_population(self, year):
+        :param year: The year that was just simulated.
         """
-        Summarize population statistics for a given year.
+        if year not in self.checkpoint_years:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.snapshot().save(os.path.join(self.output_dir, ExperimentConfig.CHECKPOINT_FILE_NAME.format(year=year)))
+
+    def snapshot(self, fingerprint_lookup_tables=True):
+        """
+        In-memory SimulationCheckpoint of the end of the last simulated year. The population is forked
+        copy-on-write, so taking a snapshot costs no copy and later years do not modify it.
+
+        :param fingerprint_lookup_tables: Whether to record the fingerprint of the lookup tables. Without it the
+                                          snapshot can be resumed with other lookup tables, e.g. by scenario branches.
+        :return: SimulationCheckpoint instance.
+        """
+        population = self.population.fork() if isinstance(self.population, Population) else self.population.copy()
+        cube = ResultsCube(self.results_cube.years, self.results_cube.counts) if self.results_cube is not None else None
+        lookup_fingerprint = (SimulationCheckpoint.lookup_fingerprint_until(self.lookup_tables, self.last_year)
+                              if fingerprint_lookup_tables else None)
+        return SimulationCheckpoint(self.last_year, self.engine, population, ExperimentConfig.seed, lookup_fingerprint,
+                                    self.summary_rows, cube)
+
+    @classmethod
+    def _summarize_counts(cls, year, counts):
+        """
+        Summarize population statistics for a given year from a count tensor.
 
         :param year: The year to summarize.
+        :param counts: Count tensor of shape PopulationCodes.COUNT_TENSOR_SHAPE.
         :return: List containing the summary row.
         """
-        total_population = len(self.population)
-        child_count = len(self.population[self.population["Age"] < 18])
+        total_population = int(counts.sum())
+        child_count = int(counts[:18].sum())
         adult_count = total_population - child_count
-        male_count = len(self.population[self.population["Composite"].str.startswith("Male")])
+        male_count = int(counts[:, PopulationCodes.SEXES.index("Male")].sum())
         male_proportion = male_count / total_population if total_population > 0 else 0
-        immigration_count = len(self.population[self.population["Immigration"]])
+        immigration_count = int(counts[..., 1].sum())
         immigration_proportion = immigration_count / total_population if total_population > 0 else 0
 
         # Count races
-        race_counts = self.population["Composite"].str.split("_").str[1].value_counts()
-        race_count_white = race_counts.get("White", 0)
-        race_count_black = race_counts.get("Black", 0)
-        race_count_hispanic = race_counts.get("Hispanic", 0)
-        race_count_other = race_counts.get("Other", 0)
+        race_counts = counts.sum(axis=(0, 1, 3, 4))
+        race_count_white, race_count_black, race_count_hispanic, race_count_other = (
+            int(race_counts[PopulationCodes.RACES.index(race)]) for race in ["White", "Black", "Hispanic", "Other"])
 
         # Count drinking stages
-        drinking_stage_counts = self.population[self.population["Age"] >= 18]["Drinking_Stage"].value_counts()
-        drinking_stage_abs = drinking_stage_counts.get("Abs", 0)
-        drinking_stage_low = drinking_stage_counts.get("Low", 0)
-        drinking_stage_med = drinking_stage_counts.get("Med", 0)
-        drinking_stage_high = drinking_stage_counts.get("High", 0)
-        drinking_stage_very_high = drinking_stage_counts.get("Very High", 0)
+        drinking_stage_counts = counts[18:].sum(axis=(0, 1, 2, 4))
+        drinking_stage_abs, drinking_stage_low, drinking_stage_med, drinking_stage_high, drinking_stage_very_high = (
+            int(drinking_stage_counts[PopulationCodes.DRINKING_STAGES.index(stage)])
+            for stage in ["Abs", "Low", "Med", "High", "Very High"])
 
         # Summarize drinking stages by sex and age group
-        drinking_stage_summary, drinking_stage_summary_by_age, drinking_stage_summary_by_sex, drinking_stage_summary_by_race = self._summarize_drinking_stages_by_group()
+        drinking_stage_summary, drinking_stage_summary_by_age, drinking_stage_summary_by_sex, drinking_stage_summary_by_race = cls._summarize_drinking_stages_by_group(counts)
 
         # Create the summary row
         row = [
@@ -179,7 +314,6 @@ class Simulator:
         ]
         
         for (sex, age_group), summary in drinking_stage_summary.items():
-            counts = summary["counts"]
             proportions = summary["proportions"]
             row.extend([
                 proportions["Abs"],
@@ -192,14 +326,14 @@ class Simulator:
         """
         # Add drinking stage counts and proportions for each sex and age group
         for (sex, age_group), summary in drinking_stage_summary.items():
-            counts = summary["counts"]
+            group_counts = summary["counts"]
             proportions = summary["proportions"]
             row.extend([
-                counts["Abs"], proportions["Abs"],
-                counts["Low"], proportions["Low"],
-                counts["Med"], proportions["Med"],
-                counts["High"], proportions["High"],
-                counts["Very High"], proportions["Very High"]
+                group_counts["Abs"], proportions["Abs"],
+                group_counts["Low"], proportions["Low"],
+                group_counts["Med"], proportions["Med"],
+                group_counts["High"], proportions["High"],
+                group_counts["Very High"], proportions["Very High"]
             ])
 
         # Add proportions for each age group
@@ -228,105 +362,65 @@ class Simulator:
         """
         return row
 
-    def _summarize_drinking_stages_by_group(self):
+    @staticmethod
+    def _summarize_drinking_stage_group(stage_counts):
+        """
+        Count and proportion of each drinking stage within a group of individuals.
+
+        :param stage_counts: Array with the number of individuals of the group in each drinking stage.
+        :return: Tuple of dictionaries (counts, proportions) keyed by drinking stage.
+        """
+        group_total = stage_counts.sum()
+        drinking_stage_counts = {stage: int(stage_counts[code]) for code, stage in enumerate(PopulationCodes.DRINKING_STAGES)}
+        drinking_stage_proportions = {stage: stage_counts[code] / group_total if group_total > 0 else 0
+                                      for code, stage in enumerate(PopulationCodes.DRINKING_STAGES)}
+        return drinking_stage_counts, drinking_stage_proportions
+
+    @classmethod
+    def _summarize_drinking_stages_by_group(cls, counts):
         """
-        Summarize drinking stage counts and proportions by sex and age group.
+        Summarize drinking stage counts and proportions by sex and age group, by age group, by sex and by race.
+        Every breakdown is a reduction of the count tensor, so enabling more of them does not rescan the population.
 
+        :param counts: Count tensor of shape PopulationCodes.COUNT_TENSOR_SHAPE.
         :return: Dictionary containing drinking stage summaries.
         """
-        age_groups = {"18-34": (18, 34), "35-54": (35, 54), "55+": (55, float('inf'))}
+        age_groups = {"18-34": (18, 34), "35-54": (35, 54), "55+": (55, PopulationCodes.MAX_AGE)}
         sex_categories = ["Male", "Female"]
         race_categories = ["White", "Black", "Hispanic", "Other"]
         drinking_stage_summary = {}
 
-        # Define all possible drinking stages
-        all_drinking_stages = ["Abs", "Low", "Med", "High", "Very High"]
+        # [age group, sex, race, drinking stage]
+        grouped_counts = np.stack([counts[age_min:age_max + 1].sum(axis=(0, 4)) for age_min, age_max in age_groups.values()])
+        age_group_index = {age_group: index for index, age_group in enumerate(age_groups)}
 
         for sex in sex_categories:
-            for age_group, (age_min, age_max) in age_groups.items():
-                group_population = self.population[
-                    (self.population["Composite"].str.startswith(sex)) &
-                    (self.population["Age"] >= age_min) &
-                    (self.population["Age"] <= age_max)
-                ]
-                group_total = len(group_population)
-
-                # Initialize counts and proportions with default values
-                drinking_stage_counts = {stage: 0 for stage in all_drinking_stages}
-                drinking_stage_proportions = {stage: 0 for stage in all_drinking_stages}
-
-                # Update counts and proportions based on actual data
-                actual_counts = group_population["Drinking_Stage"].value_counts().to_dict()
-                for stage, count in actual_counts.items():
-                    drinking_stage_counts[stage] = count
-                    drinking_stage_proportions[stage] = count / group_total if group_total > 0 else 0
-
+            for age_group in age_groups:
+                stage_counts = grouped_counts[age_group_index[age_group], PopulationCodes.SEXES.index(sex)].sum(axis=0)
+                counts_by_stage, proportions = cls._summarize_drinking_stage_group(stage_counts)
                 drinking_stage_summary[(sex, age_group)] = {
-                    "counts": drinking_stage_counts,
-                    "proportions": drinking_stage_proportions
+                    "counts": counts_by_stage,
+                    "proportions": proportions
                 }
-        
+
         # Summarize drinking stages by age group, sex, and race separately
         drinking_stage_summary_by_age = {}
         drinking_stage_summary_by_sex = {}
         drinking_stage_summary_by_race = {}
 
-        # Summarize by age group
-        for age_group, (age_min, age_max) in age_groups.items():
-            group_population = self.population[
-            (self.population["Age"] >= age_min) & (self.population["Age"] <= age_max)
-            ]
-            group_total = len(group_population)
-
-            drinking_stage_counts = {stage: 0 for stage in all_drinking_stages}
-            drinking_stage_proportions = {stage: 0 for stage in all_drinking_stages}
-
-            actual_counts = group_population["Drinking_Stage"].value_counts().to_dict()
-            for stage, count in actual_counts.items():
-                drinking_stage_counts[stage] = count
-                drinking_stage_proportions[stage] = count / group_total if group_total > 0 else 0
+        for age_group in age_groups:
+            _, proportions = cls._summarize_drinking_stage_group(grouped_counts[age_group_index[age_group]].sum(axis=(0, 1)))
+            drinking_stage_summary_by_age[age_group] = {"proportions": proportions}
 
-            drinking_stage_summary_by_age[age_group] = {
-            "proportions": drinking_stage_proportions
-            }
-
-        # Summarize by sex
         for sex in sex_categories:
-            group_population = self.population[
-            self.population["Composite"].str.startswith(sex)
-            ]
-            group_total = len(group_population)
+            _, proportions = cls._summarize_drinking_stage_group(
+                counts[:, PopulationCodes.SEXES.index(sex)].sum(axis=(0, 1, 3)))
+            drinking_stage_summary_by_sex[sex] = {"proportions": proportions}
 
-            drinking_stage_counts = {stage: 0 for stage in all_drinking_stages}
-            drinking_stage_proportions = {stage: 0 for stage in all_drinking_stages}
-
-            actual_counts = group_population["Drinking_Stage"].value_counts().to_dict()
-            for stage, count in actual_counts.items():
-                drinking_stage_counts[stage] = count
-                drinking_stage_proportions[stage] = count / group_total if group_total > 0 else 0
-
-            drinking_stage_summary_by_sex[sex] = {
-            "proportions": drinking_stage_proportions
-            }
-
-        # Summarize by race
         for race in race_categories:
-            group_population = self.population[
-            self.population["Composite"].str.contains(f"_{race}")
-            ]
-            group_total = len(group_population)
-
-            drinking_stage_counts = {stage: 0 for stage in all_drinking_stages}
-            drinking_stage_proportions = {stage: 0 for stage in all_drinking_stages}
-
-            actual_counts = group_population["Drinking_Stage"].value_counts().to_dict()
-            for stage, count in actual_counts.items():
-                drinking_stage_counts[stage] = count
-                drinking_stage_proportions[stage] = count / group_total if group_total > 0 else 0
-
-            drinking_stage_summary_by_race[race] = {
-            "proportions": drinking_stage_proportions
-            }
+            _, proportions = cls._summarize_drinking_stage_group(
+                counts[:, :, PopulationCodes.RACES.index(race)].sum(axis=(0, 1, 3)))
+            drinking_stage_summary_by_race[race] = {"proportions": proportions}
 
         return drinking_stage_summary, drinking_stage_summary_by_age, drinking_stage_summary_by_sex, drinking_stage_summary_by_race
 
@@ -345,14 +439,3 @@ class Simulator:
                 f"YEAR {year} SUMMARY: SIMULATED TOTAL POPULATION: {simulated_population}, "
                 f"VALIDATED POPULATION: {validated_population}, \033[91mVALIDATION STATUS: {validation_status}\033[0m"
             )
-
-    def _append_to_csv(self, output_file, row):
-        """
-        Append a row to the output CSV file.
-
-        :param output_file: Path to the output CSV file.
-        :param row: The row to append.
-        """
-        with open(output_file, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(row)
@@ -5,6 +5,8 @@ from src.simulation.updaters.death_updater import DeathUpdater
 from src.simulation.updaters.immigration_updater import ImmigrationUpdater
 from src.simulation.updaters.drinking_status_updater import DrinkingStatusUpdater
 from src.common.logger import logger
+from src.common.constants import InitializationConstants, PopulationCodes
+import numpy as np
 import pandas as pd
 
 
@@ -19,16 +21,19 @@ class SingleYearSimulator:
         self.population = population
         self.year = year
 
-    def update_births(self):
+    def population_count(self):
         """
-        Update the population with new births for the current year.
-        This method retrieves birth rate, male ratio, and race lookup tables for the specified year
-        and uses them to generate new births. The new births are then added to the existing population.
+        Number of living individuals in the population.
+        """
+        return len(self.population)
+
+    def _create_birth_updater(self):
+        """
+        Create the BirthUpdater of the current year from the birth rate, male ratio and race lookup tables.
+
         :raises RuntimeError: If any of the required lookup tables for the current year are not found.
-        :raises ValueError: If an error occurs while generating or updating births.
-        :return: None
+        :return: BirthUpdater instance.
         """
-        
         birth_rate_lookup = self.lookup_tables["birth_rate_table"].get(self.year, None)
         if birth_rate_lookup is None:
             raise RuntimeError(f"Birth rate lookup for year {self.year} not found.")
@@ -41,24 +46,50 @@ class SingleYearSimulator:
         if race_lookup is None:
             raise RuntimeError(f"Race lookup for year {self.year} not found.")
 
-        birth_updater = BirthUpdater(
+        return BirthUpdater(
             birth_rate_lookup=birth_rate_lookup,
             male_ratio_lookup=male_ratio_lookup,
             race_lookup=race_lookup
         )
 
+    def update_births(self):
+        """
+        Update the population with new births for the current year.
+        This method retrieves birth rate, male ratio, and race lookup tables for the specified year
+        and uses them to generate new births. The new births are appended to the tail of the population store.
+        :raises RuntimeError: If any of the required lookup tables for the current year are not found.
+        :raises ValueError: If an error occurs while generating or updating births.
+        :return: None
+        """
+        birth_updater = self._create_birth_updater()
+
         try:
-            new_births = birth_updater.generate_new_births(
-                population=self.population,
-                year=self.year
+            new_births = birth_updater.generate_birth_columns(
+                population_size=len(self.population),
+                year=self.year,
+                next_id=self.population.next_id
             )
 
-            self.population = pd.concat([self.population, new_births], ignore_index=True)
+            self.population.append(new_births)
 
         except RuntimeError as e:
             logger.error(f"Failed to update births: {e}")
             raise ValueError("An error occurred while updating births") from e
 
+    def _create_immigration_updater(self):
+        """
+        Create the ImmigrationUpdater of the current year from the immigration lookup tables.
+
+        :return: ImmigrationUpdater instance.
+        """
+        return ImmigrationUpdater(
+            immigration_rate_lookup=self.lookup_tables["immigration_rate_lookup"].get(self.year, None),
+            age_lookup=self.lookup_tables["immigration_age_lookup"].get(self.year, None),
+            sex_lookup=self.lookup_tables["immigration_sex_lookup"].get(self.year, None),
+            race_lookup=self.lookup_tables["immigration_race_lookup"].get(self.year, None),
+            drinking_distribution_df=self.lookup_tables["initial_pop_drinking_status_lookup"]
+        )
+
     def update_immigration(self):
         """
         Update the population with new immigrants for the current year.
@@ -71,48 +102,77 @@ class SingleYearSimulator:
         """
 
         try:
-            immigration_updater = ImmigrationUpdater(
-                immigration_rate_lookup=self.lookup_tables["immigration_rate_lookup"].get(self.year, None),
-                age_lookup=self.lookup_tables["immigration_age_lookup"].get(self.year, None),
-                sex_lookup=self.lookup_tables["immigration_sex_lookup"].get(self.year, None),
-                race_lookup=self.lookup_tables["immigration_race_lookup"].get(self.year, None),
-                drinking_distribution_df=self.lookup_tables["initial_pop_drinking_status_lookup"]
-
-            )
+            immigration_updater = self._create_immigration_updater()
                     
-            new_immigrants = immigration_updater.generate_immigration_population(
-                population=self.population,
-                year=self.year
+            new_immigrants = immigration_updater.generate_immigration_columns(
+                population_size=len(self.population),
+                year=self.year,
+                next_id=self.population.next_id
             )
 
-            self.population = pd.concat([self.population, new_immigrants], ignore_index=True)
+            self.population.append(new_immigrants)
 
         except RuntimeError as e:
             logger.error(f"Failed to update immigration: {e}")
             raise ValueError("An error occurred while updating immigration") from e
 
+    def _get_death_rates(self):
+        """
+        Fetch the current year's slice of the dense death rate array.
+
+        :raises ValueError: If the death lookup table for the current year is not found.
+        :return: Death rates of the year indexed by [composite code, age].
+        """
+        death_rate_array = self.lookup_tables["death_rate_array"]
+        year_index = self.year - death_rate_array["first_year"]
+        if not (0 <= year_index < len(death_rate_array["rates"])) or np.isnan(death_rate_array["rates"][year_index]).all():
+            logger.error(f"Death lookup table for year {self.year} not found.")
+            raise ValueError(f"Death lookup table for year {self.year} not found.")
+        return death_rate_array["rates"][year_index]
+
     def update_deaths(self):
 
         """
         Update the population by removing individuals who have died for the current year.
-        This method retrieves the death lookup table for the specified year and uses it to update
-        the population by marking individuals as not alive based on the death data. Individuals
-        who are no longer alive are then removed from the population.
+        This method retrieves the year's death rates from the dense death rate array and uses them to update
+        the population; individuals who do not survive are removed from the population store.
         :raises ValueError: If the death lookup table for the current year is not found.
         :return: None
         """
-        # Create an instance of DeathUpdater and update deaths
-        death_lookup_table = self.lookup_tables["death_lookup_table"]
-        death_lookup_table_year = death_lookup_table[death_lookup_table["Year"] == self.year]
-        if death_lookup_table_year.empty:
-            logger.error(f"Death lookup table for year {self.year} not found.")
-            raise ValueError(f"Death lookup table for year {self.year} not found.")
-
-        death_updater = DeathUpdater(self.population, death_lookup_table_year)
+        death_updater = DeathUpdater(self.population, self._get_death_rates(), self.year)
         self.population = death_updater.update_deaths()
 
-        # Remove people who are not alive
-        self.population = self.population[self.population["Alive"]]
+    def _get_drinking_year_group(self):
+        """
+        Determine the drinking transition period ("0-3", "3-8" or "8+") of the current year from the
+        number of years since the initial year.
+
+        :raises ValueError: If the current year is less than the initial year.
+        :return: The drinking year group.
+        """
+        drinking_year = self.year - self.initial_year
+
+        if drinking_year < 0:
+            raise ValueError("Year cannot be less than the initial year.")
+        
+        # Create drinking_year_group based on drinking_year
+        if drinking_year <= 3:
+            return "0-3"
+        elif 3 < drinking_year <= 8:
+            return "3-8"
+        return "8+"
+
+    def _get_drinking_transition_tensor(self):
+        """
+        Retrieve the compiled drinking transition tensor.
+
+        :raises RuntimeError: If the drinking transition tensor is not found.
+        :return: The tensor returned by DrinkingStatusLookupGenerator.compile_lookup.
+        """
+        drinking_transition_tensor = self.lookup_tables.get("drinking_transition_tensor", None)
+        if drinking_transition_tensor is None:
+            raise RuntimeError(f"Drinking status lookup for year {self.year} not found.")
+        return drinking_transition_tensor
 
     def update_drinking_status(self):
 
@@ -128,40 +188,23 @@ class SingleYearSimulator:
         :return: None
         """
 
-        # Update drinking status based on year
-        drinking_year = self.year - self.initial_year
-
-        if drinking_year < 0:
-            raise ValueError("Year cannot be less than the initial year.")
-        
-        # Create drinking_year_group based on drinking_year
-        if drinking_year <= 3:
-            drinking_year_group = "0-3"
-        elif 3 < drinking_year <= 8:
-            drinking_year_group = "3-8"
-        else:
-            drinking_year_group = "8+"
-
-        # retrieve the drinking status lookup table for the current year
-        drinking_status_lookup_df = self.lookup_tables.get(drinking_year_group, None)
-        if drinking_status_lookup_df is None:
-            raise RuntimeError(f"Drinking status lookup for year {self.year} not found.")
+        drinking_year_group = self._get_drinking_year_group()
+        drinking_transition_tensor = self._get_drinking_transition_tensor()
         
-        drinking_status_updater = DrinkingStatusUpdater(self.population, drinking_status_lookup_df)
+        drinking_status_updater = DrinkingStatusUpdater(self.population, drinking_transition_tensor, drinking_year_group, self.year)
         self.population = drinking_status_updater.update_drinking_status()
 
     def update_age_population(self):
 
         """
         Increment the age of individuals in the population and cap the maximum age at 100.
-        This method updates the "Age" column of the population DataFrame by incrementing 
+        This method updates the age column of the population store in place by incrementing 
         each individual's age by 1. If an individual's age exceeds 100 after the increment, 
         it is capped at 100 to ensure no age exceeds this limit.
         """
         
-        self.population["Age"] += 1
-
-        self.population.loc[self.population["Age"] > 100, "Age"] = 100
+        age = self.population.writable(InitializationConstants.AGE_KEY)
+        np.minimum(age + 1, PopulationCodes.MAX_AGE, out=age)
 
     def simulate_single_year(self):
         """
@@ -176,7 +219,7 @@ class SingleYearSimulator:
         taken to simulate the year. It also logs the updated population count at the end of the simulation.
         Attributes:
             self.year (int): The current year being simulated.
-            self.population (list): The population data being updated.
+            self.population: The population being updated (Population store, or count tensor for the cohort engine).
             logger (Logger): Logger instance for recording simulation progress and timing.
         """
 
@@ -222,5 +265,5 @@ class SingleYearSimulator:
         elapsed_time = (end_time - start_time).total_seconds()
 
         # Output the updated population count and elapsed time
-        logger.info(f"Year {self.year}: Population count = {len(self.population)}")
+        logger.info(f"Year {self.year}: Population count = {self.population_count()}")
         logger.info(f"Year {self.year}: Simulation completed in {elapsed_time:.2f} seconds")
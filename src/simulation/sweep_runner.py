@@ -0,0 +1,231 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from src.initialization.lookup_tables_generator import LookupTablesGenerator
+from src.initialization.initial_population_generator import PopulationInitializer
+from src.simulation.simulator import Simulator
+from src.config.simulation_config import ExperimentConfig
+from src.common.logger import logger
+
+
+def _initialize_sweep_worker(config):
+    """
+    Process pool initializer: apply the parent's configuration.
+    """
+    for name, value in config.items():
+        setattr(ExperimentConfig, name, value)
+
+
+def _sweep_worker_config():
+    """
+    Public ExperimentConfig attributes to apply in the workers, which may not inherit the parent's
+    modifications. Unlike replicates, scenarios keep CUBE_OUTPUT_FILE and CHECKPOINT_YEARS (see _run_scenario).
+    """
+    return {name: value for name, value in vars(ExperimentConfig).items() if not name.startswith("_")}
+
+
+def _override_config(config_overrides):
+    """
+    Apply configuration overrides to ExperimentConfig.
+
+    :param config_overrides: Dictionary of ExperimentConfig attribute to value.
+    :return: Dictionary of the previous values, to restore with _override_config.
+    """
+    previous_config = {config_name: getattr(ExperimentConfig, config_name) for config_name in config_overrides}
+    for config_name, value in config_overrides.items():
+        setattr(ExperimentConfig, config_name, value)
+    return previous_config
+
+
+def _scenario_file_name(file_name, name):
+    """
+    :return: The file name with the scenario name appended to its stem, e.g. 'output_<name>.csv'.
+    """
+    stem, extension = os.path.splitext(file_name)
+    return f"{stem}_{name}{extension}"
+
+
+def _run_scenario(name, lookup_tables, config_overrides, output_file_name, output_dir):
+    """
+    Run one scenario in a worker process with its configuration overrides. Scenarios share the output
+    directory, so the cube (CUBE_OUTPUT_FILE) and the checkpoints (CHECKPOINT_FILE_NAME) of the scenario are
+    written under file names suffixed with its name.
+
+    :return: Tuple (name, summary DataFrame for the memory sink, otherwise the path of the output file).
+    """
+    # The worker runs other scenarios afterwards, so the overrides are undone at the end
+    previous_config = _override_config(config_overrides)
+    previous_config.setdefault("CHECKPOINT_FILE_NAME", ExperimentConfig.CHECKPOINT_FILE_NAME)
+    try:
+        ExperimentConfig.CHECKPOINT_FILE_NAME = _scenario_file_name(ExperimentConfig.CHECKPOINT_FILE_NAME, name)
+        cube_output_file_name = (_scenario_file_name(ExperimentConfig.CUBE_OUTPUT_FILE, name)
+                                 if ExperimentConfig.CUBE_OUTPUT_FILE else None)
+        population_initializer = PopulationInitializer(lookup_tables['initial_pop_age_lookup'],
+                                                       lookup_tables['initial_pop_sex_lookup'],
+                                                       lookup_tables['initial_pop_race_lookup'],
+                                                       lookup_tables['initial_pop_drinking_status_lookup'])
+        if ExperimentConfig.SIMULATION_ENGINE == "cohort":
+            initial_population = population_initializer.generate_initial_population_counts()
+        else:
+            initial_population = population_initializer.generate_initial_population_columns()
+        simulator = Simulator(lookup_tables, initial_population, output_file_name,
+                              cube_output_file_name=cube_output_file_name, output_dir=output_dir)
+        simulator.simulate()
+    finally:
+        _override_config(previous_config)
+    results = simulator.result_sink.result()
+    return name, results if results is not None else getattr(simulator.result_sink, "file_path", None)
+
+
+class SweepRunner:
+    """
+    Runs a sweep of scenarios described by a manifest over combinations of input sheets and configuration
+    overrides. Lookup tables are generated by one LookupTablesGenerator per distinct set of workbooks, which
+    only parses the sheets it has not seen yet, so a sweep over N transition sheets reads the shared sheets
+    once. Scenarios run concurrently in a process pool and write one output file per scenario, plus one cube
+    and one checkpoint per checkpoint year when CUBE_OUTPUT_FILE and CHECKPOINT_YEARS are set.
+
+    A manifest is a dictionary (or a JSON file, see load_manifest) with:
+
+    - "base": the sheet names of SimulationRunner.run_simulation, and optionally workbook names
+      (WORKBOOK_PARAMETERS) and ExperimentConfig overrides (e.g. "seed", "INITIAL_TOTAL_POPULATION");
+    - "grid": optional dictionary of parameter to list of values; every combination is a scenario;
+    - "scenarios": optional list of explicit scenarios, each a dictionary of overrides with an optional "name";
+    - "output_file_name": optional base output name, defaults to ExperimentConfig.CSV_OUTPUT_FILE. Each
+      scenario writes '<stem>_<scenario name><ext>'.
+    """
+
+    SHEET_PARAMETERS = [
+        "birth_rate_sheet", "birth_male_ratio_sheet", "birth_race_sheet_name", "death_sheet_name",
+        "death_rate_column_name", "immigration_age_sheet", "immigration_sex_sheet", "immigration_race_sheet",
+        "immigration_rate_sheet", "drinking_transition_sheet_name", "initial_population_age_sheet",
+        "initial_population_sex_sheet", "initial_population_race_sheet", "initial_population_drinking_sheet",
+    ]
+    WORKBOOK_PARAMETERS = ["excel_file_name", "excel_transition_file_name", "excel_initial_prevalence_file_name"]
+
+    def __init__(self, base_path, excel_file_name, excel_transition_file_name, excel_initial_prevalence_file_name,
+                 max_workers=None, output_dir=None):
+        """
+        Initialize the SweepRunner.
+
+        :param base_path: The directory path of the input workbooks.
+        :param excel_file_name: Default name of the main input workbook.
+        :param excel_transition_file_name: Default name of the drinking transition workbook.
+        :param excel_initial_prevalence_file_name: Default name of the initial drinking prevalence workbook.
+        :param max_workers: Number of worker processes. Defaults to ExperimentConfig.REPLICATE_WORKERS, or the
+                            number of CPUs when unset.
+        :param output_dir: Directory of the output files. Defaults to ExperimentConfig.OUTPUT_DIR.
+        """
+        self.base_path = base_path
+        self.default_workbooks = {
+            "excel_file_name": excel_file_name,
+            "excel_transition_file_name": excel_transition_file_name,
+            "excel_initial_prevalence_file_name": excel_initial_prevalence_file_name,
+        }
+        self.max_workers = max_workers if max_workers else (ExperimentConfig.REPLICATE_WORKERS or os.cpu_count() or 1)
+        self.output_dir = output_dir if output_dir else ExperimentConfig.OUTPUT_DIR
+        self._lookup_tables_generators = {}
+
+    @staticmethod
+    def load_manifest(file_path):
+        """
+        :param file_path: Path of a JSON manifest.
+        :return: The manifest dictionary.
+        """
+        with open(file_path) as file:
+            return json.load(file)
+
+    def expand(self, manifest):
+        """
+        Expand a manifest into its scenarios.
+
+        :param manifest: Manifest dictionary.
+        :return: List of dictionaries with 'name', 'sheets', 'workbooks' and 'config' entries.
+        :raises ValueError: If a parameter is unknown, a sheet is missing or two scenarios have the same name.
+        """
+        base = manifest.get("base", {})
+        grid = manifest.get("grid", {})
+        overrides = [dict(zip(grid, values)) for values in itertools.product(*grid.values())] if grid else []
+        overrides += [dict(scenario) for scenario in manifest.get("scenarios", [])]
+        if not overrides:
+            overrides = [{}]
+
+        scenarios = []
+        for override in overrides:
+            name = override.pop("name", None) or "_".join(str(value) for value in override.values()) or "base"
+            parameters = {**base, **override}
+            unknown = [key for key in parameters if key not in self.SHEET_PARAMETERS
+                       and key not in self.WORKBOOK_PARAMETERS and not hasattr(ExperimentConfig, key)]
+            if unknown:
+                logger.error(f"Unknown sweep parameters: {unknown}")
+                raise ValueError(f"Unknown sweep parameters: {unknown}")
+            missing = [key for key in self.SHEET_PARAMETERS if key not in parameters]
+            if missing:
+                logger.error(f"Scenario {name} is missing sheets: {missing}")
+                raise ValueError(f"Scenario {name} is missing sheets: {missing}")
+            scenarios.append({
+                "name": name,
+                "sheets": {key: parameters[key] for key in self.SHEET_PARAMETERS},
+                "workbooks": {key: parameters.get(key, default) for key, default in self.default_workbooks.items()},
+                "config": {key: value for key, value in parameters.items()
+                           if key not in self.SHEET_PARAMETERS and key not in self.WORKBOOK_PARAMETERS},
+            })
+
+        names = [scenario["name"] for scenario in scenarios]
+        if len(set(names)) != len(names):
+            logger.error(f"Sweep scenario names are not unique: {names}")
+            raise ValueError(f"Sweep scenario names are not unique: {names}")
+        return scenarios
+
+    def _create_lookup_tables(self, workbooks, sheets):
+        """
+        Lookup tables of a scenario, from the generator of its workbooks.
+        """
+        key = tuple(workbooks[name] for name in self.WORKBOOK_PARAMETERS)
+        if key not in self._lookup_tables_generators:
+            self._lookup_tables_generators[key] = LookupTablesGenerator(self.base_path, *key)
+        sheets = dict(sheets)
+        sheets["drinking_prevalence_sheet_name"] = sheets.pop("initial_population_drinking_sheet")
+        return self._lookup_tables_generators[key].create_lookup_tables(**sheets)
+
+    def _scenario_lookup_tables(self, scenario):
+        """
+        Lookup tables of a scenario, generated with its configuration overrides applied, since the generators
+        filter the tables to the simulated years (INITIAL_YEAR and END_YEAR).
+        """
+        previous_config = _override_config(scenario["config"])
+        try:
+            return self._create_lookup_tables(scenario["workbooks"], scenario["sheets"])
+        finally:
+            _override_config(previous_config)
+
+    def run(self, manifest):
+        """
+        Run every scenario of the manifest.
+
+        :param manifest: Manifest dictionary, or the path of a JSON manifest.
+        :return: Dictionary of scenario name to its summary DataFrame when ExperimentConfig.RESULT_SINK is
+                 "memory", otherwise to the path of its output file.
+        """
+        if isinstance(manifest, str):
+            manifest = self.load_manifest(manifest)
+        scenarios = self.expand(manifest)
+        output_file_name = manifest.get("output_file_name") or ExperimentConfig.CSV_OUTPUT_FILE
+        logger.info(f"Running a sweep of {len(scenarios)} scenarios with {self.max_workers} workers.")
+
+        results = {}
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(scenarios)), initializer=_initialize_sweep_worker,
+                                 initargs=(_sweep_worker_config(),)) as executor:
+            futures = []
+            for scenario in scenarios:
+                # Lookup tables are generated in the parent, which parses every distinct sheet only once
+                lookup_tables = self._scenario_lookup_tables(scenario)
+                futures.append(executor.submit(_run_scenario, scenario["name"], lookup_tables, scenario["config"],
+                                               _scenario_file_name(output_file_name, scenario["name"]), self.output_dir))
+            for future in futures:
+                name, result = future.result()
+                results[name] = result
+
+        logger.info(f"Completed the sweep of {len(scenarios)} scenarios.")
+        return results
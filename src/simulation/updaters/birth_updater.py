@@ -1,8 +1,9 @@
-from typing import List, Dict
-from src.common.constants import ProbabilityRatesColumnNames
+from typing import Dict
+from src.common.constants import ProbabilityRatesColumnNames, InitializationConstants, PopulationCodes, RandomStreams
 from src.config.simulation_config import ExperimentConfig
 from src.common.logger import logger
-import random
+from src.common.population import Population
+from src.common.common import Common_CounterRNG
 import numpy as np
 import pandas as pd
 
@@ -18,7 +19,6 @@ class BirthUpdater:
         self.male_ratio_lookup = male_ratio_lookup
         self.race_lookup = race_lookup
         self.seed = ExperimentConfig.seed
-        self.np_random_population = np.random.RandomState(self.seed)
         logger.info(f"Random seed set to {self.seed}")
 
         
@@ -27,124 +27,97 @@ class BirthUpdater:
         """
         Compute the number of new births for a given year based on the total population and birth rate.
 
-        :param total_population: The total population for the year.
+        :param population: The population for the year, or its size as an integer.
         :param year: The year for which to compute the number of new births.
         :return: The computed number of new births as an integer.
         :raises ValueError: If the birth rate for the given year is not found.
         """
         logger.info(f"Computing new births for year {year}")
 
-        new_births = max(0, int(round(len(population) * self.birth_rate_lookup)))
+        population_size = population if isinstance(population, (int, np.integer)) else len(population)
+        new_births = max(0, int(round(population_size * self.birth_rate_lookup)))
 
         logger.info(f"Computed {new_births} new births for year {year} with birth rate {self.birth_rate_lookup:.6f}")
         return new_births
 
-    def assign_genders(self, num_births: int, year: int) -> List[str]:
+    def birth_race_probabilities(self) -> np.ndarray:
         """
-        Assign genders to a specified number of births based on the male-to-female ratio for the given year.
+        Race distribution of the births of each sex, from the race proportions under 5 years.
 
-        :param num_births: The number of births to assign genders to.
-        :param year: The year for which to determine the male-to-female ratio.
-        :return: A list of genders ("Male" or "Female") for the births.
-        :raises ValueError: If the male ratio for the given year is not found.
+        :return: Float array of shape (len(SEXES), len(RACES)) whose rows sum to 1.
         """
-        logger.info(f"Assigning genders for {num_births} births in year {year}")
-
-        genders = self.np_random_population.choice(
-            [ProbabilityRatesColumnNames.MALE, ProbabilityRatesColumnNames.FEMALE],
-            size=num_births,
-            p=[self.male_ratio_lookup, 1 - self.male_ratio_lookup]
-        )
-
-        return genders.tolist()
-
-    def assign_races(self, population: List[Dict[str, str]], year: int, num_births: int) -> List[Dict[str, str]]:
+        race_proportions = np.array([[self.race_lookup[sex].get(race, 0) for race in PopulationCodes.RACES]
+                                     for sex in PopulationCodes.SEXES], dtype=np.float64)
+        return race_proportions / race_proportions.sum(axis=1, keepdims=True)
 
+    def generate_birth_counts(self, population_size: int, year: int) -> np.ndarray:
         """
-        Assign races to each new birth based on the year and gender, updating the population in place.
-
-        :param population: A list of dictionaries representing the new births, each containing 'Gender'.
-        :param year: The year for which to assign races.
-        :param num_births: The total number of births for the year.
-        :return: The updated population with assigned races.
-        """
-        logger.info(f"Assigning races for {len(population)} births in year {year}")
-
-        male_population = [person for person in population if person["Sex"] == ProbabilityRatesColumnNames.MALE]
-        female_population = [person for person in population if person["Sex"] == ProbabilityRatesColumnNames.FEMALE]
-
-        logger.info(f"Gender distribution - Male: {len(male_population)}, Female: {len(female_population)}, "
-                    f"Male Percentage: {len(male_population) / num_births:.2%}")
+        Draw the number of new births of a year by sex and race.
 
-        male_races = self.np_random_population.choice(
-            list(self.race_lookup[ProbabilityRatesColumnNames.MALE].keys()),
-            size=len(male_population),
-            p=list(self.race_lookup[ProbabilityRatesColumnNames.MALE].values())
-        )
+        The number of males is a single binomial draw with the year's male ratio, and the race counts of
+        each sex are one multinomial draw from the race proportions under 5 years, so the split is exact.
 
-        female_races = self.np_random_population.choice(
-            list(self.race_lookup[ProbabilityRatesColumnNames.FEMALE].keys()),
-            size=len(female_population),
-            p=list(self.race_lookup[ProbabilityRatesColumnNames.FEMALE].values())
-        )
+        :param population_size: The size of the population for the year.
+        :param year: The year for which to generate new births.
+        :return: Integer array of shape (len(SEXES), len(RACES)) with the number of births per sex and race.
+        """
+        num_births = self.compute_new_births(population_size, year)
+        rng = Common_CounterRNG(self.seed).generator(year, RandomStreams.BIRTH)
 
-        logger.info(f"Assigning races to male population")
-        for person, race in zip(male_population, male_races):
-            person["Race"] = race
-            person["Drinking_Stage"] = "Abs"
+        num_males = rng.binomial(num_births, self.male_ratio_lookup)
+        sex_counts = {ProbabilityRatesColumnNames.MALE: num_males,
+                      ProbabilityRatesColumnNames.FEMALE: num_births - num_males}
 
-        logger.info(f"Assigning races to female population")
-        for person, race in zip(female_population, female_races):
-            person["Race"] = race
-            person["Drinking_Stage"] = "Abs"
+        race_probabilities = self.birth_race_probabilities()
+        race_counts = [rng.multinomial(sex_counts[sex], race_probabilities[code])
+                       for code, sex in enumerate(PopulationCodes.SEXES)]
 
-        logger.info(f"Successfully assigned races for {len(population)} births in year {year}")
-        return population
+        logger.info(f"Gender distribution - Male: {num_males}, Female: {num_births - num_males}")
+        return np.array(race_counts, dtype=np.int64)
 
-    def generate_new_births(self, population: int, year: int) -> List[Dict[str, str]]:
+    def generate_birth_columns(self, population_size: int, year: int, next_id: int) -> Dict[str, np.ndarray]:
         """
-        Generate a list of new births for a specified year based on the total population and demographic data.
+        Generate the new births of a year as a block of typed columns, expanding generate_birth_counts
+        without creating per-row Python objects. IDs are the contiguous range starting at next_id.
 
-        This method calculates the number of new births for the given year, determines their genders
-        using a predefined male-to-female ratio, and assigns races to the newborns. Each newborn is
-        represented as a dictionary containing their age and gender, with race information added.
+        :param population_size: The size of the population for the year.
+        :param year: The year for which to generate new births.
+        :param next_id: The first ID to assign, taken from the running ID counter.
+        :return: A dictionary of Population column name to array, ready to be appended to the population store.
+        """
+        birth_counts = self.generate_birth_counts(population_size, year)
+        num_births = int(birth_counts.sum())
+
+        return {
+            InitializationConstants.ID_KEY: np.arange(next_id, next_id + num_births, dtype=np.int64),
+            InitializationConstants.AGE_KEY: np.zeros(num_births, dtype=np.uint8),
+            InitializationConstants.GENDER_KEY: np.repeat(np.arange(len(PopulationCodes.SEXES), dtype=np.uint8),
+                                                          birth_counts.sum(axis=1)),
+            InitializationConstants.RACE_KEY: np.repeat(np.tile(np.arange(len(PopulationCodes.RACES), dtype=np.uint8),
+                                                                len(PopulationCodes.SEXES)),
+                                                        birth_counts.ravel()),
+            InitializationConstants.DRINKING_STAGE_KEY: np.zeros(num_births, dtype=np.uint8),
+            InitializationConstants.IMMIGRATION_KEY: np.zeros(num_births, dtype=bool),
+        }
+
+    def generate_new_births(self, population, year: int, next_id: int = None) -> pd.DataFrame:
+        """
+        Generate the new births for a specified year based on the total population and demographic data.
 
-        :param total_population: The total population for the year.
+        :param population: The population for the year (DataFrame or Population store).
         :param year: The year for which to generate new births.
-        :return: A list of dictionaries representing the new births, each containing 'Age', 'Gender', and 'Race'.
+        :param next_id: First ID to assign. Defaults to one past the largest ID in the population.
+        :return: A DataFrame of new births in the layout of Population.to_dataframe.
         :raises RuntimeError: If an error occurs during the generation of new births.
         """
         logger.info(f"Starting generation of new births for year {year}")
 
         try:
-            # Compute the number of new births based on the total population and birth rate
-            num_births = self.compute_new_births(population, year)
-            logger.info(f"Calculated {num_births} new births for year {year} "
-                        f"(Proportion: {num_births / len(population):.2%})")
-
-            # Assign genders to the newborns
-            genders = self.assign_genders(num_births, year)
-            new_births = [{"Age": 0, "Sex": gender, 'Alive': True, 'Immigration': False} for gender in genders]
-
-            # Assign races to the newborns
-            new_births = self.assign_races(new_births, year, num_births)
-            logger.info(f"Successfully generated {len(new_births)} new births for year {year}")
-
-            # Convert to pandas dataframe for efficiency
-            new_births_df = pd.DataFrame(new_births)
-            logger.info(f"New births DataFrame created with shape: {new_births_df.shape}")
-
-            # Combine Sex and Race into a single column named 'Compositive'
-            new_births_df['Composite'] = new_births_df['Sex'].astype(str) + "_" + \
-                                           new_births_df['Race'].astype(str)
-
-            # Generate the ID and Random value for each new birth
-            max_id = max(population['ID']) + 1 if 'ID' in population else 1
-            new_births_df['ID'] = [i + max_id for i in range(len(new_births_df))]
-
-            # Drop the individual columns
-            new_births_df.drop(columns=['Sex', 'Race'], inplace=True)
-            logger.info("Combined Sex, Race into a single column and removed the individual columns.")
+            if next_id is None:
+                next_id = int(np.max(population[InitializationConstants.ID_KEY])) + 1 if len(population) else 0
+
+            new_births_df = Population(self.generate_birth_columns(len(population), year, next_id)).to_dataframe()
+            logger.info(f"Successfully generated {len(new_births_df)} new births for year {year}")
             return new_births_df
 
         except Exception as e:
@@ -1,48 +1,44 @@
-import pandas as pd
 import numpy as np
-import random
 from src.common.logger import logger
 from src.config.simulation_config import ExperimentConfig
-from src.common.common import Common_RNG
-from src.common.constants import InitializationConstants
+from src.common.constants import RandomStreams
+from src.common.common import Common_CounterRNG
 
 class DeathUpdater:
 
-    def __init__(self, population_df: pd.DataFrame, death_lookup_df: pd.DataFrame):
-        self.population_df = population_df
-        self.death_lookup_df = death_lookup_df
-        self.common_rng = Common_RNG()
+    def __init__(self, population, death_rates_year: np.ndarray, year: int):
+        """
+        Initialize the DeathUpdater.
+
+        :param population: The Population store.
+        :param death_rates_year: Death rates of the year indexed by [composite code, age].
+        :param year: The simulated year, used to seed the draws.
+        """
+        self.population = population
+        self.death_rates_year = death_rates_year
+        self.year = year
+        self.seed = ExperimentConfig.seed
 
     def update_deaths(self):
 
         """
-        Update the population DataFrame by determining deaths based on a death rate lookup table.
-        This method merges the population DataFrame with a death lookup DataFrame to determine the 
-        probability of death for each individual. It uses a random number generator to simulate 
-        whether each individual survives or not based on the death rate. The population DataFrame 
-        is updated in place to reflect the changes.
-        :return: The updated population DataFrame with the 'Alive' status modified based on death rates.
+        Update the population by determining deaths based on the year's death rate array.
+        Each living individual's rate is fetched by integer indexing on [composite code, age] and compared with
+        one uniform keyed by (seed, year, ID); individuals who do not survive are tombstoned in the store,
+        which is compacted once the dead fraction crosses ExperimentConfig.POPULATION_COMPACTION_THRESHOLD.
+        :return: The updated Population store.
         """
-        
-        logger.info("Starting update_deaths method.")
 
-        # Merging population and death lookup dataframes
-        logger.debug("Merging population_df with death_lookup_df on ['Composite', 'Age'].")
-        merged_df = pd.merge(
-            self.population_df,
-            self.death_lookup_df,
-            on=['Composite', 'Age'],
-            how='left'
-        )
-        rngs = np.random.default_rng(seed=ExperimentConfig.seed)
-        merged_df['RNG'] = rngs.random(len(merged_df))
+        logger.info("Starting update_deaths method.")
 
-        logger.debug("Applying death update logic based on 'Rate' and 'Alive' columns.")
-        alive_mask = merged_df['Alive'] & (merged_df['RNG'] >= merged_df['Rate'])
-        merged_df['Alive'] = alive_mask
+        living = np.flatnonzero(self.population.alive)
+        rates = self.death_rates_year[self.population.composite[living], self.population.age[living]]
+        uniforms = Common_CounterRNG(self.seed).uniforms(self.year, RandomStreams.DEATH, self.population.id[living])
+        # Survival needs uniform >= rate; a missing (NaN) rate never passes the check, so the individual dies
+        deaths = living[~(uniforms >= rates)]
 
-        logger.debug("Dropping 'Rate' column and updating population_df.")
-        self.population_df = merged_df.drop(columns=['Rate', 'Year', 'RNG'])
+        self.population.mark_dead(deaths)
+        self.population.compact_if_needed()
 
         logger.info("update_deaths method completed successfully.")
-        return self.population_df
+        return self.population
@@ -1,75 +1,54 @@
-import pandas as pd
 import numpy as np
-from collections import defaultdict
 from src.common.logger import logger
+from src.common.common import Common_Sampling, Common_CounterRNG
 from src.config.simulation_config import ExperimentConfig
-from src.common.constants import InitializationConstants
+from src.common.constants import InitializationConstants, PopulationCodes, RandomStreams
 
 
 class DrinkingStatusUpdater:
 
-    def __init__(self, population_df, drinking_transition_lookup_df):
+    def __init__(self, population, drinking_transition_tensor, drinking_year_group, year):
+        """
+        Initialize the DrinkingStatusUpdater.
 
-        self.population_df = population_df
-        self.transition_df = drinking_transition_lookup_df
+        :param population: The Population store.
+        :param drinking_transition_tensor: The compiled tensor returned by DrinkingStatusLookupGenerator.compile_lookup.
+        :param drinking_year_group: The period key ("0-3", "3-8" or "8+") whose probabilities apply this year.
+        :param year: The simulated year, used to seed the draws.
+        """
+        self.population = population
+        self.tensor = drinking_transition_tensor
+        self.year = year
         self.seed = ExperimentConfig.seed
 
+        if drinking_year_group not in self.tensor["periods"]:
+            logger.error(f"Drinking status lookup for period {drinking_year_group} not found.")
+            raise RuntimeError(f"Drinking status lookup for period {drinking_year_group} not found.")
+        self.period = self.tensor["periods"].index(drinking_year_group)
+
     def update_drinking_status(self):
 
         """
-        Update the population DataFrame by determining drinking status transitions based on a 
-        transition probability lookup table. This method assigns age groups, merges the population 
-        DataFrame with a transition DataFrame to determine the probability of transitioning between 
-        drinking stages, and uses a random number generator to sample outcomes for each individual. 
-        The drinking stage of each individual is updated accordingly.
-        :return: The updated population DataFrame with the 'Drinking_Stage' modified based on 
-             transition probabilities.
+        Update the population by sampling every individual's next drinking stage from the compiled
+        transition tensor. Dead individuals (tombstones) and individuals outside the tensor's age groups
+        (children, who are always "Abs") are skipped; everyone else gets one uniform keyed by
+        (seed, year, ID) that is turned into a stage by inverse-CDF lookup on the row
+        [period, age group, composite, current stage]. Rows missing from the transition sheet keep their
+        current stage.
+        :return: The updated Population store with the drinking stage modified in place.
         """
 
-        # Step 1: Assign age group (vectorized)
-        self.population_df['Age_Group'] = pd.cut(
-            self.population_df['Age'],
-            bins=[0, 17, 35, 50, float('inf')],
-            labels=["0-17", "18-34", "35-50", "51+"]
-        )
-
-        # Step 2: Merge with transition probabilities
-        df = pd.merge(
-            self.population_df,
-            self.transition_df,
-            how='left',
-            on=['Age_Group', 'Composite', 'Drinking_Stage']
-        )
-
-        # Step 3: Extract necessary columns
-        #ids = df[InitializationConstants.ID_KEY].to_numpy()
-        current_stages = df['Drinking_Stage'].to_numpy()
-        prob_column = df['Drinking_Transition_Probability'].to_numpy()
-
-        updated_stages = current_stages.copy()
-
-        # Step 4: Group rows by unique transition dicts
-        grouped_indices = defaultdict(list)
-        for i, prob in enumerate(prob_column):
-            if isinstance(prob, dict):
-                key = tuple(sorted(prob.items()))
-                grouped_indices[key].append(i)
-
-        # Step 5: Sample outcomes for each group
-        for prob_key, indices in grouped_indices.items():
-            stages, probs = zip(*prob_key)
-            stages = np.array(stages)
-            probs = np.array(probs, dtype=np.float64)
+        age_group_codes = self.tensor["age_group_by_age"][self.population.age]
+        eligible = np.flatnonzero((age_group_codes >= 0) & self.population.alive)
+        stage_codes = self.population.writable(InitializationConstants.DRINKING_STAGE_KEY)
 
-            # Use one RNG per group
-            group_seed = abs(hash(prob_key)) % (2**32)
-            rng = np.random.default_rng(group_seed)
+        cdf_rows = self.tensor["cdf"][self.period, age_group_codes[eligible],
+                                      self.population.composite[eligible], stage_codes[eligible]]
+        has_transition = ~np.isnan(cdf_rows[:, 0])
+        eligible = eligible[has_transition]
 
-            samples = rng.choice(stages, p=probs, size=len(indices))
-            updated_stages[indices] = samples
+        uniforms = Common_CounterRNG(self.seed).uniforms(self.year, RandomStreams.DRINKING, self.population.id[eligible])
+        stage_codes[eligible] = Common_Sampling.sample_from_cdf(cdf_rows[has_transition], uniforms)
 
-        # Step 6: Assign and clean up
-        df['Drinking_Stage'] = updated_stages
-        df.drop(columns=['Age_Group', 'Drinking_Transition_Probability'], inplace=True)
-        logger.info("Drinking status updated successfully.")
-        return df
+        logger.info(f"Drinking status updated successfully for {len(eligible)} individuals.")
+        return self.population
@@ -1,10 +1,10 @@
 from typing import Dict
 import numpy as np
 import pandas as pd
-import random
 from src.common.logger import logger
-from src.common.common import Common_RNG
-from src.common.constants import InitializationConstants
+from src.common.common import Common_Sampling, Common_CounterRNG
+from src.common.constants import InitializationConstants, PopulationCodes, RandomStreams
+from src.common.population import Population
 from src.config.simulation_config import ExperimentConfig
 
 class ImmigrationUpdater:
@@ -29,191 +29,165 @@ class ImmigrationUpdater:
         self.sex_lookup = sex_lookup
         self.race_lookup = race_lookup
         self.drinking_distribution_df = drinking_distribution_df
-        self.common_rng = Common_RNG()
         self.seed = ExperimentConfig.seed
-        self.np_random_population = np.random.RandomState(self.seed)
 
-    def _get_age_group_drink_4_groups(self, age):
+    def _build_race_cdf(self):
         """
-        Determine the age group for a given age.
+        Build the race cumulative distributions for the year indexed by [sex code, age group].
 
-        :param age: Age of the individual (0–100).
-        :return: Corresponding age group as a string.
+        :return: Array of shape (len(SEXES), len(AGE_GROUPS), len(RACES)).
+        :raises ValueError: If the race lookup is missing a sex or an age group.
         """
-        logger.debug(f"Determining age group for age: {age}")
-
-        if 0 <= age <= 17:
-            group = "0-17"
-        elif 18 <= age <= 34:
-            group = "18-34"
-        elif 35 <= age <= 54:
-            group = "35-54"
-        elif age >= 55:
-            group = "55 and over"
-        else:
-            logger.error(f"Invalid age: {age}")
-            raise ValueError(f"Invalid age: {age}")
-
-        logger.debug(f"Age {age} falls into group: {group}")
-        return group
-    
-    def _get_age_group_drink_5_groups(self, age):
+        race_cdf = np.zeros((len(PopulationCodes.SEXES), len(InitializationConstants.AGE_GROUPS), len(PopulationCodes.RACES)))
+        for sex_code, sex in enumerate(PopulationCodes.SEXES):
+            if sex not in self.race_lookup:
+                logger.error(f"Race lookup not found for sex {sex}")
+                raise ValueError(f"Race lookup not found for sex {sex}")
+            for group_index, (_, _, age_group) in enumerate(InitializationConstants.AGE_GROUPS):
+                if age_group not in self.race_lookup[sex]:
+                    logger.error(f"Race distribution not found for age group {age_group}")
+                    raise ValueError(f"Race distribution not found for age group {age_group}")
+                race_distribution = self.race_lookup[sex][age_group]
+                race_cdf[sex_code, group_index] = Common_Sampling.build_cdf(
+                    [race_distribution.get(race, 0) for race in PopulationCodes.RACES])
+        return race_cdf
+
+    def generate_immigration_columns(self, population_size: int, year: int, next_id: int):
+
+        """
+        Generate the immigrants of a year as a block of typed columns.
+
+        All immigrants are drawn in one batch: ages from the yearly age distribution, sex by age, race by
+        (sex, age group) and drinking stage by (drinking age group, composite) from
+        initial_pop_drinking_status_lookup, so the cost is linear in the number of immigrants.
+
+        :param population_size: The size of the population for the year.
+        :param year: The year for which to generate the immigration population.
+        :param next_id: The first ID to assign, taken from the running ID counter.
+        :return: A dictionary of Population column name to array, ready to be appended to the population store.
         """
-        Determine the age group for a given age.
+        logger.info(f"Generating immigration population for year {year}")
+
+        num_immigrants = max(0, int(round(population_size * self.immigration_rate_lookup)))
+        logger.info(f"Calculated {num_immigrants} immigrants for year {year} with immigration rate {self.immigration_rate_lookup:.6f}")
+
+        rng = Common_CounterRNG(self.seed).generator(year, RandomStreams.IMMIGRATION)
+
+        # Assign ages
+        age_distribution = self.age_lookup[InitializationConstants.AGE_KEY]
+        age_choices = np.array([int(age) for age in age_distribution.keys()], dtype=np.int64)
+        age_weights = np.array(list(age_distribution.values()), dtype=np.float64)
+        ages = rng.choice(age_choices, size=num_immigrants, p=age_weights / age_weights.sum())
+
+        # Assign sexes by age
+        sex_distribution = self.sex_lookup[InitializationConstants.AGE_KEY]
+        missing_ages = [age for age in np.unique(ages) if age not in sex_distribution]
+        if missing_ages:
+            logger.error(f"Sex distribution not found for ages {missing_ages}")
+            raise ValueError(f"Sex distribution not found for ages {missing_ages}")
+        male_ratios = np.zeros(PopulationCodes.MAX_AGE + 1)
+        for age, male_ratio in sex_distribution.items():
+            if 0 <= age <= PopulationCodes.MAX_AGE:
+                male_ratios[int(age)] = male_ratio
+        sex_codes = np.where(rng.random(num_immigrants) < male_ratios[ages],
+                             PopulationCodes.SEXES.index(InitializationConstants.MALE),
+                             PopulationCodes.SEXES.index(InitializationConstants.FEMALE))
+
+        # Assign races by sex and age group
+        age_group_codes = Common_Sampling.get_age_group_codes(ages, InitializationConstants.AGE_GROUPS)
+        race_codes = Common_Sampling.sample_from_cdf(self._build_race_cdf()[sex_codes, age_group_codes],
+                                                     rng.random(num_immigrants))
+        composite_codes = sex_codes * len(PopulationCodes.RACES) + race_codes
+
+        # Assign drinking stages by drinking age group and composite
+        drinking_age_groups, drinking_cdf = Common_Sampling.build_drinking_status_cdf(self.drinking_distribution_df)
+        drinking_stage_codes = Common_Sampling.sample_drinking_stages(
+            drinking_age_groups, drinking_cdf, ages, composite_codes, rng.random(num_immigrants))
+
+        return {
+            InitializationConstants.ID_KEY: np.arange(next_id, next_id + num_immigrants, dtype=np.int64),
+            InitializationConstants.AGE_KEY: ages,
+            InitializationConstants.GENDER_KEY: sex_codes,
+            InitializationConstants.RACE_KEY: race_codes,
+            InitializationConstants.DRINKING_STAGE_KEY: drinking_stage_codes,
+            InitializationConstants.IMMIGRATION_KEY: np.ones(num_immigrants, dtype=bool),
+        }
+
+    def generate_immigration_counts(self, population_size: int, year: int) -> np.ndarray:
 
-        :param age: Age of the individual (0–100).
-        :return: Corresponding age group as a string.
         """
-        logger.debug(f"Determining age group for age: {age}")
-
-        if 0 <= age <= 17:
-            group = "0-17"
-        elif 18 <= age <= 24:
-            group = "18-24"
-        elif 25 <= age <= 34:
-            group = "25-34"
-        elif 35 <= age <= 54:
-            group = "35-54"
-        elif age >= 55:
-            group = "55 and over"
-        else:
-            logger.error(f"Invalid age: {age}")
-            raise ValueError(f"Invalid age: {age}")
-
-        logger.debug(f"Age {age} falls into group: {group}")
-        return group
-    
-    def _assign_drinking_status(self, drinking_status_dict, random_state):
+        Draw the immigrants of a year as counts by single-year age, sex, race and drinking stage.
 
+        The joint distribution is the product of the yearly age distribution, sex by age, race by (sex, age
+        group) and drinking stage by (drinking age group, composite), the same factors generate_immigration_columns
+        samples from, and all counts come from one multinomial draw.
+
+        :param population_size: The size of the population for the year.
+        :param year: The year for which to generate the immigrants.
+        :return: Integer array of shape (MAX_AGE + 1, len(SEXES), len(RACES), len(DRINKING_STAGES)).
+        :raises ValueError: If the sex distribution is missing for an age with immigrants.
+        :raises KeyError: If the drinking distribution is missing for an age and composite with immigrants.
         """
-        Assign a drinking status to an individual based on the provided drinking status distribution.
+        num_immigrants = max(0, int(round(population_size * self.immigration_rate_lookup)))
+        logger.info(f"Calculated {num_immigrants} immigrants for year {year} with immigration rate {self.immigration_rate_lookup:.6f}")
+
+        rng = Common_CounterRNG(self.seed).generator(year, RandomStreams.IMMIGRATION)
+        joint = self.immigration_cell_probabilities()
+        return rng.multinomial(num_immigrants, joint.ravel()).reshape(joint.shape)
 
-        :param drinking_status_dict: A dictionary where keys are drinking stages and values are their probabilities.
-        :param random_state: A numpy RandomState object for generating random choices.
-        :return: The assigned drinking stage.
+    def immigration_cell_probabilities(self) -> np.ndarray:
         """
-        stages, probabilities = zip(*drinking_status_dict.items())
-        probabilities = np.array(probabilities) / np.sum(probabilities)
-        return random_state.choice(stages, p=probabilities)
+        Joint distribution of the immigrants by single-year age, sex, race and drinking stage.
 
-    def generate_immigration_population(self, population: int, year: int) -> pd.DataFrame:
+        :return: Float array of shape (MAX_AGE + 1, len(SEXES), len(RACES), len(DRINKING_STAGES)) summing to 1.
+        :raises ValueError: If the sex distribution is missing for an age with immigrants.
+        :raises KeyError: If the drinking distribution is missing for an age and composite with immigrants.
+        """
+        ages = np.arange(PopulationCodes.MAX_AGE + 1)
+
+        age_probabilities = np.zeros(PopulationCodes.MAX_AGE + 1)
+        for age, weight in self.age_lookup[InitializationConstants.AGE_KEY].items():
+            age_probabilities[min(int(age), PopulationCodes.MAX_AGE)] += weight
+        age_probabilities /= age_probabilities.sum()
+
+        sex_distribution = self.sex_lookup[InitializationConstants.AGE_KEY]
+        missing_ages = [age for age in ages[age_probabilities > 0] if age not in sex_distribution]
+        if missing_ages:
+            logger.error(f"Sex distribution not found for ages {missing_ages}")
+            raise ValueError(f"Sex distribution not found for ages {missing_ages}")
+        male_ratios = np.array([sex_distribution.get(age, 0) for age in ages], dtype=np.float64)
+        sex_probabilities = np.zeros((PopulationCodes.MAX_AGE + 1, len(PopulationCodes.SEXES)))
+        sex_probabilities[:, PopulationCodes.SEXES.index(InitializationConstants.MALE)] = male_ratios
+        sex_probabilities[:, PopulationCodes.SEXES.index(InitializationConstants.FEMALE)] = 1 - male_ratios
+
+        age_group_codes = Common_Sampling.get_age_group_codes(ages, InitializationConstants.AGE_GROUPS)
+        race_probabilities = Common_Sampling.cdf_to_probabilities(self._build_race_cdf()[:, age_group_codes].transpose(1, 0, 2))
+
+        drinking_probabilities = Common_Sampling.get_drinking_status_probabilities_by_age(
+            *Common_Sampling.build_drinking_status_cdf(self.drinking_distribution_df))
+
+        joint = (age_probabilities[:, None, None, None] * sex_probabilities[:, :, None, None]
+                 * race_probabilities[:, :, :, None])
+        missing = np.isnan(drinking_probabilities).any(axis=-1) & (joint[..., 0] > 0)
+        if missing.any():
+            logger.error("Missing drinking distribution for some age group and composite combinations.")
+            raise KeyError("Missing drinking distribution for some age group and composite combinations.")
+        joint = joint * np.nan_to_num(drinking_probabilities)
+        return joint / joint.sum()
+
+    def generate_immigration_population(self, population, year: int, next_id: int = None) -> pd.DataFrame:
 
         """
         Generate the immigration population for a given year based on the total population and lookup tables.
 
-        :param total_population: The total population for the year.
+        :param population: The current population (DataFrame or Population store).
         :param year: The year for which to generate the immigration population.
+        :param next_id: First ID to assign. Defaults to one past the largest ID in the population.
         :return: A pandas DataFrame representing the immigration population.
         """
-        logger.info(f"Generating immigration population for year {year}")
-
-        num_immigrants = max(0, int(round(len(population) * self.immigration_rate_lookup)))
-        logger.info(f"Calculated {num_immigrants} immigrants for year {year} with immigration rate {self.immigration_rate_lookup:.6f}")
-
-        # Assign ages
-        age_distribution = self.age_lookup['Age']
-
-        ages = self.np_random_population.choice(
-            list(age_distribution.keys()),
-            size=num_immigrants,
-            p=list(age_distribution.values())
-        )
-
-        # Assign sexes
-        sex_distribution = self.sex_lookup['Age']
-        immigration_population = []
-        sexes = []
-        races = []
-
-        # Assign Age Groups
-        for sex in ['Female', 'Male']:
-            if sex not in self.race_lookup:
-                logger.error(f"Race lookup not found for age group {age}")
-                raise ValueError(f"Race lookup not found for age group {age}")
-            race_distribution = self.race_lookup[sex]
-            age_bins = [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, float('inf')]
-            age_labels = [
-                "Under 5 years", "5 to 9 years", "10 to 14 years", "15 to 19 years",
-                "20 to 24 years", "25 to 29 years", "30 to 34 years", "35 to 39 years",
-                "40 to 44 years", "45 to 49 years", "50 to 54 years", "55 to 59 years",
-                "60 to 64 years", "65 to 69 years", "70 to 74 years", "75 to 79 years",
-                "80 to 84 years", "85 years and over"
-            ]
-            age_groups = pd.cut(ages, bins=age_bins, labels=age_labels, right=False)
-        
-        for idx, (age, age_group) in enumerate(zip(ages, age_groups)):
-            person_id = population['ID'].max() + idx + 1
-            person_rng = self.common_rng.get_rng_for_person(person_id)
-
-            immigration_population.append({
-                'Age': age,
-                'Alive': True,
-                'ID': person_id,
-                "Immigration": True,
-                "RNG": person_rng
-            })
-
-            if age not in sex_distribution:
-                logger.error(f"Sex distribution not found for age group {age}")
-                raise ValueError(f"Sex distribution not found for age group {age}")
-            male_ratio = sex_distribution[age]
-            sex = person_rng.choice(
-            ["Male", "Female"],
-            p=[male_ratio, 1 - male_ratio]
-            )
-            sexes.append(sex)
-
-            if age_group not in race_distribution:
-                logger.error(f"Race distribution not found for age group {age_group}")
-                raise ValueError(f"Race distribution not found for age group {age_group}")
-            race = person_rng.choice(
-                list(race_distribution[age_group].keys()),
-                p=list(race_distribution[age_group].values())
-            )
-            races.append(race)
-
-        # Convert immigration_population to a DataFrame
-        immigration_population = pd.DataFrame(immigration_population)
-
-        # Add the "Composite" column
-        immigration_population["Composite"] = [f"{sex}_{race}" for sex, race in zip(sexes, races)]
-
-        # Identify unique age groups in the drinking distribution DataFrame
-        unique_age_groups = self.drinking_distribution_df[InitializationConstants.AGE_GROUP_KEY].unique()
-        logger.info(f"Unique age groups in drinking distribution: {unique_age_groups}")
-
-        # Decide which age group function to use based on unique age groups
-        if set(unique_age_groups).issubset({"0-17", "18-34", "35-54", "55 and over"}):
-            logger.info("Using 4-group age cutoff for age group determination.")
-            self._get_age_group_drink = self._get_age_group_drink_4_groups
-        elif set(unique_age_groups).issubset({"0-17", "18-24", "25-34", "35-54", "55 and over"}):
-            logger.info("Using 5-group age cutoff for age group determination.")
-            self._get_age_group_drink = self._get_age_group_drink_5_groups
-        else:
-            logger.error(f"Unexpected age groups in drinking distribution: {unique_age_groups}")
-            raise ValueError(f"Unexpected age groups in drinking distribution: {unique_age_groups}")
-
-        # Assign drinking stage based on age
-        immigration_population[InitializationConstants.AGE_GROUP_KEY] = immigration_population[InitializationConstants.AGE_KEY].apply(self._get_age_group_drink)
-        
-        # Merge population_df with the drinking distribution DataFrame
-        immigration_population = immigration_population.merge(
-            self.drinking_distribution_df,
-            how='left',
-            left_on=[InitializationConstants.AGE_GROUP_KEY, 'Composite'],
-            right_on=[InitializationConstants.AGE_GROUP_KEY, 'Composite']
-        )
-        logger.info("Merged population DataFrame with drinking distribution DataFrame on Age_Group_Key and Composite.")
-
-        # Assign drinking status based on the distribution
-        immigration_population[InitializationConstants.DRINKING_STAGE_KEY] = immigration_population.apply(lambda x: self._assign_drinking_status(x[InitializationConstants.DRINKING_STATUS_KEY], 
-                                                                                                                                       x[InitializationConstants.RNG_KEY]), axis=1)
-
-        # Drop the individual columns
-        immigration_population.drop(columns=[InitializationConstants.DRINKING_STATUS_KEY, 
-                                    InitializationConstants.AGE_GROUP_KEY,
-                                    InitializationConstants.RNG_KEY], inplace=True)
+        if next_id is None:
+            next_id = int(np.max(population[InitializationConstants.ID_KEY])) + 1 if len(population) else 0
 
+        immigration_population = Population(self.generate_immigration_columns(len(population), year, next_id)).to_dataframe()
         logger.info(f"Generated immigration population DataFrame with shape: {immigration_population.shape}")
         return immigration_population
-    
\ No newline at end of file
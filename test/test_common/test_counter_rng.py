@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+from src.common.common import Common_CounterRNG, Common_RNG
+from src.common.constants import RandomStreams
+
+
+class TestCommonCounterRNG(unittest.TestCase):
+    def setUp(self):
+        self.rng = Common_CounterRNG(123)
+
+    def test_philox_known_answers(self):
+        # Known-answer vectors of the Random123 reference implementation for Philox4x32-10
+        vectors = [
+            ((0, 0, 0, 0), (0, 0), (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)),
+            ((0xffffffff,) * 4, (0xffffffff, 0xffffffff), (0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd)),
+            ((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0),
+             (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1)),
+        ]
+        for counter, key, expected in vectors:
+            self.assertEqual(tuple(int(word) for word in Common_CounterRNG.philox4x32(counter, key)), expected)
+
+    def test_uniforms_do_not_depend_on_partitioning(self):
+        ids = np.arange(10000) * 7 + (1 << 40)
+        uniforms = self.rng.uniforms(2005, RandomStreams.DEATH, ids, draws=3)
+        self.assertEqual(uniforms.shape, (10000, 3))
+        self.assertTrue(((uniforms >= 0) & (uniforms < 1)).all())
+
+        shards = [self.rng.uniforms(2005, RandomStreams.DEATH, shard, draws=3) for shard in np.array_split(ids[::-1], 4)]
+        np.testing.assert_array_equal(np.concatenate(shards)[::-1], uniforms)
+        np.testing.assert_array_equal(self.rng.uniforms(2005, RandomStreams.DEATH, ids), uniforms[:, 0])
+        self.assertAlmostEqual(uniforms.mean(), 0.5, delta=0.01)
+
+    def test_streams_are_distinct(self):
+        ids = np.arange(1000)
+        death = self.rng.uniforms(2005, RandomStreams.DEATH, ids)
+        self.assertFalse(np.array_equal(death, self.rng.uniforms(2005, RandomStreams.DRINKING, ids)))
+        self.assertFalse(np.array_equal(death, self.rng.uniforms(2006, RandomStreams.DEATH, ids)))
+        self.assertFalse(np.array_equal(death, Common_CounterRNG(124).uniforms(2005, RandomStreams.DEATH, ids)))
+
+    def test_generator_is_reproducible(self):
+        first = self.rng.generator(2005, RandomStreams.BIRTH, block=3).binomial(1000, 0.5, size=5)
+        second = Common_CounterRNG(123).generator(2005, RandomStreams.BIRTH, block=3).binomial(1000, 0.5, size=5)
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_array_equal(Common_RNG().get_rng_for_person(42).random(3),
+                                      Common_RNG().get_rng_for_person(42).random(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
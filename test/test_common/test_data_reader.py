@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from src.common.data_reader import ExcelDataReader
+
+
+class TestExcelDataReader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self._write_workbook(1)
+        self.reader = ExcelDataReader(self.directory.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.directory.cleanup()
+
+    def _write_workbook(self, value):
+        with pd.ExcelWriter(os.path.join(self.directory.name, "input.xlsx")) as writer:
+            pd.DataFrame({"Year": [2000, 2001], "Rate": [value, value]}).to_excel(writer, sheet_name="Birth", index=False)
+            pd.DataFrame({"Age": [0, 1]}).to_excel(writer, sheet_name="Race_Sex_Age", index=False)
+
+    def test_sheets_are_parsed_once(self):
+        parse = pd.ExcelFile.parse
+        with mock.patch.object(pd.ExcelFile, "parse", autospec=True, side_effect=parse) as parse_mock:
+            self.reader.prefetch("input.xlsx", ["Birth", "Race_Sex_Age", "Birth"])
+            first = self.reader.read_sheet("input.xlsx", "Race_Sex_Age")
+            first["Age"] = 5
+            second = self.reader.read_sheet("input.xlsx", "Race_Sex_Age")
+        self.assertEqual(parse_mock.call_count, 2)
+        self.assertEqual(second["Age"].tolist(), [0, 1])
+
+    def test_modified_workbook_is_read_again(self):
+        self.assertEqual(self.reader.read_sheet("input.xlsx", "Birth")["Rate"].tolist(), [1, 1])
+        self._write_workbook(2)
+        stat = os.stat(os.path.join(self.directory.name, "input.xlsx"))
+        os.utime(os.path.join(self.directory.name, "input.xlsx"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.reader.read_sheet("input.xlsx", "Birth")["Rate"].tolist(), [2, 2])
+
+    def test_missing_sheet_and_file(self):
+        with self.assertRaises(ValueError):
+            self.reader.read_sheet("input.xlsx", "Death")
+        with self.assertRaises(FileNotFoundError):
+            self.reader.prefetch("missing.xlsx", ["Birth"])
+
+    def test_csv_file_is_one_sheet(self):
+        pd.DataFrame({"Year": [2001], "Rate": [0.5]}).to_csv(os.path.join(self.directory.name, "death.csv"), index=False)
+        self.reader.prefetch("death.csv", ["Death_Rate_Data"])
+        self.assertEqual(self.reader.read_sheet("death.csv", "Death_Rate_Data")["Rate"].tolist(), [0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.initialization.initial_population_generator import PopulationInitializer
+from src.common.constants import InitializationConstants, PopulationCodes
+from src.config.simulation_config import ExperimentConfig
+
+
+def build_distributions():
+    age_distribution = {age: 1 / 101 for age in range(101)}
+    sex_distribution = {float(age): 0.5 for age in range(101)}
+    race_distribution = {
+        (age_group, sex): {"White": 0.4, "Black": 0.3, "Hispanic": 0.2, "Other": 0.1}
+        for _, _, age_group in InitializationConstants.AGE_GROUPS
+        for sex in PopulationCodes.SEXES
+    }
+    rows = []
+    for _, _, age_group in InitializationConstants.DRINKING_AGE_GROUPS_4:
+        for composite in PopulationCodes.COMPOSITES:
+            if age_group == "0-17":
+                status = {"Abs": 1, "Low": 0, "Med": 0, "High": 0, "Very High": 0}
+            else:
+                status = {"Abs": 0.5, "Low": 0.2, "Med": 0.1, "High": 0.1, "Very High": 0.1}
+            rows.append({"Age_Group": age_group, "Drinking_Status": status, "Composite": composite})
+    return age_distribution, sex_distribution, race_distribution, pd.DataFrame(rows)
+
+
+class TestVectorizedPopulationInitializer(unittest.TestCase):
+    def setUp(self):
+        self.original_total = ExperimentConfig.INITIAL_TOTAL_POPULATION
+        ExperimentConfig.INITIAL_TOTAL_POPULATION = 50000
+        self.distributions = build_distributions()
+
+    def tearDown(self):
+        ExperimentConfig.INITIAL_TOTAL_POPULATION = self.original_total
+
+    def test_population_size_and_columns(self):
+        population = PopulationInitializer(*self.distributions).generate_initial_population_vectorized()
+        self.assertEqual(len(population), ExperimentConfig.INITIAL_TOTAL_POPULATION)
+        self.assertEqual(list(population.columns), ["Age", "ID", "Alive", "Immigration", "Composite", "Drinking_Stage"])
+        self.assertTrue(population["ID"].is_unique)
+
+    def test_random_seed_reproducibility(self):
+        population1 = PopulationInitializer(*self.distributions).generate_initial_population_vectorized()
+        population2 = PopulationInitializer(*self.distributions).generate_initial_population_vectorized()
+        pd.testing.assert_frame_equal(population1, population2)
+
+    def test_marginal_distributions(self):
+        population = PopulationInitializer(*self.distributions).generate_initial_population_vectorized()
+        race_shares = population["Composite"].str.split("_").str[1].value_counts(normalize=True)
+        self.assertAlmostEqual(race_shares["White"], 0.4, delta=0.01)
+        self.assertAlmostEqual(race_shares["Other"], 0.1, delta=0.01)
+        self.assertAlmostEqual(population["Composite"].str.startswith("Male").mean(), 0.5, delta=0.01)
+        self.assertTrue((population.loc[population["Age"] < 18, "Drinking_Stage"] == "Abs").all())
+        adult_abs_share = (population.loc[population["Age"] >= 18, "Drinking_Stage"] == "Abs").mean()
+        self.assertAlmostEqual(adult_abs_share, 0.5, delta=0.015)
+
+    def test_adjust_population_vectorized(self):
+        initializer = PopulationInitializer(*self.distributions)
+        age_counts = np.full(101, 10, dtype=np.int64)
+        rng = np.random.default_rng(0)
+        self.assertEqual(initializer._adjust_population_vectorized(age_counts, 25, rng).sum(), 1035)
+        removed = initializer._adjust_population_vectorized(age_counts, -25, rng)
+        self.assertEqual(removed.sum(), 985)
+        self.assertTrue((removed >= 0).all())
+
+    def test_missing_race_distribution(self):
+        age_distribution, sex_distribution, race_distribution, drinking_distribution = self.distributions
+        race_distribution = dict(race_distribution)
+        del race_distribution[("Under 5 years", "Male")]
+        initializer = PopulationInitializer(age_distribution, sex_distribution, race_distribution, drinking_distribution)
+        with self.assertRaises(KeyError):
+            initializer.generate_initial_population_vectorized()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.initialization.lookup_tables_cache import LookupTablesCache
+from src.config.simulation_config import ExperimentConfig
+
+
+class TestLookupTablesCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.workbook_path = os.path.join(self.directory.name, "input.xlsx")
+        with open(self.workbook_path, "wb") as file:
+            file.write(b"workbook")
+        self.cache = LookupTablesCache(os.path.join(self.directory.name, "cache"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        key = self.cache.key([self.workbook_path], {"birth_rate_sheet": "Birth"})
+        self.assertIsNone(self.cache.load(key))
+
+        self.cache.save(key, {"death_rate_array": {"first_year": 2000, "rates": np.ones(3)}})
+        lookup_tables = self.cache.load(key)
+        self.assertEqual(lookup_tables["death_rate_array"]["rates"].tolist(), [1.0, 1.0, 1.0])
+
+        self.cache.clear()
+        self.assertIsNone(self.cache.load(key))
+
+    def test_key_covers_inputs(self):
+        key = self.cache.key([self.workbook_path], {"birth_rate_sheet": "Birth"})
+        self.assertEqual(key, self.cache.key([self.workbook_path], {"birth_rate_sheet": "Birth"}))
+        self.assertNotEqual(key, self.cache.key([self.workbook_path], {"birth_rate_sheet": "Birth_2"}))
+        with mock.patch.object(ExperimentConfig, "END_YEAR", ExperimentConfig.END_YEAR + 1):
+            self.assertNotEqual(key, self.cache.key([self.workbook_path], {"birth_rate_sheet": "Birth"}))
+        with open(self.workbook_path, "ab") as file:
+            file.write(b" changed")
+        self.assertNotEqual(key, self.cache.key([self.workbook_path], {"birth_rate_sheet": "Birth"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
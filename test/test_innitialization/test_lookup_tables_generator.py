@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+from src.initialization.lookup_tables_generator import LookupTablesGenerator
+from src.config.simulation_config import ExperimentConfig
+
+
+class FakeGenerator:
+    def __init__(self, base_path, excel_file_name):
+        self.excel_file_name = excel_file_name
+
+    def generate(self, sheet_name):
+        if sheet_name == "Missing":
+            raise ValueError(f"Sheet '{sheet_name}' does not exist")
+        return {sheet_name: self.excel_file_name}
+
+
+@mock.patch.object(ExperimentConfig, "LOOKUP_GENERATION_EXECUTOR", "thread")
+class TestConcurrentLookupGeneration(unittest.TestCase):
+    def setUp(self):
+        self.generator = LookupTablesGenerator("input_data", "input.xlsx", "transition.xlsx", "prevalence.xlsx", cache_dir="unused")
+        self.generator._generator_specs = lambda: {"birth": (FakeGenerator, ("input_data", "input.xlsx")),
+                                                   "death": (FakeGenerator, ("input_data", "death.xlsx"))}
+
+    def test_results_keep_task_order(self):
+        tasks = [(("birth", "Birth"), "birth", "generate", {"sheet_name": "Birth"}),
+                 (("death", "Death"), "death", "generate", {"sheet_name": "Death"})]
+        self.generator._generated[("birth", "Birth")] = {"Birth": "cached"}
+
+        results = self.generator._generate_concurrently(tasks, tasks[1:], 2)
+        self.assertEqual(results, [{"Birth": "cached"}, {"Death": "death.xlsx"}])
+
+    def test_errors_are_wrapped(self):
+        tasks = [(("birth", "Birth"), "birth", "generate", {"sheet_name": "Birth"}),
+                 (("death", "Missing"), "death", "generate", {"sheet_name": "Missing"})]
+        with self.assertRaises(RuntimeError) as context:
+            self.generator._generate_concurrently(tasks, tasks, 2)
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+
+
+class YearWindowGenerator:
+    def __getattr__(self, method_name):
+        return lambda **kwargs: {"end_year": ExperimentConfig.END_YEAR}
+
+
+class TestSequentialLookupGeneration(unittest.TestCase):
+    def setUp(self):
+        self.generator = LookupTablesGenerator("input_data", "input.xlsx", "transition.xlsx", "prevalence.xlsx", cache_dir="unused")
+        self.generator.data_reader = mock.Mock()
+        self.generator._initialize_generators = lambda: {name: YearWindowGenerator() for name in
+                                                         ["birth", "death", "immigration", "drinking_transition",
+                                                          "initial_population"]}
+
+    def test_tables_are_regenerated_for_another_year_window(self):
+        generator = self.generator
+        sheets = [f"sheet_{index}" for index in range(14)]
+        with mock.patch.object(ExperimentConfig, "END_YEAR", 2023):
+            self.assertEqual(generator._generate_lookup_tables(*sheets)["death_rate_array"], {"end_year": 2023})
+        with mock.patch.object(ExperimentConfig, "END_YEAR", 2030):
+            self.assertEqual(generator._generate_lookup_tables(*sheets)["death_rate_array"], {"end_year": 2030})
+
+    def test_read_errors_name_the_generator_and_sheet(self):
+        def prefetch(file_name, sheet_names):
+            if sheet_names == ["Missing"]:
+                raise ValueError(f"Sheet 'Missing' does not exist in '{file_name}'")
+
+        self.generator.data_reader.prefetch.side_effect = prefetch
+        sheets = [f"sheet_{index}" for index in range(14)]
+        sheets[9] = "Missing"  # drinking_transition_sheet_name
+        with self.assertRaisesRegex(RuntimeError, "drinking_transition lookup tables: cannot read sheet 'Missing' "
+                                                  "of 'transition.xlsx'") as context:
+            self.generator._generate_lookup_tables(*sheets)
+        self.assertIsInstance(context.exception.__cause__, ValueError)
+        self.generator.data_reader.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
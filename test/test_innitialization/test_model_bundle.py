@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.initialization.model_bundle import ModelBundle
+from src.config.simulation_config import ExperimentConfig
+from src.common.common import Common_Fingerprint
+from src.common.constants import PopulationCodes
+
+
+class TestModelBundle(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.directory.name, "input.xlsx")
+        with open(self.input_path, "wb") as file:
+            file.write(b"workbook")
+        self.bundle_dir = os.path.join(self.directory.name, "bundle")
+        self.lookup_tables = {
+            "birth_rate_table": {2001: 0.01, 2002: 0.02},
+            "initial_pop_race_lookup": {("18-24", "Male"): {"White": 0.6, "Black": 0.4}},
+            "death_lookup_table": pd.DataFrame({"Year": [2001], "Composite": ["Male_White"], "Age": [0], "Rate": [0.1]}),
+            "death_rate_array": {"first_year": 2001, "rates": np.arange(6, dtype=np.float64).reshape(2, 3)},
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self):
+        return ModelBundle.write(self.bundle_dir, self.lookup_tables, {"excel_file_name": self.input_path},
+                                 {"birth_rate_sheet": "Birth"})
+
+    def test_write_and_load(self):
+        manifest = self._write()
+        self.assertEqual(manifest["inputs"]["excel_file_name"]["file"], "input.xlsx")
+        self.assertEqual(len(manifest["arrays"]), 1)
+
+        lookup_tables = ModelBundle.load(self.bundle_dir, verify=True)
+        self.assertIsInstance(lookup_tables["death_rate_array"]["rates"], np.memmap)
+        self.assertEqual(Common_Fingerprint.fingerprint(lookup_tables), Common_Fingerprint.fingerprint(self.lookup_tables))
+
+        # Writing again replaces the bundle
+        self.lookup_tables["birth_rate_table"][2001] = 0.5
+        self._write()
+        self.assertEqual(ModelBundle.load(self.bundle_dir, mmap=False)["birth_rate_table"][2001], 0.5)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["bundle", "input.xlsx"])
+
+    def test_invalid_bundles(self):
+        with self.assertRaises(FileNotFoundError):
+            ModelBundle.load(self.bundle_dir)
+
+        manifest = self._write()
+        with mock.patch.object(ExperimentConfig, "INITIAL_YEAR", manifest["years"]["initial_year"] + 1):
+            with self.assertRaises(ValueError):
+                ModelBundle.load(self.bundle_dir)
+
+        manifest["fingerprint"] = "0" * 64
+        with open(os.path.join(self.bundle_dir, ModelBundle.MANIFEST_FILE), "w") as file:
+            json.dump(manifest, file)
+        ModelBundle.load(self.bundle_dir)
+        with self.assertRaises(ValueError):
+            ModelBundle.load(self.bundle_dir, verify=True)
+
+        manifest["format_version"] = ModelBundle.FORMAT_VERSION + 1
+        with open(os.path.join(self.bundle_dir, ModelBundle.MANIFEST_FILE), "w") as file:
+            json.dump(manifest, file)
+        with self.assertRaises(ValueError):
+            ModelBundle.load(self.bundle_dir)
+
+    @mock.patch("src.initialization.model_bundle.LookupTablesGenerator")
+    def test_ingest_rejects_missing_death_rates(self, lookup_tables_generator):
+        rates = np.full((2, len(PopulationCodes.COMPOSITES), PopulationCodes.MAX_AGE + 1), 0.01)
+        rates[1, 2, PopulationCodes.MAX_AGE] = np.nan
+        self.lookup_tables["death_rate_array"]["rates"] = rates
+        lookup_tables_generator.return_value.create_lookup_tables.return_value = self.lookup_tables
+        with self.assertRaisesRegex(ValueError, "missing cells"):
+            ModelBundle.ingest(self.bundle_dir, self.directory.name, "input.xlsx", "input.xlsx", "input.xlsx")
+        self.assertFalse(os.path.exists(self.bundle_dir))
+
+        ModelBundle.ingest(self.bundle_dir, self.directory.name, "input.xlsx", "input.xlsx", "input.xlsx",
+                           allow_missing_death_rates=True)
+        self.assertTrue(np.isnan(ModelBundle.load(self.bundle_dir)["death_rate_array"]["rates"][1, 2, -1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
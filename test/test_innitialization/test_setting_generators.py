@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+from src.initialization.setting_generators.death_lookup_generator import DeathLookupGenerator
+from src.initialization.setting_generators.immigration_lookup_generator import ImmigrationLookupGenerator
+from src.config.simulation_config import ExperimentConfig
+from src.common.constants import PopulationCodes
+
+
+class FakeReader:
+    def __init__(self, sheets):
+        self.sheets = sheets
+
+    def read_sheet(self, file, sheet_name):
+        return self.sheets[sheet_name].copy()
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2002)
+class TestDeathLookupGenerator(unittest.TestCase):
+    def death_generator(self, rates):
+        data = pd.DataFrame({"Year": [2000, 2001, 2001, 2002], "Sex": ["Male", "Female", "Male", "Male"],
+                             "Race": ["White", "Black", "White", "White"], "Age": [0, 0, 1, 2], "Rate": rates})
+        return DeathLookupGenerator("input_data", "input.xlsx", data_reader=FakeReader({"Death": data}))
+
+    def test_rows_of_simulated_years(self):
+        lookup_table = self.death_generator([0.5, 0.1, 0.2, 0.3]).load_lookup_table("Death", "Rate")
+        self.assertEqual(lookup_table.columns.tolist(), ["Year", "Composite", "Age", "Rate"])
+        self.assertEqual(lookup_table.index.tolist(), [0, 1, 2])
+        self.assertEqual(lookup_table["Composite"].tolist(), ["Female_Black", "Male_White", "Male_White"])
+        self.assertEqual(lookup_table["Rate"].tolist(), [0.1, 0.2, 0.3])
+
+    def test_first_invalid_row_is_reported(self):
+        with self.assertRaisesRegex(ValueError, "Invalid Rate: 1.5"):
+            self.death_generator([2.0, 0.1, 1.5, float("nan")]).load_lookup_table("Death", "Rate")
+        with self.assertRaisesRegex(ValueError, "non-null"):
+            self.death_generator([2.0, float("nan"), 1.5, 0.3]).load_lookup_table("Death", "Rate")
+
+    def test_coverage_of_the_death_rates(self):
+        lookup_table = pd.DataFrame({"Year": 2001, "Composite": "Male_White", "Age": [0, 1], "Rate": 0.1})
+        rates = np.full((1, len(PopulationCodes.COMPOSITES), PopulationCodes.MAX_AGE + 1), 0.01)
+        DeathLookupGenerator.check_coverage(lookup_table, {"first_year": 2001, "rates": rates})
+
+        # Sex and Race swapped
+        with self.assertRaisesRegex(ValueError, "White_Male"):
+            DeathLookupGenerator.check_coverage(lookup_table.assign(Composite=["Male_White", "White_Male"]),
+                                                {"first_year": 2001, "rates": rates})
+        # Rates stop before the last age
+        rates[0, 0, 86:] = np.nan
+        with self.assertRaisesRegex(ValueError, f"{PopulationCodes.MAX_AGE - 85} missing cells, the first for year 2001, "
+                                                f"{PopulationCodes.COMPOSITES[0]}, age 86"):
+            DeathLookupGenerator.check_coverage(lookup_table, {"first_year": 2001, "rates": rates})
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2002)
+class TestImmigrationLookupGenerator(unittest.TestCase):
+    def test_race_proportions_are_normalized_by_stratum(self):
+        data = pd.DataFrame({"Year": [2001, 2001, 2001, 2001, 2003], "Sex": ["Male"] * 5,
+                             "Age_Group": ["0-4", "0-4", "0-4", "5-9", "0-4"],
+                             "Race": ["White", "Black", "White", "White", "White"],
+                             "Race_Proportion": [0.2, 0.2, 0.4, 0.0, 0.5]})
+        generator = ImmigrationLookupGenerator("input_data", "input.xlsx", data_reader=FakeReader({"Race": data}))
+
+        race_lookup = generator.generate_race_lookup("Race")
+        self.assertEqual(list(race_lookup), [2001])
+        self.assertAlmostEqual(race_lookup[2001]["Male"]["0-4"]["White"], 0.75)
+        self.assertAlmostEqual(race_lookup[2001]["Male"]["0-4"]["Black"], 0.25)
+        self.assertEqual(race_lookup[2001]["Male"]["5-9"], {"White": 0.0})
+
+    def test_out_of_bounds_immigration_rate(self):
+        data = pd.DataFrame({"Year": [2001, 2002], "Immigration_Rate": [0.01, 1.2]})
+        generator = ImmigrationLookupGenerator("input_data", "input.xlsx", data_reader=FakeReader({"Rate": data}))
+        with self.assertRaisesRegex(ValueError, "Immigration rate 1.2 for year 2002"):
+            generator.generate_immigration_rate_lookup("Rate")
+
+
+if __name__ == '__main__':
+    unittest.main()
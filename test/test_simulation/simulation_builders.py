@@ -0,0 +1,56 @@
+"""
+Builders shared by the simulation tests: small lookup tables for the year 2001 and a random population.
+"""
+import numpy as np
+import pandas as pd
+from src.common.constants import InitializationConstants, PopulationCodes
+from src.common.population import Population
+
+MALE, FEMALE = PopulationCodes.SEXES.index("Male"), PopulationCodes.SEXES.index("Female")
+WHITE, BLACK = PopulationCodes.RACES.index("White"), PopulationCodes.RACES.index("Black")
+ABS, LOW = PopulationCodes.DRINKING_STAGES.index("Abs"), PopulationCodes.DRINKING_STAGES.index("Low")
+
+# Like the real generators, which read the years of some sheets as floats, some tables are keyed by np.float64 years
+YEAR = np.float64(2001)
+
+
+def build_lookup_tables():
+    ages = range(86)
+    rates = np.zeros((1, len(PopulationCodes.COMPOSITES), PopulationCodes.MAX_AGE + 1))
+    rates[..., PopulationCodes.MAX_AGE] = 1.0
+    identity_cdf = np.cumsum(np.eye(len(PopulationCodes.DRINKING_STAGES)), axis=-1)
+    return {
+        "birth_rate_table": {YEAR: 0.1},
+        "birth_male_ratio_table": {YEAR: 0.5},
+        "birth_race_lookup_under_5_table": {2001: {sex: {race: 0.25 for race in PopulationCodes.RACES}
+                                                   for sex in PopulationCodes.SEXES}},
+        "immigration_rate_lookup": {YEAR: 0.05},
+        "immigration_age_lookup": {YEAR: {"Age": {float(age): 1 / len(ages) for age in ages}}},
+        "immigration_sex_lookup": {YEAR: {"Age": {float(age): 0.5 for age in ages}}},
+        "immigration_race_lookup": {2001: {sex: {age_group: {"White": 1.0}
+                                                 for _, _, age_group in InitializationConstants.AGE_GROUPS}
+                                           for sex in PopulationCodes.SEXES}},
+        "initial_pop_drinking_status_lookup": pd.DataFrame([
+            {"Age_Group": age_group, "Composite": composite, "Drinking_Status": {"Abs": 1.0}}
+            for _, _, age_group in InitializationConstants.DRINKING_AGE_GROUPS_5
+            for composite in PopulationCodes.COMPOSITES
+        ]),
+        "drinking_transition_tensor": {
+            "periods": ["0-3", "3-8", "8+"],
+            "age_group_by_age": np.where(np.arange(PopulationCodes.MAX_AGE + 1) < 18, -1, 0),
+            "cdf": np.broadcast_to(identity_cdf, (3, 1, len(PopulationCodes.COMPOSITES)) + identity_cdf.shape).copy(),
+        },
+        "death_rate_array": {"first_year": 2001, "rates": rates},
+    }
+
+
+def build_population(size=500):
+    rng = np.random.default_rng(0)
+    return Population({
+        InitializationConstants.ID_KEY: np.arange(size),
+        InitializationConstants.AGE_KEY: rng.integers(0, 90, size),
+        InitializationConstants.GENDER_KEY: rng.integers(0, 2, size),
+        InitializationConstants.RACE_KEY: rng.integers(0, 4, size),
+        InitializationConstants.DRINKING_STAGE_KEY: np.zeros(size),
+        InitializationConstants.IMMIGRATION_KEY: np.zeros(size, dtype=bool),
+    })
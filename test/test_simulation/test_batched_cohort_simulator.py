@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+import numpy as np
+from src.simulation.batched_cohort_simulator import BatchedCohortSimulator, BatchedSimulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from src.common.constants import PopulationCodes
+from simulation_builders import build_lookup_tables, MALE, FEMALE, WHITE, BLACK, ABS, LOW
+
+
+def build_counts(scale):
+    counts = np.zeros(PopulationCodes.COUNT_TENSOR_SHAPE, dtype=np.int64)
+    counts[99, MALE, WHITE, ABS, 0] = 10 * scale
+    counts[30, FEMALE, BLACK, LOW, 0] = 10 * scale
+    return counts
+
+
+class TestBatchedCohortSimulator(unittest.TestCase):
+    def test_simulate_single_year(self):
+        counts = np.stack([build_counts(1), build_counts(2)])
+
+        simulator = BatchedCohortSimulator(build_lookup_tables(), counts, 2001)
+        simulator.simulate_single_year()
+
+        self.assertEqual(counts[:, 100].sum(), 0)
+        self.assertEqual(counts[:, 31, FEMALE, BLACK, LOW, 0].tolist(), [10, 20])
+        self.assertEqual(counts[:, 0, :, :, ABS, 0].sum(axis=(1, 2)).tolist(), [2, 4])
+        self.assertEqual(counts[..., 1].sum(axis=(1, 2, 3, 4)).tolist(), [1, 2])
+        self.assertEqual(simulator.replicate_counts().tolist(), [13, 26])
+
+    @mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+    @mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+    def test_summary_rows_per_replicate(self):
+        results = BatchedSimulator(build_lookup_tables(), [build_counts(1), build_counts(2), build_counts(0)],
+                                   result_sink=MemoryResultSink()).simulate()
+
+        self.assertEqual(results["Replicate"].tolist(), [0, 1, 2, 0, 1, 2])
+        self.assertEqual(results["Year"].tolist(), [2000, 2000, 2000, 2001, 2001, 2001])
+        self.assertEqual(results["Total Population"].tolist(), [20, 40, 0, 13, 26, 0])
+
+    def test_invalid_counts(self):
+        with self.assertRaises(ValueError):
+            BatchedSimulator(build_lookup_tables(), build_counts(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.simulation.simulator import Simulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from simulation_builders import build_lookup_tables, build_population
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.directory.name, ExperimentConfig.CHECKPOINT_FILE_NAME.format(year=2000))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _simulate(self, population, **kwargs):
+        return Simulator(build_lookup_tables(), population, engine="agent", output_dir=self.directory.name,
+                         result_sink=MemoryResultSink(), **kwargs).simulate()
+
+    def test_resume_matches_full_run(self):
+        full = self._simulate(build_population(), checkpoint_years=[2000])
+        self.assertTrue(os.path.exists(self.checkpoint_path))
+
+        resumed = self._simulate(None, resume_from=self.checkpoint_path)
+        self.assertEqual(resumed.values.tolist(), full.values.tolist())
+        self.assertEqual(list(resumed["Year"]), [2000, 2001])
+
+    @staticmethod
+    def _lookup_tables_until_2002():
+        # Lookup tables are filtered to INITIAL_YEAR..END_YEAR, so a run with a later END_YEAR gets more years
+        lookup_tables = build_lookup_tables()
+        for table in lookup_tables.values():
+            for year in [key for key in table if key == 2001] if isinstance(table, dict) else []:
+                table[type(year)(2002)] = table[year]
+        rates = lookup_tables["death_rate_array"]["rates"]
+        lookup_tables["death_rate_array"]["rates"] = np.concatenate([rates, rates])
+        return lookup_tables
+
+    def test_resume_with_larger_end_year(self):
+        self._simulate(build_population(), checkpoint_years=[2001])
+        checkpoint_path = os.path.join(self.directory.name, ExperimentConfig.CHECKPOINT_FILE_NAME.format(year=2001))
+        with mock.patch.object(ExperimentConfig, "END_YEAR", 2002):
+            full = Simulator(self._lookup_tables_until_2002(), build_population(), engine="agent",
+                             result_sink=MemoryResultSink(), checkpoint_years=[]).simulate()
+            resumed = Simulator(self._lookup_tables_until_2002(), None, engine="agent", result_sink=MemoryResultSink(),
+                                resume_from=checkpoint_path).simulate()
+        self.assertEqual(resumed.values.tolist(), full.values.tolist())
+        self.assertEqual(list(resumed["Year"]), [2000, 2001, 2002])
+
+    def test_resume_with_other_lookup_tables(self):
+        self._simulate(build_population(), checkpoint_years=[2001])
+        checkpoint_path = os.path.join(self.directory.name, ExperimentConfig.CHECKPOINT_FILE_NAME.format(year=2001))
+        lookup_tables = self._lookup_tables_until_2002()
+        lookup_tables["birth_rate_table"][2002] = 0.2
+        Simulator(lookup_tables, None, engine="agent", result_sink=MemoryResultSink(), resume_from=checkpoint_path)
+
+        lookup_tables["birth_rate_table"][2001] = 0.2
+        with self.assertRaises(ValueError):
+            Simulator(lookup_tables, None, engine="agent", result_sink=MemoryResultSink(),
+                      resume_from=checkpoint_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.simulation.cohort_simulator import CohortSimulator
+from src.simulation.simulator import Simulator
+from src.simulation.single_year_simulator import SingleYearSimulator
+from src.common.constants import PopulationCodes
+from src.common.population import Population
+from simulation_builders import build_lookup_tables, MALE, FEMALE, WHITE, BLACK, ABS, LOW
+
+class TestCohortSimulator(unittest.TestCase):
+    def test_simulate_single_year(self):
+        counts = np.zeros(PopulationCodes.COUNT_TENSOR_SHAPE, dtype=np.int64)
+        counts[99, MALE, WHITE, ABS, 0] = 10
+        counts[30, FEMALE, BLACK, LOW, 0] = 10
+
+        simulator = CohortSimulator(build_lookup_tables(), counts, 2001)
+        simulator.simulate_single_year()
+
+        self.assertEqual(counts[100].sum(), 0)
+        self.assertEqual(counts[31, FEMALE, BLACK, LOW, 0], 10)
+        self.assertEqual(counts[0, :, :, ABS, 0].sum(), 2)
+        self.assertEqual(counts[..., 1].sum(), 1)
+        self.assertEqual(simulator.population_count(), 13)
+
+    def test_missing_death_rate_is_death_in_both_engines(self):
+        lookup_tables = build_lookup_tables()
+        lookup_tables["death_rate_array"]["rates"][0, PopulationCodes.COMPOSITES.index("Female_Black"), 30] = np.nan
+        population = Population.from_dataframe(pd.DataFrame({
+            "ID": np.arange(20),
+            "Age": [30] * 20,
+            "Composite": ["Female_Black"] * 10 + ["Male_White"] * 10,
+            "Drinking_Stage": ["Abs"] * 20,
+            "Immigration": [False] * 20,
+        }))
+        counts = population.to_counts()
+
+        CohortSimulator(lookup_tables, counts, 2001).update_deaths()
+        agent_simulator = SingleYearSimulator(lookup_tables, population, 2001)
+        agent_simulator.update_deaths()
+
+        self.assertEqual(counts[30, FEMALE, BLACK].sum(), 0)
+        self.assertEqual(counts[30, MALE, WHITE].sum(), 10)
+        self.assertTrue(np.array_equal(agent_simulator.population.to_counts(), counts))
+
+    def test_summarize_counts(self):
+        rng = np.random.default_rng(0)
+        size = 5000
+        population = Population({
+            "ID": np.arange(size),
+            "Age": rng.integers(0, PopulationCodes.MAX_AGE + 1, size),
+            "Sex": rng.integers(0, len(PopulationCodes.SEXES), size),
+            "Race": rng.integers(0, len(PopulationCodes.RACES), size),
+            "Drinking_Stage": rng.integers(0, len(PopulationCodes.DRINKING_STAGES), size),
+            "Immigration": rng.random(size) < 0.1,
+        })
+        population.mark_dead(np.arange(0, size, 7))
+        row = Simulator._summarize_counts(2001, population.to_counts())
+
+        age, sex, race, stage = (population.living(name) for name in ("Age", "Sex", "Race", "Drinking_Stage"))
+        self.assertEqual(len(row), 45)
+        self.assertEqual(row[:4], [2001, len(population), np.count_nonzero(age < 18), np.count_nonzero(age >= 18)])
+        self.assertAlmostEqual(row[4], np.mean(sex == MALE))
+        self.assertAlmostEqual(row[5], np.mean(population.living("Immigration")))
+        self.assertEqual(row[7], np.count_nonzero(race == BLACK))
+        self.assertEqual(row[11], np.count_nonzero((stage == LOW) & (age >= 18)))
+        female_35_54 = (sex == FEMALE) & (age >= 35) & (age <= 54)
+        self.assertAlmostEqual(row[15 + 4 * 5 + LOW], np.mean(stage[female_35_54] == LOW))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Simulator({}, Population(), engine="spreadsheet")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.simulation.demographic_backbone import DemographicBackbone, DrinkingReplaySimulator
+from src.simulation.simulator import Simulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from simulation_builders import build_lookup_tables, build_population
+from simulation_builders import build_lookup_tables, build_population
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+class TestDemographicBackbone(unittest.TestCase):
+    def test_replay_matches_full_run(self):
+        population = build_population()
+        full = Simulator(build_lookup_tables(), population.copy(), engine="agent", result_sink=MemoryResultSink()).simulate()
+
+        backbone = DemographicBackbone.record(build_lookup_tables(), population)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "backbone.npz")
+            backbone.save(file_path)
+            replay = DrinkingReplaySimulator(build_lookup_tables(), file_path, result_sink=MemoryResultSink()).simulate()
+
+        self.assertEqual(replay.values.tolist(), full.values.tolist())
+        self.assertEqual(len(backbone) - (backbone.exit_year == 2001).sum(), full["Total Population"].iloc[1])
+
+    def test_replay_with_other_demographic_lookups(self):
+        backbone = DemographicBackbone.record(build_lookup_tables(), build_population())
+        lookup_tables = build_lookup_tables()
+        lookup_tables["immigration_rate_lookup"][2001] = 0.5
+        with self.assertRaises(ValueError):
+            DrinkingReplaySimulator(lookup_tables, backbone, result_sink=MemoryResultSink())
+
+
+if __name__ == '__main__':
+    unittest.main()
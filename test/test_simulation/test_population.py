@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.common.population import Population
+
+
+class TestPopulation(unittest.TestCase):
+    def setUp(self):
+        self.population_df = pd.DataFrame({
+            "Age": [3, 40, 120],
+            "ID": [7, 8, 9],
+            "Alive": [True, True, False],
+            "Immigration": [False, True, False],
+            "Composite": ["Female_Hispanic", "Male_White", "Male_Other"],
+            "Drinking_Stage": ["Abs", "High", "Low"],
+        })
+
+    def test_round_trip(self):
+        population = Population.from_dataframe(self.population_df)
+        self.assertEqual(len(population), 2)
+        self.assertEqual(population.composite.tolist(), [6, 0])
+        self.assertEqual(population.nbytes, 2 * 14)
+
+        population_df = population.to_dataframe()
+        self.assertEqual(population_df["Composite"].astype(str).tolist(), ["Female_Hispanic", "Male_White"])
+        self.assertEqual(population_df["Drinking_Stage"].astype(str).tolist(), ["Abs", "High"])
+        self.assertEqual(population_df["ID"].tolist(), [7, 8])
+
+    def test_append_and_keep(self):
+        population = Population.from_dataframe(self.population_df)
+        population.append({"ID": [10], "Age": [0], "Sex": [1], "Race": [1], "Drinking_Stage": [0], "Immigration": [False]})
+        self.assertEqual(population.id.tolist(), [7, 8, 10])
+        self.assertEqual(population.next_id, 11)
+        population.keep(population.age > 0)
+        self.assertEqual(population.id.tolist(), [7, 8])
+        self.assertEqual(population.next_id, 11)
+
+    def test_append_writes_into_reserved_capacity(self):
+        population = Population(capacity=10)
+        buffer = population._buffers["ID"]
+        block = {"ID": np.arange(4), "Age": np.zeros(4), "Sex": np.zeros(4), "Race": np.zeros(4),
+                 "Drinking_Stage": np.zeros(4), "Immigration": np.zeros(4, dtype=bool)}
+        population.append(block)
+        population.append({name: values[:3] for name, values in block.items()})
+        self.assertIs(population._buffers["ID"], buffer)
+        self.assertEqual(len(population), 7)
+
+        population.append(block)
+        self.assertEqual(len(population), 11)
+        self.assertGreaterEqual(population.capacity, 15)
+        self.assertEqual(population.id.tolist(), [0, 1, 2, 3, 0, 1, 2, 0, 1, 2, 3])
+
+    def test_tombstones_and_compaction(self):
+        population = Population({"ID": np.arange(8), "Age": np.arange(8), "Sex": np.zeros(8), "Race": np.zeros(8),
+                                 "Drinking_Stage": np.zeros(8), "Immigration": np.zeros(8, dtype=bool)})
+        population.mark_dead(np.array([1, 3]))
+        population.mark_dead(np.array([3]))
+        self.assertEqual(len(population), 6)
+        self.assertEqual(population.dead_count, 2)
+        self.assertEqual(population.living("ID").tolist(), [0, 2, 4, 5, 6, 7])
+        self.assertEqual(population.to_dataframe()["ID"].tolist(), [0, 2, 4, 5, 6, 7])
+
+        self.assertFalse(population.compact_if_needed(threshold=0.5))
+        self.assertEqual(population.size, 8)
+        self.assertTrue(population.compact_if_needed(threshold=0.25))
+        self.assertEqual(population.id.tolist(), [0, 2, 4, 5, 6, 7])
+        self.assertTrue(population.alive.all())
+        self.assertEqual(population.dead_count, 0)
+
+    def test_fork_is_copy_on_write(self):
+        population = Population({"ID": np.arange(4), "Age": np.arange(4), "Sex": np.zeros(4), "Race": np.zeros(4),
+                                 "Drinking_Stage": np.zeros(4), "Immigration": np.zeros(4, dtype=bool)})
+        forked = population.fork()
+        self.assertIs(forked.age.base, population.age.base)
+        with self.assertRaises(ValueError):
+            forked.age[0] = 50
+
+        forked.writable("Age")[0] = 50
+        forked.mark_dead(np.array([1]))
+        self.assertIs(forked.sex.base, population.sex.base)
+        forked.append({"ID": [4], "Age": [0], "Sex": [1], "Race": [1], "Drinking_Stage": [0], "Immigration": [False]})
+        self.assertEqual(forked.living("Age").tolist(), [50, 2, 3, 0])
+        self.assertEqual(population.age.tolist(), [0, 1, 2, 3])
+        self.assertEqual(len(population), 4)
+
+    def test_unknown_composite(self):
+        self.population_df.loc[0, "Composite"] = "Male_Martian"
+        with self.assertRaises(ValueError):
+            Population.from_dataframe(self.population_df)
+
+    def test_mismatched_columns(self):
+        with self.assertRaises(ValueError):
+            Population({"ID": np.arange(3), "Age": np.arange(2)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+from src.simulation.replicate_runner import ReplicateRunner, _initialize_worker, _run_replicate
+from src.config.simulation_config import ExperimentConfig
+from src.common.constants import InitializationConstants, PopulationCodes
+from simulation_builders import build_lookup_tables
+
+
+def build_replicate_lookup_tables():
+    lookup_tables = build_lookup_tables()
+    lookup_tables["initial_pop_age_lookup"] = {age: 1 / 86 for age in range(86)}
+    lookup_tables["initial_pop_sex_lookup"] = {float(age): 0.5 for age in range(86)}
+    lookup_tables["initial_pop_race_lookup"] = {(age_group, sex): {race: 0.25 for race in PopulationCodes.RACES}
+                                                for _, _, age_group in InitializationConstants.AGE_GROUPS
+                                                for sex in PopulationCodes.SEXES}
+    return lookup_tables
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+@mock.patch.object(ExperimentConfig, "INITIAL_TOTAL_POPULATION", 400)
+class TestReplicateRunner(unittest.TestCase):
+    def test_replicates_match_single_runs(self):
+        results = ReplicateRunner(build_replicate_lookup_tables(), engine="agent", max_workers=2).run(seeds=[7, 8])
+        self.assertEqual(results["Seed"].tolist(), [7, 7, 8, 8])
+        self.assertEqual(results["Replicate"].tolist(), [0, 0, 1, 1])
+
+        seed = ExperimentConfig.seed
+        try:
+            _initialize_worker({}, build_replicate_lookup_tables())
+            _, _, summary = _run_replicate(1, 8, "agent")
+        finally:
+            ExperimentConfig.seed = seed
+        self.assertEqual(results[results["Seed"] == 8].drop(columns=["Replicate", "Seed"]).values.tolist(),
+                         summary.values.tolist())
+
+    def test_missing_replicates(self):
+        with self.assertRaises(ValueError):
+            ReplicateRunner(build_replicate_lookup_tables()).run()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+import pandas as pd
+from src.simulation.result_sinks import ResultSink, CSVResultSink, MemoryResultSink, ParquetResultSink
+
+COLUMNS = ["Year", "Total Population", "Male Proportion"]
+ROWS = [[2001, 100, 0.5], [2002, 105, 0.48]]
+
+
+class TestResultSinks(unittest.TestCase):
+    def _write(self, sink):
+        sink.open(COLUMNS)
+        for row in ROWS:
+            sink.write_row(row)
+        sink.close()
+        return sink
+
+    def test_csv_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "nested", "results.csv")
+            self._write(CSVResultSink(file_path))
+            results = pd.read_csv(file_path)
+        self.assertEqual(list(results.columns), COLUMNS)
+        self.assertEqual(results.values.tolist(), ROWS)
+
+    def test_sink_must_write_rows(self):
+        class IncompleteSink(ResultSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+    def test_memory_sink(self):
+        results = self._write(MemoryResultSink()).result()
+        self.assertEqual(list(results.columns), COLUMNS)
+        self.assertEqual(results.values.tolist(), ROWS)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_parquet_sink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "results.parquet")
+            self._write(ParquetResultSink(file_path, batch_size=1))
+            results = pd.read_parquet(file_path)
+        self.assertEqual(list(results.columns), COLUMNS)
+        self.assertEqual(results.values.tolist(), ROWS)
+
+
+if __name__ == '__main__':
+    unittest.main()
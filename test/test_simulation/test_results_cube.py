@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from unittest import mock
+from src.simulation.results_cube import ResultsCube
+from src.simulation.simulator import Simulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from src.common.constants import PopulationCodes
+from simulation_builders import build_lookup_tables, build_population
+
+
+class TestResultsCube(unittest.TestCase):
+    def setUp(self):
+        self.cube = ResultsCube()
+        for year in (2001, 2002):
+            counts = np.zeros(PopulationCodes.COUNT_TENSOR_SHAPE, dtype=np.int64)
+            counts[40, 1, 2, 3, 0] = year - 2000
+            counts[5, 0, 0, 0, 1] = 7
+            self.cube.append(year, counts)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "cube.npz")
+            self.cube.save(file_path)
+            loaded = ResultsCube.load(file_path)
+        self.assertEqual(loaded.years, [2001, 2002])
+        np.testing.assert_array_equal(loaded.to_array(), self.cube.to_array())
+        self.assertEqual(loaded.to_array().shape, (2,) + PopulationCodes.COUNT_TENSOR_SHAPE)
+
+    def test_to_dataframe(self):
+        cells = self.cube.to_dataframe()
+        self.assertEqual(len(cells), 4)
+        row = cells[(cells["Year"] == 2002) & (cells["Age"] == 40)].iloc[0]
+        self.assertEqual((row["Sex"], row["Race"], row["Drinking_Stage"], row["Immigration"], row["Count"]),
+                         ("Female", "Hispanic", "High", False, 2))
+
+    def test_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.cube.append(2003, np.zeros((101, 8, 5)))
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+class TestSimulatorCube(unittest.TestCase):
+    def test_cube_output_directory_is_created(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_dir = os.path.join(directory, "missing")
+            Simulator(build_lookup_tables(), build_population(), engine="agent", cube_output_file_name="cube.npz",
+                      output_dir=output_dir, result_sink=MemoryResultSink(), checkpoint_years=[]).simulate()
+            self.assertEqual(ResultsCube.load(os.path.join(output_dir, "cube.npz")).years, [2000, 2001])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import tempfile
+import unittest
+from unittest import mock
+from src.simulation.scenario_forker import ScenarioForker
+from src.simulation.simulator import Simulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from simulation_builders import build_lookup_tables, build_population
+from simulation_builders import build_lookup_tables, build_population
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+@mock.patch.object(ExperimentConfig, "RESULT_SINK", "memory")
+class TestScenarioForker(unittest.TestCase):
+    def test_branches_continue_from_the_shared_prefix(self):
+        population = build_population()
+        full = Simulator(build_lookup_tables(), population.copy(), engine="agent", result_sink=MemoryResultSink()).simulate()
+
+        no_births = build_lookup_tables()
+        no_births["birth_rate_table"][2001] = 0.0
+        with tempfile.TemporaryDirectory() as directory:
+            forker = ScenarioForker(build_lookup_tables(), population, 2000, engine="agent", output_dir=directory)
+            results = forker.run({"baseline": build_lookup_tables(), "no_births": no_births})
+
+        self.assertEqual(results["baseline"].values.tolist(), full.values.tolist())
+        self.assertEqual(results["no_births"].iloc[0].tolist(), full.iloc[0].tolist())
+        self.assertLess(results["no_births"]["Total Population"].iloc[1], full["Total Population"].iloc[1])
+
+    def test_fork_year_outside_the_run(self):
+        with self.assertRaises(ValueError):
+            ScenarioForker(build_lookup_tables(), build_population(), 2001)
+
+
+if __name__ == '__main__':
+    unittest.main()
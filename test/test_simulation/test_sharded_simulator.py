@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+from src.simulation.simulator import Simulator
+from src.simulation.sharded_simulator import ShardedSimulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from simulation_builders import build_lookup_tables, build_population
+from simulation_builders import build_lookup_tables, build_population
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+class TestShardedSimulator(unittest.TestCase):
+    def test_sharded_run_matches_unsharded_run(self):
+        expected_sink, sharded_sink = MemoryResultSink(), MemoryResultSink()
+        expected = Simulator(build_lookup_tables(), build_population(), engine="agent", result_sink=expected_sink,
+                             checkpoint_years=[])
+        expected.simulate()
+        sharded = ShardedSimulator(build_lookup_tables(), build_population(), num_shards=3,
+                                   result_sink=sharded_sink, checkpoint_years=[])
+        sharded.simulate()
+
+        self.assertEqual(sharded_sink.result().values.tolist(), expected_sink.result().values.tolist())
+        self.assertTrue(sharded.population.to_dataframe().equals(expected.population.to_dataframe()))
+
+    def test_cohort_engine(self):
+        with self.assertRaises(ValueError):
+            ShardedSimulator(build_lookup_tables(), build_population(), engine="cohort")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from unittest import mock
+import numpy as np
+from src.simulation.simulator import Simulator
+from src.simulation.result_sinks import MemoryResultSink
+from src.config.simulation_config import ExperimentConfig
+from src.common.population import Population
+from simulation_builders import build_lookup_tables, build_population
+
+
+@mock.patch.object(ExperimentConfig, "INITIAL_YEAR", 2000)
+@mock.patch.object(ExperimentConfig, "END_YEAR", 2001)
+class TestSimulator(unittest.TestCase):
+    def _simulate(self, population, engine):
+        return Simulator(build_lookup_tables(), population, engine=engine, result_sink=MemoryResultSink(),
+                         checkpoint_years=[]).simulate()
+
+    def test_initial_population_is_not_modified(self):
+        population = build_population()
+        columns = {name: population.living(name).copy() for name in Population.COLUMN_DTYPES}
+        first = self._simulate(population, "agent")
+        for name, column in columns.items():
+            np.testing.assert_array_equal(population.living(name), column)
+        # A second run from the same population starts from the same state
+        self.assertEqual(self._simulate(population, "agent").values.tolist(), first.values.tolist())
+
+    def test_initial_counts_are_not_modified(self):
+        counts = build_population().to_counts()
+        initial_counts = counts.copy()
+        self._simulate(counts, "cohort")
+        np.testing.assert_array_equal(counts, initial_counts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+from src.simulation.sweep_runner import SweepRunner, _scenario_file_name, _sweep_worker_config
+from src.config.simulation_config import ExperimentConfig
+
+BASE_SHEETS = {name: f"{name}_sheet" for name in SweepRunner.SHEET_PARAMETERS}
+
+
+class TestSweepRunner(unittest.TestCase):
+    def setUp(self):
+        self.runner = SweepRunner("input", "main.xlsx", "transition.xlsx", "prevalence.xlsx", max_workers=1)
+
+    def test_expand_grid_and_scenarios(self):
+        scenarios = self.runner.expand({
+            "base": dict(BASE_SHEETS, seed=5),
+            "grid": {"drinking_transition_sheet_name": ["Overall03", "Overall8"], "seed": [1, 2]},
+            "scenarios": [{"name": "other_prevalence", "initial_population_drinking_sheet": "By Sex",
+                           "excel_initial_prevalence_file_name": "other.xlsx"}],
+        })
+        self.assertEqual([scenario["name"] for scenario in scenarios],
+                         ["Overall03_1", "Overall03_2", "Overall8_1", "Overall8_2", "other_prevalence"])
+        self.assertEqual(scenarios[1]["sheets"]["drinking_transition_sheet_name"], "Overall03")
+        self.assertEqual(scenarios[1]["config"], {"seed": 2})
+        self.assertEqual(scenarios[4]["config"], {"seed": 5})
+        self.assertEqual(scenarios[4]["sheets"]["initial_population_drinking_sheet"], "By Sex")
+        self.assertEqual(scenarios[4]["workbooks"]["excel_initial_prevalence_file_name"], "other.xlsx")
+        self.assertEqual(scenarios[4]["workbooks"]["excel_file_name"], "main.xlsx")
+
+    def test_invalid_manifests(self):
+        with self.assertRaises(ValueError):
+            self.runner.expand({"base": dict(BASE_SHEETS, unknown_sheet="x")})
+        with self.assertRaises(ValueError):
+            self.runner.expand({"base": {"birth_rate_sheet": "Birth"}})
+        with self.assertRaises(ValueError):
+            self.runner.expand({"base": BASE_SHEETS, "scenarios": [{"name": "a"}, {"name": "a"}]})
+
+    @mock.patch.object(ExperimentConfig, "END_YEAR", 2023)
+    def test_lookup_tables_use_the_scenario_years(self):
+        scenario = self.runner.expand({"base": dict(BASE_SHEETS, END_YEAR=2030)})[0]
+        with mock.patch.object(self.runner, "_create_lookup_tables",
+                               side_effect=lambda workbooks, sheets: {"end_year": ExperimentConfig.END_YEAR}):
+            self.assertEqual(self.runner._scenario_lookup_tables(scenario), {"end_year": 2030})
+        self.assertEqual(ExperimentConfig.END_YEAR, 2023)
+
+    @mock.patch.object(ExperimentConfig, "CUBE_OUTPUT_FILE", "cube.npz")
+    @mock.patch.object(ExperimentConfig, "CHECKPOINT_YEARS", [2010])
+    def test_workers_keep_cubes_and_checkpoints(self):
+        config = _sweep_worker_config()
+        self.assertEqual(config["CUBE_OUTPUT_FILE"], "cube.npz")
+        self.assertEqual(config["CHECKPOINT_YEARS"], [2010])
+        self.assertEqual(_scenario_file_name(ExperimentConfig.CHECKPOINT_FILE_NAME, "Overall8"),
+                         "checkpoint_{year}_Overall8.npz")
+
+
+if __name__ == '__main__':
+    unittest.main()
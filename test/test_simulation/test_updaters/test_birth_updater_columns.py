@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.simulation.updaters.birth_updater import BirthUpdater
+from src.common.constants import PopulationCodes
+
+
+class TestBirthUpdaterColumns(unittest.TestCase):
+    def setUp(self):
+        race_lookup = {
+            "Male": {"White": 0.5, "Black": 0.2, "Hispanic": 0.2, "Other": 0.1},
+            "Female": {"White": 0.4, "Black": 0.3, "Hispanic": 0.2, "Other": 0.1},
+        }
+        self.birth_updater = BirthUpdater(birth_rate_lookup=0.02, male_ratio_lookup=0.51, race_lookup=race_lookup)
+
+    def test_generate_birth_columns(self):
+        columns = self.birth_updater.generate_birth_columns(1000000, 2001, next_id=42)
+        self.assertEqual(len(columns["ID"]), 20000)
+        np.testing.assert_array_equal(columns["ID"], np.arange(42, 20042))
+        self.assertTrue((columns["Age"] == 0).all())
+        self.assertFalse(columns["Immigration"].any())
+        self.assertTrue((columns["Drinking_Stage"] == PopulationCodes.DRINKING_STAGES.index("Abs")).all())
+
+        male_share = (columns["Sex"] == PopulationCodes.SEXES.index("Male")).mean()
+        self.assertAlmostEqual(male_share, 0.51, delta=0.02)
+        female_races = columns["Race"][columns["Sex"] == PopulationCodes.SEXES.index("Female")]
+        self.assertAlmostEqual((female_races == PopulationCodes.RACES.index("Black")).mean(), 0.3, delta=0.02)
+
+    def test_generate_new_births_uses_running_id(self):
+        population = pd.DataFrame({"ID": np.arange(5000), "Age": 30})
+        new_births = self.birth_updater.generate_new_births(population, 2001)
+        self.assertEqual(len(new_births), 100)
+        self.assertEqual(new_births["ID"].min(), 5000)
+        self.assertEqual(list(new_births.columns), ["Age", "ID", "Alive", "Immigration", "Composite", "Drinking_Stage"])
+
+
+if __name__ == "__main__":
+    unittest.main()
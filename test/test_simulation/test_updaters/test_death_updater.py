@@ -0,0 +1,55 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.initialization.setting_generators.death_lookup_generator import DeathLookupGenerator
+from src.simulation.updaters.death_updater import DeathUpdater
+from src.common.constants import PopulationCodes
+from src.common.population import Population
+
+
+class TestDeathUpdater(unittest.TestCase):
+    def setUp(self):
+        rows = [
+            {"Year": year, "Composite": composite, "Age": age, "Rate": 1.0 if age == 100 else 0.0}
+            for year in (2001, 2002)
+            for composite in PopulationCodes.COMPOSITES
+            for age in range(PopulationCodes.MAX_AGE + 1)
+        ]
+        generator = DeathLookupGenerator("test/data/input_data", "Data_AUD_Grant_Input_472025.xlsx")
+        self.death_rate_array = generator.compile_lookup_table(pd.DataFrame(rows), "Rate")
+
+    def test_compile_lookup_table(self):
+        self.assertEqual(self.death_rate_array["first_year"], 2001)
+        self.assertEqual(self.death_rate_array["rates"].shape, (2, 8, 101))
+        self.assertFalse(np.isnan(self.death_rate_array["rates"]).any())
+
+    def test_update_deaths(self):
+        population = Population.from_dataframe(pd.DataFrame({
+            "ID": [0, 1, 2, 3],
+            "Age": [0, 50, 100, 100],
+            "Composite": ["Male_White", "Female_Black", "Female_Other", "Male_Hispanic"],
+            "Drinking_Stage": ["Abs"] * 4,
+            "Immigration": [False] * 4,
+            "Alive": [True, False, True, True],
+        }))
+        updated = DeathUpdater(population, self.death_rate_array["rates"][1], 2002).update_deaths()
+        self.assertEqual(updated.living("ID").tolist(), [0])
+        self.assertEqual(len(updated), 1)
+
+    def test_missing_rate_is_death(self):
+        rates = self.death_rate_array["rates"][1].copy()
+        rates[PopulationCodes.COMPOSITES.index("Female_Black"), 50] = np.nan
+        population = Population.from_dataframe(pd.DataFrame({
+            "ID": [0, 1],
+            "Age": [50, 50],
+            "Composite": ["Male_White", "Female_Black"],
+            "Drinking_Stage": ["Abs"] * 2,
+            "Immigration": [False] * 2,
+            "Alive": [True, True],
+        }))
+        updated = DeathUpdater(population, rates, 2002).update_deaths()
+        self.assertEqual(updated.living("ID").tolist(), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
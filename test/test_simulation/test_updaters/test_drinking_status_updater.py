@@ -0,0 +1,56 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.initialization.setting_generators.drinking_transition_lookup_generator import DrinkingStatusLookupGenerator
+from src.simulation.updaters.drinking_status_updater import DrinkingStatusUpdater
+from src.common.constants import PopulationCodes
+from src.common.population import Population
+
+
+def build_lookup():
+    rows = []
+    for age_group in ["18-34", "35-54", "55 and over"]:
+        for composite in PopulationCodes.COMPOSITES:
+            for stage in PopulationCodes.DRINKING_STAGES:
+                if age_group == "18-34" and stage == "Abs":
+                    probabilities = {"Abs": 0.0, "Low": 1.0, "Med": 0.0, "High": 0.0, "Very High": 0.0}
+                else:
+                    probabilities = {to_stage: float(to_stage == stage) for to_stage in PopulationCodes.DRINKING_STAGES}
+                rows.append({"Age_Group": age_group, "Composite": composite, "Drinking_Stage": stage,
+                             "Drinking_Transition_Probability": probabilities})
+    table = pd.DataFrame(rows)
+    return {"0-3": table, "3-8": table.copy(), "8+": table.copy()}
+
+
+class TestDrinkingStatusUpdater(unittest.TestCase):
+    def setUp(self):
+        generator = DrinkingStatusLookupGenerator("test/data/input_data", "Drinking_Stage_Transition_Probabilities.xlsx")
+        self.tensor = generator.compile_lookup(build_lookup())
+
+    def test_compile_lookup(self):
+        self.assertEqual(self.tensor["periods"], ["0-3", "3-8", "8+"])
+        self.assertEqual(self.tensor["cdf"].shape, (3, 3, 8, 5, 5))
+        self.assertEqual(self.tensor["age_group_by_age"][17], -1)
+        self.assertEqual(self.tensor["age_group_by_age"][18], 0)
+        self.assertEqual(self.tensor["age_group_by_age"][54], 1)
+        self.assertEqual(self.tensor["age_group_by_age"][100], 2)
+        np.testing.assert_allclose(self.tensor["cdf"][..., -1], 1.0)
+
+    def test_update_drinking_status(self):
+        population = Population.from_dataframe(pd.DataFrame({
+            "ID": range(5),
+            "Age": [5, 20, 20, 40, 70],
+            "Composite": ["Male_White", "Female_Black", "Male_Other", "Male_White", "Female_White"],
+            "Drinking_Stage": ["Abs", "Abs", "High", "Abs", "Very High"],
+            "Immigration": [False] * 5,
+        }))
+        updated = DrinkingStatusUpdater(population, self.tensor, "3-8", 2005).update_drinking_status()
+        self.assertEqual(updated.to_dataframe()["Drinking_Stage"].tolist(), ["Abs", "Low", "High", "Abs", "Very High"])
+
+    def test_unknown_period(self):
+        with self.assertRaises(RuntimeError):
+            DrinkingStatusUpdater(Population(), self.tensor, "10+", 2005)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import pandas as pd
+from src.simulation.updaters.immigration_updater import ImmigrationUpdater
+from src.common.constants import InitializationConstants, PopulationCodes
+
+
+class TestImmigrationUpdater(unittest.TestCase):
+    def setUp(self):
+        ages = range(86)
+        age_lookup = {"Age": {float(age): 1 / len(ages) for age in ages}}
+        sex_lookup = {"Age": {float(age): 0.6 for age in ages}}
+        race_lookup = {
+            sex: {age_group: {"White": 0.5, "Black": 0.2, "Hispanic": 0.2, "Other": 0.1}
+                  for _, _, age_group in InitializationConstants.AGE_GROUPS}
+            for sex in PopulationCodes.SEXES
+        }
+        drinking_rows = [
+            {"Age_Group": age_group, "Composite": composite,
+             "Drinking_Status": {"Abs": 1.0} if age_group == "0-17" else {"Abs": 0.4, "Low": 0.6}}
+            for _, _, age_group in InitializationConstants.DRINKING_AGE_GROUPS_5
+            for composite in PopulationCodes.COMPOSITES
+        ]
+        self.updater = ImmigrationUpdater(0.1, age_lookup, sex_lookup, race_lookup, pd.DataFrame(drinking_rows))
+        self.population = pd.DataFrame({"ID": range(100000), "Age": 30})
+
+    def test_generate_immigration_population(self):
+        immigrants = self.updater.generate_immigration_population(self.population, 2001)
+        self.assertEqual(len(immigrants), 10000)
+        self.assertEqual(immigrants["ID"].tolist(), list(range(100000, 110000)))
+        self.assertTrue(immigrants["Immigration"].all())
+        self.assertAlmostEqual(immigrants["Composite"].str.startswith("Male").mean(), 0.6, delta=0.02)
+        self.assertTrue((immigrants.loc[immigrants["Age"] < 18, "Drinking_Stage"] == "Abs").all())
+        adult_stages = immigrants.loc[immigrants["Age"] >= 18, "Drinking_Stage"]
+        self.assertTrue(adult_stages.isin(["Abs", "Low"]).all())
+        self.assertAlmostEqual((adult_stages == "Low").mean(), 0.6, delta=0.02)
+
+    def test_next_id_and_reproducibility(self):
+        immigrants1 = self.updater.generate_immigration_population(self.population, 2001, next_id=500000)
+        immigrants2 = self.updater.generate_immigration_population(self.population, 2001, next_id=500000)
+        self.assertEqual(immigrants1["ID"].iloc[0], 500000)
+        pd.testing.assert_frame_equal(immigrants1, immigrants2)
+
+
+if __name__ == "__main__":
+    unittest.main()